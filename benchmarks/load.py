@@ -0,0 +1,432 @@
+"""
+Load benchmark of the HTTP API against a local Postgres.
+
+Creates a separate database, seeds it with movie_library.tools.seed, boots the application from
+movie_library.__main__.get_app with uvicorn and drives a mixed workload at fixed concurrency. Every worker logs in
+as its own user and then picks scenarios by weight: browse /movie/, get a movie by id, toggle a favorite or log in
+again. Latency percentiles and RPS of every endpoint are printed and saved as JSON, two saved runs can be compared:
+
+    python -m benchmarks.load run --users 10000 --movies 100000 --concurrency 32 --output base.json
+    python -m benchmarks.load compare base.json new.json --threshold 0.1
+
+Compare exits with code 1 when p95 or p99 of any endpoint grew or its RPS dropped by more than the threshold.
+"""
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+from argparse import ArgumentParser
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from math import ceil
+from pathlib import Path
+from random import Random
+from time import perf_counter, sleep
+from typing import Iterator
+
+import httpx
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy_utils import create_database, database_exists, drop_database
+
+from movie_library.config import get_settings
+from movie_library.tools.seed import PASSWORD_TEMPLATE
+
+
+PROJECT_PATH = Path(__file__).parent.parent.resolve()
+ENDPOINTS = ("browse", "get", "favorite", "login")
+# metrics which are worse when they grow, RPS is worse when it drops
+LATENCY_METRICS = ("p95", "p99")
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Seed database, start application and measure it")
+    run_parser.add_argument("--users", type=int, default=10_000, help="Number of seeded users")
+    run_parser.add_argument("--movies", type=int, default=100_000, help="Number of seeded movies")
+    run_parser.add_argument("--favorites", type=float, default=20, help="Mean number of favorites of seeded user")
+    run_parser.add_argument("--passwords", type=int, default=10, help="Number of distinct passwords of seeded users")
+    run_parser.add_argument("--concurrency", type=int, default=32, help="Number of concurrent clients")
+    run_parser.add_argument("--duration", type=float, default=60, help="Seconds of measurement")
+    run_parser.add_argument("--warmup", type=float, default=10, help="Seconds of load before measurement")
+    run_parser.add_argument(
+        "--mix",
+        default="browse=50,get=30,favorite=15,login=5",
+        help="Weights of scenarios, any of: " + ", ".join(ENDPOINTS),
+    )
+    run_parser.add_argument(
+        "--database", default="movie_library_benchmark", help="Name of database created for benchmark"
+    )
+    run_parser.add_argument("--reuse", action="store_true", help="Reuse already seeded database")
+    run_parser.add_argument("--port", type=int, default=8765, help="Port of application server")
+    run_parser.add_argument("--seed", type=int, default=0, help="Seed of generated data and workload")
+    run_parser.add_argument("--jobs", type=int, default=4, help="Number of processes seeding database")
+    run_parser.add_argument("--output", help="Path of JSON file with results")
+
+    compare_parser = commands.add_parser("compare", help="Compare two saved runs")
+    compare_parser.add_argument("base", help="JSON file of baseline run")
+    compare_parser.add_argument("new", help="JSON file of new run")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="Allowed relative change")
+    return parser.parse_args()
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown scenario {name!r}, expected one of: {', '.join(ENDPOINTS)}")
+        weights[name] = float(weight)
+    if sum(weights.values()) <= 0:
+        raise ValueError("Weights of scenarios should not all be zero")
+    return weights
+
+
+def percentile(values: list[float], share: float) -> float:
+    """
+    Nearest-rank percentile of sorted values.
+    """
+    if not values:
+        return 0.0
+    return values[max(ceil(share * len(values)) - 1, 0)]
+
+
+def database_uri(database: str) -> str:
+    return make_url(get_settings().database_uri_sync).set(database=database).render_as_string(hide_password=False)
+
+
+def seed_database(uri: str, args) -> None:
+    if database_exists(uri):
+        drop_database(uri)
+    create_database(uri)
+    environment = {**os.environ, "POSTGRES_DB": args.database}
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=PROJECT_PATH / "movie_library" / "db",
+        env=environment,
+        check=True,
+    )
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "movie_library.tools.seed",
+            *("--users", str(args.users), "--movies", str(args.movies), "--favorites", str(args.favorites)),
+            *("--passwords", str(args.passwords), "--seed", str(args.seed), "--jobs", str(args.jobs)),
+        ],
+        cwd=PROJECT_PATH,
+        env=environment,
+        check=True,
+    )
+
+
+def load_users(uri: str, count: int) -> list[str]:
+    engine = create_engine(uri)
+    with engine.connect() as connection:
+        query = text("SELECT username FROM users ORDER BY username LIMIT :count")
+        usernames = list(connection.scalars(query, {"count": count}))
+    engine.dispose()
+    return usernames
+
+
+def load_movie_ids(uri: str) -> list[str]:
+    engine = create_engine(uri)
+    with engine.connect() as connection:
+        movie_ids = [str(movie_id) for movie_id in connection.scalars(text("SELECT id FROM movies ORDER BY id"))]
+    engine.dispose()
+    return movie_ids
+
+
+@contextmanager
+def serve(args) -> Iterator[subprocess.Popen]:
+    """
+    Run application server until the block exits, once it answers ping.
+    """
+    environment = {**os.environ, "POSTGRES_DB": args.database}
+    with subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "movie_library.__main__:get_app",
+            "--factory",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(args.port),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        cwd=PROJECT_PATH,
+        env=environment,
+    ) as server:
+        try:
+            wait_for_server(server, args.port)
+            yield server
+        finally:
+            server.terminate()
+
+
+def wait_for_server(server: subprocess.Popen, port: int) -> None:
+    ping = f"http://127.0.0.1:{port}{get_settings().PATH_PREFIX}/health_check/ping_application"
+    for _ in range(100):
+        if server.poll() is not None:
+            raise RuntimeError(f"Application exited with code {server.returncode}")
+        try:
+            if httpx.get(ping).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        sleep(0.2)
+    raise RuntimeError("Application did not start")
+
+
+class Worker:
+    """
+    Client which logs in as one seeded user and runs scenarios until the deadline.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        username: str,
+        password: str,
+        movie_ids: list[str],
+        random: Random,
+    ) -> None:
+        self.client = client
+        self.username = username
+        self.password = password
+        self.movie_ids = movie_ids
+        self.random = random
+        self.headers: dict[str, str] = {}
+        self.movies_per_page = 20
+
+    async def login(self) -> httpx.Response:
+        response = await self.client.post(
+            "/user/authentication",
+            data={"username": self.username, "password": self.password},
+        )
+        if response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return response
+
+    async def browse(self) -> httpx.Response:
+        pages = max(len(self.movie_ids) // self.movies_per_page, 1)
+        # most clients look at the first pages
+        page = 1 + int(pages * self.random.random() ** 4)
+        return await self.client.get(
+            "/movie/",
+            params={"page": page, "size": self.movies_per_page},
+            headers=self.headers,
+        )
+
+    async def get(self) -> httpx.Response:
+        return await self.client.get(f"/movie/{self.random.choice(self.movie_ids)}", headers=self.headers)
+
+    async def favorite(self) -> httpx.Response:
+        movie_id = self.random.choice(self.movie_ids)
+        response = await self.client.post(f"/favorite/{movie_id}", headers=self.headers)
+        if response.status_code == 400:
+            # the movie is already in favorites, so the toggle removes it
+            response = await self.client.delete(f"/favorite/{movie_id}", headers=self.headers)
+        return response
+
+    async def run(self, scenarios: list[str], weights: list[float], measured: float, deadline: float):
+        samples = defaultdict(list)
+        errors = defaultdict(int)
+        await self.login()
+        while (now := perf_counter()) < deadline:
+            name = self.random.choices(scenarios, weights)[0]
+            try:
+                response = await getattr(self, name)()
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            finished = perf_counter()
+            if now >= measured:
+                samples[name].append(finished - now)
+                if failed:
+                    errors[name] += 1
+        return samples, errors
+
+
+def summarize(samples: list[float], errors: int, duration: float) -> dict:
+    samples = sorted(samples)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "rps": round(len(samples) / duration, 2),
+        "mean": round(sum(samples) / len(samples) * 1000, 3) if samples else 0.0,
+        "p50": round(percentile(samples, 0.50) * 1000, 3),
+        "p95": round(percentile(samples, 0.95) * 1000, 3),
+        "p99": round(percentile(samples, 0.99) * 1000, 3),
+    }
+
+
+def seeded_password(username: str, passwords: int) -> str:
+    """
+    Password of seeded user, its username ends with its number.
+    """
+    return PASSWORD_TEMPLATE.format(int(username.rsplit("_", 1)[1]) % passwords)
+
+
+def make_workers(client: httpx.AsyncClient, args, usernames: list[str], movie_ids: list[str]) -> list[Worker]:
+    """
+    Workers logging in as seeded users in turn, each with its own random generator derived from the seed.
+    """
+    random = Random(args.seed)
+    workers = []
+    for number in range(args.concurrency):
+        username = usernames[number % len(usernames)]
+        password = seeded_password(username, args.passwords)
+        workers.append(Worker(client, username, password, movie_ids, Random(random.random())))
+    return workers
+
+
+async def drive(args, usernames: list[str], movie_ids: list[str]) -> dict:
+    weights = parse_mix(args.mix)
+    scenarios = list(weights)
+    base_url = f"http://127.0.0.1:{args.port}{get_settings().PATH_PREFIX}"
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        measured = perf_counter() + args.warmup
+        deadline = measured + args.duration
+        workers = make_workers(client, args, usernames, movie_ids)
+        results = await asyncio.gather(
+            *(worker.run(scenarios, list(weights.values()), measured, deadline) for worker in workers)
+        )
+    return merge_results(results, scenarios, args.duration)
+
+
+def merge_results(results: list[tuple[dict, dict]], scenarios: list[str], duration: float) -> dict:
+    """
+    Summarize samples and errors of all workers by endpoint and in total.
+    """
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    for worker_samples, worker_errors in results:
+        for name, values in worker_samples.items():
+            samples[name].extend(values)
+        for name, count in worker_errors.items():
+            errors[name] += count
+    endpoints = {name: summarize(samples[name], errors[name], duration) for name in scenarios}
+    total = summarize(
+        [value for values in samples.values() for value in values],
+        sum(errors.values()),
+        duration,
+    )
+    return {"endpoints": endpoints, "total": total}
+
+
+def git_revision() -> str | None:
+    try:
+        revision = subprocess.run(["git", "rev-parse", "HEAD"], cwd=PROJECT_PATH, capture_output=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return revision.stdout.decode().strip()
+
+
+def print_table(endpoints: dict, total: dict) -> None:
+    print(f"{'endpoint':<10} {'requests':>9} {'errors':>7} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, stats in [*endpoints.items(), ("total", total)]:
+        print(
+            f"{name:<10} {stats['requests']:>9} {stats['errors']:>7} {stats['rps']:>9.1f} "
+            f"{stats['p50']:>9.2f} {stats['p95']:>9.2f} {stats['p99']:>9.2f}"
+        )
+
+
+def run(args) -> None:
+    parse_mix(args.mix)
+    uri = database_uri(args.database)
+    if not (args.reuse and database_exists(uri)):
+        seed_database(uri, args)
+    usernames = load_users(uri, args.concurrency)
+    movie_ids = load_movie_ids(uri)
+    with serve(args):
+        report = asyncio.run(drive(args, usernames, movie_ids))
+
+    result = {
+        "config": {
+            "users": args.users,
+            "movies": args.movies,
+            "favorites": args.favorites,
+            "passwords": args.passwords,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "mix": parse_mix(args.mix),
+            "seed": args.seed,
+        },
+        "environment": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "date": datetime.now(timezone.utc).isoformat(),
+        },
+        **report,
+    }
+    print_table(result["endpoints"], result["total"])
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+
+def compare_runs(base: dict, new: dict, threshold: float) -> list[dict]:
+    """
+    Relative changes of latency percentiles and RPS of endpoints present in both runs.
+    """
+    changes = []
+    for name in [*base["endpoints"], "total"]:
+        base_stats = base["total"] if name == "total" else base["endpoints"][name]
+        new_stats = new["total"] if name == "total" else new["endpoints"].get(name)
+        if new_stats is None:
+            continue
+        for metric in (*LATENCY_METRICS, "rps"):
+            if not base_stats[metric]:
+                continue
+            change = (new_stats[metric] - base_stats[metric]) / base_stats[metric]
+            regression = change > threshold if metric in LATENCY_METRICS else change < -threshold
+            changes.append(
+                {
+                    "endpoint": name,
+                    "metric": metric,
+                    "base": base_stats[metric],
+                    "new": new_stats[metric],
+                    "change": round(change, 4),
+                    "regression": regression,
+                }
+            )
+    return changes
+
+
+def compare(args) -> int:
+    base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+    new = json.loads(Path(args.new).read_text(encoding="utf-8"))
+    if base["config"] != new["config"]:
+        print("Runs were made with different configuration, results may be not comparable.", file=sys.stderr)
+    changes = compare_runs(base, new, args.threshold)
+    for change in changes:
+        print(
+            f"{change['endpoint']:<10} {change['metric']:<4} {change['base']:>10.2f} -> {change['new']:>10.2f} "
+            f"{change['change']:>+8.1%}{'  REGRESSION' if change['regression'] else ''}"
+        )
+    return 1 if any(change["regression"] for change in changes) else 0
+
+
+def main():
+    args = parse_args()
+    if args.command == "compare":
+        sys.exit(compare(args))
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
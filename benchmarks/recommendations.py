@@ -0,0 +1,102 @@
+"""
+Benchmark of the index of similar movies on synthetic favorites.
+
+Popularity of movies follows a power law, the number of favorites of users is geometric.
+Prints time and peak memory of the full build and of incremental refresh as JSON:
+
+    python -m benchmarks.recommendations --users 1000000 --movies 100000
+"""
+import json
+import tracemalloc
+from argparse import ArgumentParser
+from time import perf_counter
+from uuid import UUID, uuid4
+
+import numpy as np
+
+from movie_library.utils.recommendation import ItemSimilarityIndex
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1_000_000, help="Number of users")
+    parser.add_argument("--movies", type=int, default=100_000, help="Number of movies")
+    parser.add_argument("--favorites", type=float, default=20, help="Mean number of favorites of user")
+    parser.add_argument("--skew", type=float, default=1.0, help="Exponent of power law of popularity of movies")
+    parser.add_argument("--changes", type=int, default=10_000, help="Number of favorite changes for refresh")
+    parser.add_argument("--top-k", type=int, default=50, help="Number of similar movies kept for each movie")
+    parser.add_argument("--budget", type=int, default=20_000_000, help="Co-occurrences computed at once")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def generate(generator: np.random.Generator, users: int, movies: int, favorites: float, skew: float):
+    counts = np.minimum(generator.geometric(1 / favorites, users), movies)
+    popularity = 1 / np.arange(1, movies + 1) ** skew
+    movie_columns = generator.choice(movies, size=int(counts.sum()), p=popularity / popularity.sum())
+    user_keys = np.repeat(generator.integers(-(2**63), 2**63 - 1, users, dtype=np.int64), counts)
+    return user_keys, movie_columns.astype(np.int32)
+
+
+def measure(action) -> tuple[float, int]:
+    tracemalloc.start()
+    started = perf_counter()
+    action()
+    elapsed = perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def record_changes(index: ItemSimilarityIndex, generator: np.random.Generator, movie_ids: list, changes: int) -> None:
+    """
+    Record random additions and removals of favorites by users already in the index.
+    """
+    changed_users = generator.choice(index.user_keys, changes)
+    changed_movies = generator.choice(len(movie_ids), changes)
+    for key, movie, delta in zip(changed_users, changed_movies, generator.choice([1, -1], changes)):
+        user_id = UUID(int=(int(key) % 2**64) << 64)
+        index.record(user_id, [movie_ids[movie]], int(delta))
+
+
+def main():
+    args = parse_args()
+    generator = np.random.default_rng(args.seed)
+    started = perf_counter()
+    user_keys, movie_columns = generate(generator, args.users, args.movies, args.favorites, args.skew)
+    movie_ids = sorted(uuid4() for _ in range(args.movies))
+    generated = perf_counter() - started
+
+    index = ItemSimilarityIndex(k=args.top_k, budget=args.budget)
+    build_time, build_peak = measure(lambda: index.build(movie_ids, user_keys, movie_columns))
+
+    record_changes(index, generator, movie_ids, args.changes)
+    refresh_time, refresh_peak = measure(index.refresh)
+
+    started = perf_counter()
+    for movie_id in movie_ids[:1000]:
+        index.similar(movie_id, 10)
+    lookup_time = (perf_counter() - started) / 1000
+
+    print(
+        json.dumps(
+            {
+                "users": args.users,
+                "movies": args.movies,
+                "favorites": len(user_keys),
+                "generate_seconds": round(generated, 3),
+                "build_seconds": round(build_time, 3),
+                "build_peak_bytes": build_peak,
+                "refresh_changes": args.changes,
+                "refresh_seconds": round(refresh_time, 3),
+                "refresh_peak_bytes": refresh_peak,
+                "lookup_microseconds": round(lookup_time * 1e6, 1),
+                "index_bytes": index.stats()["memory"],
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
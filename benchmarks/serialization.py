@@ -0,0 +1,86 @@
+"""
+Benchmark of serialization of list pages: pydantic page of MovieResponse against RowsPage encoded by orjson.
+
+Items are ORM objects of movies with ids of asyncpg, as the list endpoints get them from the database.
+Prints cost of one item in microseconds for every page size as JSON:
+
+    python -m benchmarks.serialization --sizes 10 50 100
+"""
+import json
+from argparse import ArgumentParser
+from time import perf_counter
+from uuid import uuid4
+
+from asyncpg.pgproto.pgproto import UUID
+from fastapi_pagination import Params
+from fastapi_pagination.api import create_page, set_page
+
+from movie_library.db.models import Movie
+from movie_library.schemas import CursorPage, EstimatedTotalPage, MovieResponse
+from movie_library.utils.common import RowsPage, cursor_page_json, page_json
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100], help="Page sizes")
+    parser.add_argument("--repeat", type=int, default=2000, help="Pages serialized for every size")
+    return parser.parse_args()
+
+
+def per_item(action, items: int, repeat: int) -> float:
+    action()
+    started = perf_counter()
+    for _ in range(repeat):
+        action()
+    return round((perf_counter() - started) / repeat / items * 1e6, 3)
+
+
+def measure(size: int, repeat: int) -> dict:
+    """
+    Get cost of one item of pages of the given size, serialized by pydantic and straight from rows.
+    """
+    movies = [
+        Movie(id=UUID(str(uuid4())), title=f"Movie {number}", description="Description of the movie. " * 5)
+        for number in range(size)
+    ]
+    params = Params(page=1, size=size)
+    cursor_page = {"items": movies, "size": size, "next_cursor": "cursor"}
+
+    def pydantic_page():
+        # total and params are positional-only in the signature, but passing them by position is deprecated
+        # pylint: disable=kwarg-superseded-by-positional-arg
+        return page_json(create_page(movies, total=10_000, params=params, total_exact=False))
+
+    def fast_page():
+        return page_json(RowsPage(movies, MovieResponse, total=10_000, page=1, size=size, total_exact=False))
+
+    def pydantic_cursor_page():
+        return CursorPage[MovieResponse].parse_obj(cursor_page).json().encode()
+
+    def fast_cursor_page():
+        return cursor_page_json(cursor_page, MovieResponse, fast=True)
+
+    offset_before = per_item(pydantic_page, size, repeat)
+    offset_after = per_item(fast_page, size, repeat)
+    cursor_before = per_item(pydantic_cursor_page, size, repeat)
+    cursor_after = per_item(fast_cursor_page, size, repeat)
+    return {
+        "size": size,
+        "offset_pydantic_microseconds": offset_before,
+        "offset_fast_microseconds": offset_after,
+        "offset_speedup": round(offset_before / offset_after, 1),
+        "cursor_pydantic_microseconds": cursor_before,
+        "cursor_fast_microseconds": cursor_after,
+        "cursor_speedup": round(cursor_before / cursor_after, 1),
+    }
+
+
+def main():
+    args = parse_args()
+    set_page(EstimatedTotalPage[MovieResponse])
+    results = [measure(size, args.repeat) for size in args.sizes]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,17 @@
+from asyncio import create_task
+
 from fastapi import FastAPI
 from fastapi_pagination import add_pagination
 from uvicorn import run
 
 from movie_library.config import DefaultSettings, get_settings
+from movie_library.db.connection import monitor_replicas
 from movie_library.endpoints import list_of_routes
 from movie_library.utils.common import get_hostname
+from movie_library.utils.favorite import merge_favorite_counters_periodically
+from movie_library.utils.metrics import MetricsMiddleware, monitor_event_loop_lag
+from movie_library.utils.recommendation import maintain_similarity_index
+from movie_library.utils.server_timing import ServerTimingMiddleware
 
 
 def bind_routes(application: FastAPI, setting: DefaultSettings) -> None:
@@ -15,6 +22,44 @@ def bind_routes(application: FastAPI, setting: DefaultSettings) -> None:
         application.include_router(route, prefix=setting.PATH_PREFIX)
 
 
+def bind_background_tasks(application: FastAPI, setting: DefaultSettings) -> None:
+    """
+    Start background tasks with application and cancel them on shutdown.
+    """
+    tasks = []
+
+    async def start() -> None:
+        if setting.METRICS and setting.EVENT_LOOP_LAG_INTERVAL > 0:
+            tasks.append(create_task(monitor_event_loop_lag(setting.EVENT_LOOP_LAG_INTERVAL)))
+        if setting.replica_uris and setting.DB_REPLICA_CHECK_INTERVAL > 0:
+            tasks.append(create_task(monitor_replicas(setting.DB_REPLICA_CHECK_INTERVAL)))
+        if setting.FAVORITE_COUNTERS_MERGE_INTERVAL > 0:
+            tasks.append(
+                create_task(
+                    merge_favorite_counters_periodically(
+                        setting.FAVORITE_COUNTERS_MERGE_INTERVAL,
+                        setting.FAVORITE_COUNTERS_MERGE_BATCH,
+                    )
+                )
+            )
+        if setting.RECOMMENDATIONS_REFRESH_INTERVAL > 0:
+            tasks.append(
+                create_task(
+                    maintain_similarity_index(
+                        setting.RECOMMENDATIONS_REFRESH_INTERVAL,
+                        setting.RECOMMENDATIONS_REBUILD_INTERVAL,
+                    )
+                )
+            )
+
+    async def stop() -> None:
+        for task in tasks:
+            task.cancel()
+
+    application.add_event_handler("startup", start)
+    application.add_event_handler("shutdown", stop)
+
+
 def get_app() -> FastAPI:
     """
     Creates application and all dependable objects.
@@ -38,6 +83,11 @@ def get_app() -> FastAPI:
     )
     settings = get_settings()
     bind_routes(application, settings)
+    bind_background_tasks(application, settings)
+    if settings.METRICS:
+        application.add_middleware(MetricsMiddleware, routes=application.routes)
+    if settings.SERVER_TIMING:
+        application.add_middleware(ServerTimingMiddleware)
     add_pagination(application)
     application.state.settings = settings
     return application
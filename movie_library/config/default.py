@@ -1,10 +1,15 @@
 from os import environ
+from typing import Literal
 
 from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
 from pydantic import BaseSettings
 
 
+# how total is counted for paginated endpoints
+TotalMode = Literal["exact", "estimated", "cached", "none"]
+
+
 class DefaultSettings(BaseSettings):
     """
     Default configs for application.
@@ -22,14 +27,70 @@ class DefaultSettings(BaseSettings):
     POSTGRES_USER: str = environ.get("POSTGRES_USER", "user")
     POSTGRES_PORT: int = int(environ.get("POSTGRES_PORT", "5432")[-4:])
     POSTGRES_PASSWORD: str = environ.get("POSTGRES_PASSWORD", "1234")
-    DB_CONNECT_RETRY: int = environ.get("DB_CONNECT_RETRY", 20)
-    DB_POOL_SIZE: int = environ.get("DB_POOL_SIZE", 15)
+    # how many times a connect which failed because the database is unreachable is retried
+    DB_CONNECT_RETRY: int = int(environ.get("DB_CONNECT_RETRY", 20))
+    DB_CONNECT_TIMEOUT: float = float(environ.get("DB_CONNECT_TIMEOUT", 10))
+    DB_POOL_SIZE: int = int(environ.get("DB_POOL_SIZE", 15))
+    DB_MAX_OVERFLOW: int = int(environ.get("DB_MAX_OVERFLOW", 10))
+    DB_POOL_RECYCLE: int = int(environ.get("DB_POOL_RECYCLE", 1800))
+    DB_POOL_TIMEOUT: float = float(environ.get("DB_POOL_TIMEOUT", 30))
+    DB_POOL_PRE_PING: bool = environ.get("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_ECHO: bool = environ.get("DB_ECHO", "false").lower() == "true"
+    # statements taking at least this many seconds are logged, zero disables the log
+    DB_SLOW_QUERY_THRESHOLD: float = float(environ.get("DB_SLOW_QUERY_THRESHOLD", 0.5))
+    SERVER_TIMING: bool = environ.get("SERVER_TIMING", "true").lower() == "true"
+    METRICS: bool = environ.get("METRICS", "true").lower() == "true"
+    # serialize list pages straight from rows with orjson instead of validating them with pydantic
+    FAST_JSON: bool = environ.get("FAST_JSON", "false").lower() == "true"
+    EVENT_LOOP_LAG_INTERVAL: float = float(environ.get("EVENT_LOOP_LAG_INTERVAL", 0.5))
+    # comma separated SQLAlchemy uris of read replicas, all reads go to the primary if empty
+    POSTGRES_REPLICA_URIS: str = environ.get("POSTGRES_REPLICA_URIS", "")
+    # how reads are spread over replicas: round_robin or least_connections
+    DB_REPLICA_BALANCING: str = environ.get("DB_REPLICA_BALANCING", "round_robin")
+    DB_REPLICA_MAX_LAG: float = float(environ.get("DB_REPLICA_MAX_LAG", 5))
+    DB_REPLICA_CHECK_INTERVAL: float = float(environ.get("DB_REPLICA_CHECK_INTERVAL", 2))
+    # reads of a client go to the primary for this long after its own write, should exceed DB_REPLICA_MAX_LAG
+    READ_YOUR_WRITES_WINDOW: float = float(environ.get("READ_YOUR_WRITES_WINDOW", 10))
+    READ_YOUR_WRITES_SIZE: int = int(environ.get("READ_YOUR_WRITES_SIZE", 100000))
+
+    FUZZY_SEARCH_THRESHOLD: float = float(environ.get("FUZZY_SEARCH_THRESHOLD", 0.3))
+    FUZZY_SEARCH_LIMIT: int = int(environ.get("FUZZY_SEARCH_LIMIT", 10))
+    MOVIE_IMPORT_MAX_REPORTED_CONFLICTS: int = int(environ.get("MOVIE_IMPORT_MAX_REPORTED_CONFLICTS", 1000))
+    # how total is counted for paginated endpoints: exact, estimated, cached or none
+    MOVIES_TOTAL_MODE: TotalMode = environ.get("MOVIES_TOTAL_MODE", "exact")
+    MOVIE_SEARCH_TOTAL_MODE: TotalMode = environ.get("MOVIE_SEARCH_TOTAL_MODE", "exact")
+    FAVORITES_TOTAL_MODE: TotalMode = environ.get("FAVORITES_TOTAL_MODE", "exact")
+    PAGINATION_TOTAL_CACHE_SIZE: int = int(environ.get("PAGINATION_TOTAL_CACHE_SIZE", 1000))
+    PAGINATION_TOTAL_CACHE_TTL: float = float(environ.get("PAGINATION_TOTAL_CACHE_TTL", 60))
+    FAVORITE_COUNTER_SHARDS: int = int(environ.get("FAVORITE_COUNTER_SHARDS", 16))
+    FAVORITE_COUNTERS_MERGE_INTERVAL: float = float(environ.get("FAVORITE_COUNTERS_MERGE_INTERVAL", 10))
+    FAVORITE_COUNTERS_MERGE_BATCH: int = int(environ.get("FAVORITE_COUNTERS_MERGE_BATCH", 10000))
+    POPULAR_MOVIES_LIMIT: int = int(environ.get("POPULAR_MOVIES_LIMIT", 10))
+    EXPORT_BATCH_SIZE: int = int(environ.get("EXPORT_BATCH_SIZE", 1000))
+    # how many similar movies are kept for each movie and how many co-occurrences are computed at once
+    RECOMMENDATIONS_TOP_K: int = int(environ.get("RECOMMENDATIONS_TOP_K", 50))
+    RECOMMENDATIONS_BLOCK_BUDGET: int = int(environ.get("RECOMMENDATIONS_BLOCK_BUDGET", 20_000_000))
+    RECOMMENDATIONS_REFRESH_INTERVAL: float = float(environ.get("RECOMMENDATIONS_REFRESH_INTERVAL", 60))
+    RECOMMENDATIONS_REBUILD_INTERVAL: float = float(environ.get("RECOMMENDATIONS_REBUILD_INTERVAL", 86400))
+    SIMILAR_MOVIES_LIMIT: int = int(environ.get("SIMILAR_MOVIES_LIMIT", 10))
 
     # to get a string like this run: 'openssl rand -hex 32'
     SECRET_KEY: str = environ.get("SECRET_KEY", "")
     ALGORITHM: str = environ.get("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(environ.get("ACCESS_TOKEN_EXPIRE_MINUTES", 1440))
 
+    USER_CACHE_SIZE: int = int(environ.get("USER_CACHE_SIZE", 10000))
+    USER_CACHE_TTL: float = float(environ.get("USER_CACHE_TTL", 60))
+    TOKEN_CACHE_SIZE: int = int(environ.get("TOKEN_CACHE_SIZE", 10000))
+    MOVIE_CACHE_SIZE: int = int(environ.get("MOVIE_CACHE_SIZE", 10000))
+    MOVIE_CACHE_TTL: float = float(environ.get("MOVIE_CACHE_TTL", 300))
+    RESPONSE_CACHE_SIZE: int = int(environ.get("RESPONSE_CACHE_SIZE", 1000))
+    RESPONSE_CACHE_TTL: float = float(environ.get("RESPONSE_CACHE_TTL", 30))
+    # seconds a read waits for an identical read in flight before querying itself, zero disables coalescing
+    SINGLE_FLIGHT_TIMEOUT: float = float(environ.get("SINGLE_FLIGHT_TIMEOUT", 1))
+
+    PASSWORD_HASH_WORKERS: int = int(environ.get("PASSWORD_HASH_WORKERS", 4))
+
     PWD_CONTEXT = CryptContext(schemes=["bcrypt"], deprecated="auto")
     OAUTH2_SCHEME = OAuth2PasswordBearer(tokenUrl=f"{APP_HOST}:{APP_PORT}{PATH_PREFIX}/user/authentication")
 
@@ -55,6 +116,28 @@ class DefaultSettings(BaseSettings):
             **self.database_settings,
         )
 
+    @property
+    def replica_uris(self) -> list[str]:
+        """
+        Get uris for connection with read replicas.
+        """
+        return [uri.strip() for uri in self.POSTGRES_REPLICA_URIS.split(",") if uri.strip()]
+
+    @property
+    def database_engine_settings(self) -> dict:
+        """
+        Get connection pool and engine settings for database.
+        """
+        return {
+            "echo": self.DB_ECHO,
+            "pool_size": self.DB_POOL_SIZE,
+            "max_overflow": self.DB_MAX_OVERFLOW,
+            "pool_recycle": self.DB_POOL_RECYCLE,
+            "pool_timeout": self.DB_POOL_TIMEOUT,
+            "pool_pre_ping": self.DB_POOL_PRE_PING,
+            "connect_args": {"timeout": self.DB_CONNECT_TIMEOUT},
+        }
+
     @property
     def database_uri_sync(self) -> str:
         """
@@ -1,7 +1,19 @@
-from .session import SessionManager, get_session
+from .instrumentation import REQUEST_STATS, RequestStats, instrument_engine
+from .pool import InstrumentedQueuePool, retry_connects
+from .replica import RECENT_WRITERS, Replica
+from .session import SessionManager, get_read_session, get_session, monitor_replicas
 
 
 __all__ = [
+    "get_read_session",
     "get_session",
+    "monitor_replicas",
+    "RECENT_WRITERS",
+    "Replica",
+    "instrument_engine",
+    "REQUEST_STATS",
+    "RequestStats",
+    "InstrumentedQueuePool",
+    "retry_connects",
     "SessionManager",
 ]
@@ -0,0 +1,95 @@
+from contextvars import ContextVar
+from logging import getLogger
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+logger = getLogger(__name__)
+
+
+class RequestStats:
+    """
+    Statistics of database use by one request: statements, time spent in them and waiting for the pool.
+    """
+
+    def __init__(self, path: str = "") -> None:
+        self.path = path
+        self.statements = 0
+        self.db_time = 0.0
+        self.pool_wait = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: str | None = None
+
+    def observe_statement(self, statement: str, elapsed: float) -> None:
+        self.statements += 1
+        self.db_time += elapsed
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+
+    def server_timing(self) -> str:
+        """
+        Get value of Server-Timing header, durations are in milliseconds.
+        """
+        return ", ".join(
+            [
+                f'db;dur={self.db_time * 1000:.1f};desc="statements: {self.statements}"',
+                f"db-pool;dur={self.pool_wait * 1000:.1f}",
+                f"db-slowest;dur={self.slowest_time * 1000:.1f}",
+            ]
+        )
+
+
+# statistics of the current request, None outside of requests
+REQUEST_STATS: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def observe_pool_wait(wait: float) -> None:
+    stats = REQUEST_STATS.get()
+    if stats is not None:
+        stats.pool_wait += wait
+
+
+def _before_cursor_execute(connection, *_) -> None:
+    connection.info.setdefault("statement_started", []).append(perf_counter())
+
+
+def _handle_error(context) -> None:
+    started = context.connection.info.get("statement_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def instrument_engine(engine: AsyncEngine, slow_query_threshold: float) -> None:
+    """
+    Measure every statement executed by the engine for statistics of the current request.
+
+    Statements which took at least slow_query_threshold seconds are logged, zero disables the log.
+    """
+
+    def after_cursor_execute(connection, _cursor, statement, *_) -> None:
+        elapsed = perf_counter() - connection.info["statement_started"].pop()
+        stats = REQUEST_STATS.get()
+        if stats is not None:
+            stats.observe_statement(statement, elapsed)
+        if 0 < slow_query_threshold <= elapsed:
+            logger.warning(
+                "Slow query took %.1f ms in %s: %s",
+                elapsed * 1000,
+                stats.path if stats is not None else "no request",
+                statement,
+            )
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", _handle_error)
+
+
+__all__ = [
+    "instrument_engine",
+    "observe_pool_wait",
+    "REQUEST_STATS",
+    "RequestStats",
+]
@@ -0,0 +1,104 @@
+from asyncio import sleep
+from logging import getLogger
+from threading import Lock
+from time import perf_counter
+
+from asyncpg import CannotConnectNowError
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.util import await_only
+
+from .instrumentation import observe_pool_wait
+
+
+logger = getLogger(__name__)
+
+# seconds between attempts to connect, doubled after each failed attempt up to the maximum
+CONNECT_RETRY_DELAY = 0.1
+CONNECT_RETRY_MAX_DELAY = 2.0
+
+
+class PoolWaitStats:
+    """
+    Accumulated time spent by callers waiting for a connection from the pool.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def observe(self, wait: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "wait_total": self.wait_total,
+                "wait_max": self.wait_max,
+                "wait_avg": self.wait_total / self.checkouts if self.checkouts else 0.0,
+            }
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool which measures how long every checkout waited for a free connection,
+    in total and for the current request.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        started = perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            wait = perf_counter() - started
+            self.wait_stats.observe(wait)
+            observe_pool_wait(wait)
+
+    def stats(self) -> dict:
+        """
+        Get live statistics of the pool.
+        """
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            **self.wait_stats.as_dict(),
+        }
+
+
+def retry_connects(engine: AsyncEngine, retries: int) -> None:
+    """
+    Retry connects of engine which failed because the database is unreachable or still starting up.
+
+    Waits between attempts are awaited in the greenlet of the connect, so they do not block the event loop.
+    """
+
+    @event.listens_for(engine.sync_engine, "do_connect")
+    def connect(dialect, connection_record, cargs, cparams):  # pylint: disable=unused-argument
+        for attempt in range(retries):
+            try:
+                return dialect.connect(*cargs, **cparams)
+            except (OSError, CannotConnectNowError) as error:
+                delay = min(CONNECT_RETRY_DELAY * 2**attempt, CONNECT_RETRY_MAX_DELAY)
+                logger.warning("Could not connect to the database (%s), retrying in %.1f seconds.", error, delay)
+                await_only(sleep(delay))
+        return dialect.connect(*cargs, **cparams)
+
+
+__all__ = [
+    "InstrumentedQueuePool",
+    "PoolWaitStats",
+    "retry_connects",
+]
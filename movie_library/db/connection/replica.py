@@ -0,0 +1,107 @@
+from logging import getLogger
+from urllib.parse import urlparse
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+from movie_library.config import get_settings
+from movie_library.db.connection.instrumentation import instrument_engine
+from movie_library.db.connection.pool import InstrumentedQueuePool
+from movie_library.utils.common.cache import TTLCache
+
+
+logger = getLogger(__name__)
+
+# seconds since the last replayed transaction, zero if everything received is replayed or the node is not a replica
+REPLICA_LAG = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+
+class Replica:
+    """
+    Engine of read replica with its last measured lag.
+
+    Replica is available while its lag does not exceed max_lag and it answers the lag check.
+    """
+
+    def __init__(self, uri: str, max_lag: float, slow_query_threshold: float, **engine_settings) -> None:
+        self.host = urlparse(uri).hostname
+        self.max_lag = max_lag
+        self.engine = create_async_engine(uri, poolclass=InstrumentedQueuePool, future=True, **engine_settings)
+        instrument_engine(self.engine, slow_query_threshold)
+        self.session_maker = sessionmaker(
+            self.engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autoflush=False,
+            info={"replica": True},
+        )
+        self.lag: float | None = None
+        self.available = True
+
+    def connections(self) -> int:
+        return self.engine.pool.checkedout()
+
+    async def check(self) -> None:
+        try:
+            async with self.engine.connect() as connection:
+                self.lag = float(await connection.scalar(REPLICA_LAG))
+        except (SQLAlchemyError, OSError):
+            logger.exception("Could not check lag of replica %s.", self.host)
+            self.lag = None
+        available = self.lag is not None and self.lag <= self.max_lag
+        if available != self.available:
+            logger.warning("Replica %s is %s, lag %s.", self.host, "back" if available else "out of rotation", self.lag)
+        self.available = available
+
+    def stats(self) -> dict:
+        return {"host": self.host, "available": self.available, "lag": self.lag, **self.engine.pool.stats()}
+
+
+class RecentWriters:
+    """
+    Clients which have written to the primary recently, so their reads also go to the primary.
+
+    Clients are told apart by authorization header or, without it, by address.
+    """
+
+    def __init__(self, maxsize: int, window: float) -> None:
+        self._cache = TTLCache(maxsize=maxsize, ttl=window)
+
+    @staticmethod
+    def client(request: Request) -> str:
+        authorization = request.headers.get("authorization")
+        if authorization:
+            return authorization
+        return request.client.host if request.client else ""
+
+    def mark(self, client: str) -> None:
+        self._cache.set(client, True)
+
+    def wrote_recently(self, client: str) -> bool:
+        return self._cache.get(client, False)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+RECENT_WRITERS = RecentWriters(
+    maxsize=get_settings().READ_YOUR_WRITES_SIZE,
+    window=get_settings().READ_YOUR_WRITES_WINDOW,
+)
+
+
+__all__ = [
+    "RECENT_WRITERS",
+    "RecentWriters",
+    "Replica",
+]
@@ -1,17 +1,30 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from asyncio import Future, gather, get_running_loop, sleep
+from itertools import count
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.requests import Request
 
 from movie_library.config import get_settings
+from movie_library.db.connection.instrumentation import instrument_engine
+from movie_library.db.connection.pool import InstrumentedQueuePool, retry_connects
+from movie_library.db.connection.replica import RECENT_WRITERS, Replica
 
 
 class SessionManager:
     """
     A class that implements the necessary functionality for working with the database:
     issuing sessions, storing and updating connection settings.
+
+    Reads may be spread over replicas, which are taken out of rotation while they lag behind.
     """
 
+    _disposing: set[Future] = set()
+
     def __init__(self) -> None:
-        self.refresh()
+        if not hasattr(self, "engine"):
+            self.refresh()
 
     def __new__(cls):
         if not hasattr(cls, "instance"):
@@ -19,18 +32,108 @@ class SessionManager:
         return cls.instance  # noqa
 
     def get_session_maker(self) -> sessionmaker:
-        return sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+        return self.session_maker
+
+    def get_read_session_maker(self) -> sessionmaker:
+        """
+        Get session maker of available replica chosen by balancing, or of the primary if there is none.
+        """
+        available = [replica for replica in self.replicas if replica.available]
+        if not available:
+            return self.session_maker
+        if self.balancing == "least_connections":
+            return min(available, key=Replica.connections).session_maker
+        return available[next(self._turn) % len(available)].session_maker
+
+    async def check_replicas(self) -> None:
+        await gather(*(replica.check() for replica in self.replicas))
+
+    def pool_stats(self) -> dict:
+        return self.engine.pool.stats()
+
+    def replica_stats(self) -> list[dict]:
+        return [replica.stats() for replica in self.replicas]
+
+    def dispose(self, engines: list[AsyncEngine]) -> None:
+        """
+        Close connections of replaced engines. Without running event loop they are only dropped,
+        their connections belong to a loop which is gone.
+        """
+        try:
+            get_running_loop()
+        except RuntimeError:
+            for engine in engines:
+                engine.sync_engine.dispose(close=False)
+            return
+        disposing = gather(*(engine.dispose() for engine in engines))
+        self._disposing.add(disposing)
+        disposing.add_done_callback(self._disposing.discard)
 
     def refresh(self) -> None:
-        self.engine = create_async_engine(get_settings().database_uri, echo=True, future=True)
+        settings = get_settings()
+        replaced = [getattr(self, "engine", None), *(replica.engine for replica in getattr(self, "replicas", []))]
+        self.dispose([engine for engine in replaced if engine is not None])
+        self.engine = create_async_engine(
+            settings.database_uri,
+            poolclass=InstrumentedQueuePool,
+            future=True,
+            **settings.database_engine_settings,
+        )
+        instrument_engine(self.engine, settings.DB_SLOW_QUERY_THRESHOLD)
+        retry_connects(self.engine, settings.DB_CONNECT_RETRY)
+        self.session_maker = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+        self.replicas = [
+            Replica(
+                uri,
+                settings.DB_REPLICA_MAX_LAG,
+                settings.DB_SLOW_QUERY_THRESHOLD,
+                **settings.database_engine_settings,
+            )
+            for uri in settings.replica_uris
+        ]
+        self.balancing = settings.DB_REPLICA_BALANCING
+        self._turn = count()
+
+
+@event.listens_for(Session, "after_commit")
+def remember_writer(session: Session) -> None:
+    client = session.info.get("client")
+    if client is not None:
+        RECENT_WRITERS.mark(client)
 
 
-async def get_session() -> AsyncSession:
+async def get_session(request: Request) -> AsyncSession:
     session_maker = SessionManager().get_session_maker()
     async with session_maker() as session:
+        if SessionManager().replicas:
+            session.info["client"] = RECENT_WRITERS.client(request)
         yield session
 
 
+async def get_read_session(request: Request) -> AsyncSession:
+    """
+    Get session for read-only endpoints from a replica, or from the primary if the client has written recently.
+    """
+    manager = SessionManager()
+    if RECENT_WRITERS.wrote_recently(RECENT_WRITERS.client(request)):
+        session_maker = manager.get_session_maker()
+    else:
+        session_maker = manager.get_read_session_maker()
+    async with session_maker() as session:
+        yield session
+
+
+async def monitor_replicas(interval: float) -> None:
+    """
+    Check lag of replicas every interval seconds, so lagging ones are taken out of rotation, until cancelled.
+    """
+    while True:
+        await SessionManager().check_replicas()
+        await sleep(interval)
+
+
 __all__ = [
+    "get_read_session",
     "get_session",
+    "monitor_replicas",
 ]
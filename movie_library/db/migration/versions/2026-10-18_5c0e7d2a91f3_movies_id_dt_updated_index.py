@@ -0,0 +1,29 @@
+"""movies id dt_updated covering index
+
+Revision ID: 5c0e7d2a91f3
+Revises: eabb24fd18b6
+Create Date: 2026-10-18 14:05:31.218407
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "5c0e7d2a91f3"
+down_revision = "eabb24fd18b6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix__movies__id_dt_updated",
+        "movies",
+        ["id"],
+        unique=False,
+        postgresql_include=["dt_updated"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix__movies__id_dt_updated", table_name="movies")
@@ -0,0 +1,54 @@
+"""movie favorite counters and popularity
+
+Revision ID: 9b41d7e6c2a8
+Revises: 5c0e7d2a91f3
+Create Date: 2026-10-18 16:22:48.903115
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "9b41d7e6c2a8"
+down_revision = "5c0e7d2a91f3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "movie_favorite_counters",
+        sa.Column("movie_id", sa.UUID(), nullable=False),
+        sa.Column("shard", sa.Integer(), nullable=False),
+        sa.Column("delta", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["movie_id"], ["movies.id"], name=op.f("fk__movie_favorite_counters__movie_id__movies"), ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("movie_id", "shard", name=op.f("pk__movie_favorite_counters")),
+    )
+    op.create_table(
+        "movie_popularity",
+        sa.Column("movie_id", sa.UUID(), nullable=False),
+        sa.Column("favorite_count", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["movie_id"], ["movies.id"], name=op.f("fk__movie_popularity__movie_id__movies"), ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("movie_id", name=op.f("pk__movie_popularity")),
+    )
+    op.create_index(
+        "ix__movie_popularity__favorite_count_movie_id",
+        "movie_popularity",
+        ["favorite_count", "movie_id"],
+        unique=False,
+    )
+    op.execute(
+        "INSERT INTO movie_popularity (movie_id, favorite_count) "
+        "SELECT movie_id, count(*) FROM user_favorite_movies GROUP BY movie_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix__movie_popularity__favorite_count_movie_id", table_name="movie_popularity")
+    op.drop_table("movie_popularity")
+    op.drop_table("movie_favorite_counters")
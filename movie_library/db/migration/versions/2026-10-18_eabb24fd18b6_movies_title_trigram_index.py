@@ -0,0 +1,32 @@
+"""movies title trigram index
+
+Revision ID: eabb24fd18b6
+Revises: 08d149e5455e
+Create Date: 2026-10-18 11:47:06.530912
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "eabb24fd18b6"
+down_revision = "08d149e5455e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix__movies__title_trgm",
+        "movies",
+        ["title"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix__movies__title_trgm", table_name="movies", postgresql_using="gin")
+    op.execute("DROP EXTENSION IF EXISTS pg_trgm")
@@ -1,5 +1,6 @@
 from .favorite import UserMovie
 from .movies import Movie
+from .popularity import MovieFavoriteCounter, MoviePopularity
 from .users import User
 
 
@@ -7,4 +8,6 @@ __all__ = [
     "User",
     "Movie",
     "UserMovie",
+    "MovieFavoriteCounter",
+    "MoviePopularity",
 ]
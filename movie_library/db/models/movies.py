@@ -1,9 +1,14 @@
-from sqlalchemy import Column
-from sqlalchemy.dialects.postgresql import TEXT
+from sqlalchemy import Column, Computed, Index
+from sqlalchemy.dialects.postgresql import TEXT, TSVECTOR
+from sqlalchemy.orm import deferred
 
 from .base import BaseTable
 
 
+# text search configuration used for search_vector and for search queries
+SEARCH_CONFIG = "simple"
+
+
 class Movie(BaseTable):
     __tablename__ = "movies"
 
@@ -21,3 +26,22 @@ class Movie(BaseTable):
         nullable=True,
         doc="Movie description.",
     )
+    search_vector = deferred(
+        Column(
+            "search_vector",
+            TSVECTOR,
+            Computed(
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+            doc="Full-text search document built from title and description.",
+        )
+    )
+
+    __table_args__ = (
+        Index("ix__movies__dt_created_id", "dt_created", "id"),
+        Index("ix__movies__id_dt_updated", "id", postgresql_include=["dt_updated"]),
+        Index("ix__movies__search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix__movies__title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+    )
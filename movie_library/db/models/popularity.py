@@ -0,0 +1,45 @@
+from sqlalchemy import BigInteger, Column, ForeignKey, Index, Integer
+from sqlalchemy.dialects.postgresql import UUID
+
+from movie_library.db import DeclarativeBase
+
+
+class MovieFavoriteCounter(DeclarativeBase):
+    __tablename__ = "movie_favorite_counters"
+
+    movie_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("movies.id", ondelete="CASCADE"),
+        primary_key=True,
+        doc="Movie id",
+    )
+    shard = Column(
+        Integer,
+        primary_key=True,
+        doc="Shard of counter, so concurrent writers do not wait for the same row",
+    )
+    delta = Column(
+        BigInteger,
+        nullable=False,
+        default=0,
+        doc="Change of number of favorites which is not merged into popularity yet",
+    )
+
+
+class MoviePopularity(DeclarativeBase):
+    __tablename__ = "movie_popularity"
+
+    movie_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("movies.id", ondelete="CASCADE"),
+        primary_key=True,
+        doc="Movie id",
+    )
+    favorite_count = Column(
+        BigInteger,
+        nullable=False,
+        default=0,
+        doc="Number of users who have the movie in favorites",
+    )
+
+    __table_args__ = (Index("ix__movie_popularity__favorite_count_movie_id", "favorite_count", "movie_id"),)
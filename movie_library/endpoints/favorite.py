@@ -1,14 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, Path, Request, Response
-from fastapi_pagination import Page
-from fastapi_pagination.ext.sqlalchemy import paginate
+from fastapi import APIRouter, Body, Depends, HTTPException, Path, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import UUID4
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from movie_library.db.connection import get_session
+from movie_library.config import get_settings
+from movie_library.db.connection import get_read_session, get_session
 from movie_library.db.models import User
-from movie_library.schemas import MovieResponse
-from movie_library.utils.favorite import add_favorite, delete_favorite, get_favorites_query
+from movie_library.schemas import (
+    CursorPage,
+    EstimatedTotalPage,
+    FavoriteBatch,
+    FavoriteBatchAdded,
+    FavoriteBatchRemoved,
+    MovieResponse,
+)
+from movie_library.utils.common import (
+    MOVIES,
+    RESPONSE_CACHE,
+    ItemsVersion,
+    cursor_page_body,
+    favorites_of,
+    page_json,
+    paginate_offset,
+    stream_ndjson,
+)
+from movie_library.utils.favorite import (
+    add_favorite,
+    add_favorites,
+    delete_favorite,
+    delete_favorites,
+    export_favorites_query,
+    get_favorites_cursor_page,
+    get_favorites_query,
+)
 from movie_library.utils.user import get_current_user
 
 
@@ -21,21 +46,125 @@ api_router = APIRouter(
 @api_router.get(
     "/",
     status_code=status.HTTP_200_OK,
-    response_model=Page[MovieResponse],
+    response_model=EstimatedTotalPage[MovieResponse],
     responses={
+        status.HTTP_304_NOT_MODIFIED: {
+            "description": "Page has not changed.",
+        },
         status.HTTP_401_UNAUTHORIZED: {
             "description": "Could not validate credentials.",
         },
     },
 )
 async def get_favorites(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session),
+):
+    async def build():
+        query = await get_favorites_query(session, current_user, projection=True)
+        if query is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials.")
+        version = ItemsVersion()
+        total_mode = get_settings().FAVORITES_TOTAL_MODE
+        model = MovieResponse if get_settings().FAST_JSON else None
+        page = await paginate_offset(session, query, total_mode, transformer=version, model=model)
+        return page_json(page), version.etag(page.total, page.page, page.size)
+
+    return await RESPONSE_CACHE.respond(request, (MOVIES, favorites_of(current_user.id)), build)
+
+
+@api_router.get(
+    "/cursor",
+    status_code=status.HTTP_200_OK,
+    response_model=CursorPage[MovieResponse],
+    responses={
+        status.HTTP_304_NOT_MODIFIED: {
+            "description": "Page has not changed.",
+        },
+        status.HTTP_400_BAD_REQUEST: {
+            "description": "Invalid cursor.",
+        },
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Could not validate credentials.",
+        },
+    },
+)
+async def get_favorites_by_cursor(
+    request: Request,
+    cursor: str | None = Query(None, description="Cursor from previous page"),
+    size: int = Query(50, ge=1, le=100, description="Page size"),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session),
+):
+    async def build():
+        return await cursor_page_body(
+            lambda: get_favorites_cursor_page(session, current_user, cursor, size, projection=True),
+            MovieResponse,
+            cursor,
+            size,
+            fast=get_settings().FAST_JSON,
+        )
+
+    return await RESPONSE_CACHE.respond(request, (MOVIES, favorites_of(current_user.id)), build)
+
+
+@api_router.get(
+    "/export",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={
+        status.HTTP_200_OK: {
+            "content": {"application/x-ndjson": {}},
+            "description": "One JSON object per line.",
+        },
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Could not validate credentials.",
+        },
+    },
+)
+async def export_favorites(
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session),
+):
+    rows = stream_ndjson(session, export_favorites_query(current_user), get_settings().EXPORT_BATCH_SIZE)
+    return StreamingResponse(rows, media_type="application/x-ndjson")
+
+
+@api_router.post(
+    "/batch",
+    status_code=status.HTTP_200_OK,
+    response_model=FavoriteBatchAdded,
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Could not validate credentials.",
+        },
+    },
+)
+async def create_favorites(
+    batch: FavoriteBatch = Body(...),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    return await add_favorites(session, current_user, batch.movie_ids)
+
+
+@api_router.delete(
+    "/batch",
+    status_code=status.HTTP_200_OK,
+    response_model=FavoriteBatchRemoved,
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Could not validate credentials.",
+        },
+    },
+)
+async def del_favorites(
+    batch: FavoriteBatch = Body(...),
     current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
-    query = await get_favorites_query(session, current_user)
-    if query is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials.")
-    return await paginate(session, query)
+    return await delete_favorites(session, current_user, batch.movie_ids)
 
 
 @api_router.post(
@@ -1,10 +1,15 @@
+# pylint: disable=unused-argument
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from movie_library.db.connection import get_session
-from movie_library.schemas import MessageSuccess
+from movie_library.db.connection import SessionManager, get_session
+from movie_library.db.models import User
+from movie_library.schemas import CacheStats, MessageSuccess, PoolStats, ReplicaStats
+from movie_library.utils.common import RESPONSE_CACHE
 from movie_library.utils.health_check import health_check_db
+from movie_library.utils.movie import MOVIE_CACHE
+from movie_library.utils.user import TOKEN_CACHE, USER_CACHE, get_current_user
 
 
 api_router = APIRouter(
@@ -40,3 +45,105 @@ async def ping_database(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         detail="Database does not work.",
     )
+
+
+@api_router.get(
+    "/database_pool",
+    response_model=PoolStats,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Could not validate credentials.",
+        },
+    },
+)
+async def database_pool(
+    _: Request,
+    current_user: User = Depends(get_current_user),
+):
+    return SessionManager().pool_stats()
+
+
+@api_router.get(
+    "/database_replicas",
+    response_model=list[ReplicaStats],
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Could not validate credentials.",
+        },
+    },
+)
+async def database_replicas(
+    _: Request,
+    current_user: User = Depends(get_current_user),
+):
+    return SessionManager().replica_stats()
+
+
+@api_router.get(
+    "/movie_cache",
+    response_model=CacheStats,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Could not validate credentials.",
+        },
+    },
+)
+async def movie_cache(
+    _: Request,
+    current_user: User = Depends(get_current_user),
+):
+    return MOVIE_CACHE.stats()
+
+
+@api_router.get(
+    "/response_cache",
+    response_model=CacheStats,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Could not validate credentials.",
+        },
+    },
+)
+async def response_cache(
+    _: Request,
+    current_user: User = Depends(get_current_user),
+):
+    return RESPONSE_CACHE.stats()
+
+
+@api_router.get(
+    "/user_cache",
+    response_model=CacheStats,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Could not validate credentials.",
+        },
+    },
+)
+async def user_cache(
+    _: Request,
+    current_user: User = Depends(get_current_user),
+):
+    return USER_CACHE.stats()
+
+
+@api_router.get(
+    "/token_cache",
+    response_model=CacheStats,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Could not validate credentials.",
+        },
+    },
+)
+async def token_cache(
+    _: Request,
+    current_user: User = Depends(get_current_user),
+):
+    return TOKEN_CACHE.stats()
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+from starlette import status
+
+from movie_library.utils.metrics import REGISTRY
+
+
+api_router = APIRouter(
+    prefix="/metrics",
+    tags=["Application Health"],
+)
+
+
+@api_router.get(
+    "",
+    status_code=status.HTTP_200_OK,
+    response_class=PlainTextResponse,
+)
+async def metrics(
+    _: Request,
+):
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
@@ -1,16 +1,51 @@
 # pylint: disable=unused-argument
-from fastapi import APIRouter, Body, Depends, HTTPException, Path, Request, Response
-from fastapi_pagination import Page
-from fastapi_pagination.ext.sqlalchemy import paginate
+from fastapi import APIRouter, Body, Depends, HTTPException, Path, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import UUID4
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from movie_library.db.connection import get_session
+from movie_library.config import get_settings
+from movie_library.db.connection import get_read_session, get_session
 from movie_library.db.models import User
+from movie_library.schemas import CursorPage, EstimatedTotalPage
 from movie_library.schemas import Movie as MovieSchema
-from movie_library.schemas import MovieResponse
-from movie_library.utils.movie import create_movie, delete_movie, get_movie, get_movies_query, update_movie
+from movie_library.schemas import (
+    MovieImportReport,
+    MoviePopularityResponse,
+    MovieResponse,
+    MovieSearchResponse,
+    MovieSimilarityResponse,
+)
+from movie_library.utils.common import (
+    MOVIES,
+    RESPONSE_CACHE,
+    ItemsVersion,
+    cursor_page_body,
+    make_etag,
+    not_modified,
+    page_json,
+    paginate_offset,
+    stream_ndjson,
+)
+from movie_library.utils.movie import (
+    create_movie,
+    delete_movie,
+    export_movies_query,
+    find_similar_titles,
+    get_movie,
+    get_movie_version,
+    get_movies_cursor_page,
+    get_movies_query,
+    get_popular_movies,
+    import_movies,
+    iter_lines,
+    parse_csv,
+    parse_ndjson,
+    search_movies_query,
+    update_movie,
+)
+from movie_library.utils.recommendation import get_similar_movies
 from movie_library.utils.user import get_current_user
 
 
@@ -23,19 +58,144 @@ api_router = APIRouter(
 @api_router.get(
     "/",
     status_code=status.HTTP_200_OK,
-    response_model=Page[MovieResponse],
+    response_model=EstimatedTotalPage[MovieResponse],
     responses={
+        status.HTTP_304_NOT_MODIFIED: {
+            "description": "Page has not changed.",
+        },
         status.HTTP_401_UNAUTHORIZED: {
             "description": "Could not validate credentials.",
         },
     },
 )
 async def search_movies(
+    request: Request,
     current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
+):
+    async def build():
+        version = ItemsVersion()
+        total_mode = get_settings().MOVIES_TOTAL_MODE
+        model = MovieResponse if get_settings().FAST_JSON else None
+        query = get_movies_query(projection=True)
+        page = await paginate_offset(session, query, total_mode, transformer=version, model=model)
+        return page_json(page), version.etag(page.total, page.page, page.size)
+
+    return await RESPONSE_CACHE.respond(request, (MOVIES,), build)
+
+
+@api_router.get(
+    "/cursor",
+    status_code=status.HTTP_200_OK,
+    response_model=CursorPage[MovieResponse],
+    responses={
+        status.HTTP_304_NOT_MODIFIED: {
+            "description": "Page has not changed.",
+        },
+        status.HTTP_400_BAD_REQUEST: {
+            "description": "Invalid cursor.",
+        },
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Could not validate credentials.",
+        },
+    },
+)
+async def search_movies_by_cursor(
+    request: Request,
+    cursor: str | None = Query(None, description="Cursor from previous page"),
+    size: int = Query(50, ge=1, le=100, description="Page size"),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session),
+):
+    async def build():
+        return await cursor_page_body(
+            lambda: get_movies_cursor_page(session, cursor, size, projection=True),
+            MovieResponse,
+            cursor,
+            size,
+            fast=get_settings().FAST_JSON,
+        )
+
+    return await RESPONSE_CACHE.respond(request, (MOVIES,), build)
+
+
+@api_router.get(
+    "/export",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={
+        status.HTTP_200_OK: {
+            "content": {"application/x-ndjson": {}},
+            "description": "One JSON object per line.",
+        },
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Could not validate credentials.",
+        },
+    },
+)
+async def export_movies(
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session),
 ):
-    query = get_movies_query()
-    return await paginate(session, query)
+    rows = stream_ndjson(session, export_movies_query(), get_settings().EXPORT_BATCH_SIZE)
+    return StreamingResponse(rows, media_type="application/x-ndjson")
+
+
+@api_router.get(
+    "/search",
+    status_code=status.HTTP_200_OK,
+    response_model=EstimatedTotalPage[MovieSearchResponse],
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Could not validate credentials.",
+        },
+    },
+)
+async def full_text_search_movies(
+    q: str = Query(..., min_length=1, description="Words to search in title and description"),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session),
+):
+    query = search_movies_query(q)
+    return await paginate_offset(session, query, get_settings().MOVIE_SEARCH_TOTAL_MODE)
+
+
+@api_router.get(
+    "/fuzzy",
+    status_code=status.HTTP_200_OK,
+    response_model=list[MovieSimilarityResponse],
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Could not validate credentials.",
+        },
+    },
+)
+async def fuzzy_search_movies(
+    title: str = Query(..., min_length=1, description="Title to look for, possibly misspelled"),
+    limit: int = Query(get_settings().FUZZY_SEARCH_LIMIT, ge=1, le=100, description="Number of movies"),
+    threshold: float = Query(get_settings().FUZZY_SEARCH_THRESHOLD, ge=0, le=1, description="Minimal similarity"),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session),
+):
+    return await find_similar_titles(session, title, limit, threshold)
+
+
+@api_router.get(
+    "/popular",
+    status_code=status.HTTP_200_OK,
+    response_model=list[MoviePopularityResponse],
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Could not validate credentials.",
+        },
+    },
+)
+async def popular_movies(
+    limit: int = Query(get_settings().POPULAR_MOVIES_LIMIT, ge=1, le=100, description="Number of movies"),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session),
+):
+    return await get_popular_movies(session, limit)
 
 
 @api_router.get(
@@ -43,6 +203,9 @@ async def search_movies(
     status_code=status.HTTP_200_OK,
     response_model=MovieResponse,
     responses={
+        status.HTTP_304_NOT_MODIFIED: {
+            "description": "Movie has not changed.",
+        },
         status.HTTP_401_UNAUTHORIZED: {
             "description": "Could not validate credentials.",
         },
@@ -52,19 +215,56 @@ async def search_movies(
     },
 )
 async def search_movie(
+    request: Request,
+    response: Response,
     movie_id: UUID4 = Path(...),
     _: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
+    if "if-none-match" in request.headers:
+        dt_updated = await get_movie_version(session, movie_id)
+        if dt_updated is not None:
+            not_modified_response = not_modified(request, response, make_etag(movie_id, dt_updated.isoformat()))
+            if not_modified_response is not None:
+                return not_modified_response
+
     movie = await get_movie(session, movie_id)
     if movie is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Movie not found!",
         )
+    response.headers["ETag"] = make_etag(movie.id, movie.dt_updated.isoformat())
     return movie
 
 
+@api_router.get(
+    "/{movie_id}/similar",
+    status_code=status.HTTP_200_OK,
+    response_model=list[MovieSimilarityResponse],
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Could not validate credentials.",
+        },
+        status.HTTP_404_NOT_FOUND: {
+            "description": "Movie does not exist.",
+        },
+    },
+)
+async def similar_movies(
+    movie_id: UUID4 = Path(...),
+    limit: int = Query(get_settings().SIMILAR_MOVIES_LIMIT, ge=1, le=100, description="Number of movies"),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session),
+):
+    if await get_movie(session, movie_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Movie not found!",
+        )
+    return await get_similar_movies(session, movie_id, limit)
+
+
 @api_router.post(
     "/",
     status_code=status.HTTP_201_CREATED,
@@ -96,6 +296,48 @@ async def add_movie(
     )
 
 
+@api_router.post(
+    "/import",
+    status_code=status.HTTP_200_OK,
+    response_model=MovieImportReport,
+    responses={
+        status.HTTP_400_BAD_REQUEST: {
+            "description": "Body is not valid UTF-8.",
+        },
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Could not validate credentials.",
+        },
+        status.HTTP_415_UNSUPPORTED_MEDIA_TYPE: {
+            "description": "Body is neither NDJSON nor CSV.",
+        },
+    },
+)
+async def bulk_import_movies(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    parsers = {
+        "application/x-ndjson": parse_ndjson,
+        "application/jsonl": parse_ndjson,
+        "text/csv": parse_csv,
+    }
+    if content_type not in parsers:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Body must be NDJSON or CSV.",
+        )
+    movies = parsers[content_type](iter_lines(request.stream()))
+    try:
+        return await import_movies(session, movies, get_settings().MOVIE_IMPORT_MAX_REPORTED_CONFLICTS)
+    except UnicodeDecodeError as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Body must be encoded in UTF-8.",
+        ) from error
+
+
 @api_router.put(
     "/edit/{movie_id}",
     status_code=status.HTTP_200_OK,
@@ -1,10 +1,23 @@
-from .common import MessageSuccess
-from .movie import Movie, MovieResponse
+from .common import CacheStats, MessageSuccess, PoolStats, ReplicaStats
+from .favorite import FavoriteBatch, FavoriteBatchAdded, FavoriteBatchRemoved
+from .movie import (
+    Movie,
+    MovieImportConflict,
+    MovieImportReport,
+    MoviePopularityResponse,
+    MovieResponse,
+    MovieSearchResponse,
+    MovieSimilarityResponse,
+)
+from .pagination import CursorPage, EstimatedTotalPage
 from .user import RegistrationForm, Token, TokenData, User, UserEdit
 
 
 __all__ = [
     "MessageSuccess",
+    "CacheStats",
+    "PoolStats",
+    "ReplicaStats",
     "User",
     "RegistrationForm",
     "Token",
@@ -12,4 +25,14 @@ __all__ = [
     "UserEdit",
     "Movie",
     "MovieResponse",
+    "MovieSearchResponse",
+    "MovieSimilarityResponse",
+    "MoviePopularityResponse",
+    "MovieImportConflict",
+    "MovieImportReport",
+    "CursorPage",
+    "EstimatedTotalPage",
+    "FavoriteBatch",
+    "FavoriteBatchAdded",
+    "FavoriteBatchRemoved",
 ]
@@ -3,3 +3,30 @@ from pydantic import BaseModel
 
 class MessageSuccess(BaseModel):
     message: str
+
+
+class CacheStats(BaseModel):
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+    hit_ratio: float
+    memory: int | None
+
+
+class PoolStats(BaseModel):
+    size: int
+    checked_out: int
+    idle: int
+    overflow: int
+    checkouts: int
+    wait_total: float
+    wait_max: float
+    wait_avg: float
+
+
+class ReplicaStats(PoolStats):
+    host: str | None
+    available: bool
+    lag: float | None
@@ -0,0 +1,16 @@
+from pydantic import UUID4, BaseModel, conlist
+
+
+class FavoriteBatch(BaseModel):
+    movie_ids: conlist(UUID4, min_items=1, max_items=1000)
+
+
+class FavoriteBatchAdded(BaseModel):
+    added: list[UUID4]
+    present: list[UUID4]
+    missing: list[UUID4]
+
+
+class FavoriteBatchRemoved(BaseModel):
+    removed: list[UUID4]
+    missing: list[UUID4]
@@ -16,3 +16,30 @@ class MovieResponse(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class MovieSearchResponse(MovieResponse):
+    rank: float
+    title_highlight: str
+    description_highlight: str | None
+
+
+class MovieSimilarityResponse(MovieResponse):
+    similarity: float
+
+
+class MoviePopularityResponse(MovieResponse):
+    favorite_count: int
+
+
+class MovieImportConflict(BaseModel):
+    row: int
+    title: str | None
+    reason: str
+
+
+class MovieImportReport(BaseModel):
+    received: int
+    inserted: int
+    rejected: int
+    conflicts: list[MovieImportConflict]
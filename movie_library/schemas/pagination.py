@@ -0,0 +1,17 @@
+from typing import Generic, Sequence, TypeVar
+
+from fastapi_pagination import Page
+from pydantic.generics import GenericModel
+
+
+T = TypeVar("T")
+
+
+class CursorPage(GenericModel, Generic[T]):
+    items: Sequence[T]
+    size: int
+    next_cursor: str | None
+
+
+class EstimatedTotalPage(Page[T], Generic[T]):
+    total_exact: bool = True
@@ -1,9 +1,6 @@
-# pylint: disable=no-self-argument
 from datetime import datetime
 
-from pydantic import BaseModel, EmailStr, constr, validator
-
-from movie_library.config import get_settings
+from pydantic import BaseModel, EmailStr, constr
 
 
 class User(BaseModel):
@@ -21,24 +18,12 @@ class RegistrationForm(BaseModel):
     password: constr(min_length=8)
     email: EmailStr
 
-    @validator("password")
-    def validate_password(cls, password):
-        settings = get_settings()
-        password = settings.PWD_CONTEXT.hash(password)
-        return password
-
 
 class UserEdit(BaseModel):
     username: str
     password: constr(min_length=8) | None
     email: EmailStr
 
-    @validator("password")
-    def validate_password(cls, password):
-        settings = get_settings()
-        password = settings.PWD_CONTEXT.hash(password)
-        return password
-
 
 class Token(BaseModel):
     access_token: str
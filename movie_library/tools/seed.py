@@ -0,0 +1,249 @@
+"""
+Generator of a large synthetic dataset in the database of application.
+
+Users, movies and favorites are derived from the seed only, so the same arguments always give the same rows.
+Rows are generated and written with COPY in chunks by parallel processes. Popularity of movies follows
+a power law, the number of favorites of users is geometric. Password of user number i is
+PASSWORD_TEMPLATE.format(i % passwords), every distinct password is hashed once:
+
+    python -m movie_library.tools.seed --users 10000000 --movies 1000000 --favorites 20 --jobs 8
+"""
+import asyncio
+import sys
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from time import perf_counter
+from typing import Callable
+from uuid import UUID
+
+import asyncpg
+import numpy as np
+from faker import Faker
+
+from movie_library.config import get_settings
+from movie_library.db.models import Movie, MovieFavoriteCounter, MoviePopularity, User, UserMovie
+
+
+PASSWORD_TEMPLATE = "password-{}"
+# rows are created during this many days before EPOCH, not before now, so they do not depend on the day of run
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+HISTORY_DAYS = 5 * 365
+# faker is slow, so every chunk generates this many words and sentences and combines them
+WORDS_POOL = 1000
+DOMAINS_POOL = 20
+
+# independent random streams of the seed
+IDS, ROWS, RANKS, CHOICES = range(4)
+# tables of the seed
+USERS, MOVIES, FAVORITES = range(3)
+
+USER_COLUMNS = ("id", "username", "password", "email", "dt_created", "dt_updated")
+MOVIE_COLUMNS = ("id", "title", "description", "dt_created", "dt_updated")
+FAVORITE_COLUMNS = ("user_id", "movie_id")
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100_000, help="Number of users")
+    parser.add_argument("--movies", type=int, default=10_000, help="Number of movies")
+    parser.add_argument("--favorites", type=float, default=20, help="Mean number of favorites of user")
+    parser.add_argument("--skew", type=float, default=1.0, help="Exponent of power law of popularity of movies")
+    parser.add_argument("--passwords", type=int, default=10, help="Number of distinct passwords")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of generated data")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Rows of users or movies in one COPY")
+    parser.add_argument("--jobs", type=int, default=4, help="Number of parallel processes")
+    parser.add_argument("--truncate", action="store_true", help="Remove users, movies and favorites before seeding")
+    return parser.parse_args()
+
+
+def uuids(seed: int, table: int, chunk: int, count: int) -> list[UUID]:
+    """
+    Random version 4 UUIDs of chunk of table.
+    """
+    raw = np.frombuffer(np.random.default_rng([seed, IDS, table, chunk]).bytes(16 * count), dtype=np.uint8)
+    raw = raw.reshape(count, 16).copy()
+    raw[:, 6] = raw[:, 6] & 0x0F | 0x40
+    raw[:, 8] = raw[:, 8] & 0x3F | 0x80
+    data = raw.tobytes()
+    return [UUID(bytes=data[offset : offset + 16]) for offset in range(0, len(data), 16)]
+
+
+def timestamps(generator: np.random.Generator, count: int) -> list[datetime]:
+    seconds = generator.integers(0, HISTORY_DAYS * 86400, count)
+    return [EPOCH - timedelta(seconds=int(offset)) for offset in seconds]
+
+
+def chunks(total: int, chunk_size: int) -> list[tuple[int, int, int]]:
+    """
+    Split rows into chunks: number of chunk, number of its first row and number of rows.
+    """
+    return [(chunk, start, min(chunk_size, total - start)) for chunk, start in enumerate(range(0, total, chunk_size))]
+
+
+def faker(seed: int, table: int, chunk: int) -> Faker:
+    fake = Faker()
+    fake.seed_instance(f"{seed}:{table}:{chunk}")
+    return fake
+
+
+def picked(make: Callable[[], str], pool_size: int, generator: np.random.Generator, shape) -> list:
+    """
+    Values of faker method for every row, drawn from a pool of pool_size of them.
+    """
+    pool = [make() for _ in range(pool_size)]
+    return np.array(pool, dtype=object)[generator.integers(0, len(pool), shape)].tolist()
+
+
+def generate_users(seed: int, chunk: int, start: int, count: int, password_hashes: list[str]) -> list[tuple]:
+    """
+    Rows of users of chunk, username and email are unique because they end with the number of user.
+    """
+    fake = faker(seed, USERS, chunk)
+    generator = np.random.default_rng([seed, ROWS, USERS, chunk])
+    created = timestamps(generator, count)
+    usernames = [
+        f"{name}_{number}"
+        for number, name in enumerate(picked(fake.user_name, min(count, WORDS_POOL), generator, count), start=start)
+    ]
+    domains = picked(fake.free_email_domain, DOMAINS_POOL, generator, count)
+    rows = []
+    for offset, user_id in enumerate(uuids(seed, USERS, chunk, count)):
+        username = usernames[offset]
+        password = password_hashes[(start + offset) % len(password_hashes)]
+        rows.append((user_id, username, password, f"{username}@{domains[offset]}", created[offset], created[offset]))
+    return rows
+
+
+def generate_movies(seed: int, chunk: int, start: int, count: int) -> list[tuple]:
+    """
+    Rows of movies of chunk, title is unique because it ends with the number of movie.
+    """
+    fake = faker(seed, MOVIES, chunk)
+    generator = np.random.default_rng([seed, ROWS, MOVIES, chunk])
+    created = timestamps(generator, count)
+    phrases = picked(fake.catch_phrase, min(count, WORDS_POOL), generator, count)
+    sentences = picked(fake.sentence, min(count, WORDS_POOL), generator, (count, 3))
+    rows = []
+    for offset, movie_id in enumerate(uuids(seed, MOVIES, chunk, count)):
+        title = f"{phrases[offset]} ({start + offset})"
+        rows.append((movie_id, title, " ".join(sentences[offset]), created[offset], created[offset]))
+    return rows
+
+
+@lru_cache(maxsize=1)
+def movie_ids(seed: int, movies: int, chunk_size: int) -> list[UUID]:
+    ids = []
+    for chunk, _, count in chunks(movies, chunk_size):
+        ids.extend(uuids(seed, MOVIES, chunk, count))
+    return ids
+
+
+@lru_cache(maxsize=1)
+def popularity(seed: int, movies: int, skew: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Cumulative distribution of ranks of movies by popularity and number of movie of every rank.
+    """
+    weights = 1 / np.arange(1, movies + 1) ** skew
+    cumulative = np.cumsum(weights / weights.sum())
+    return cumulative, np.random.default_rng([seed, RANKS]).permutation(movies)
+
+
+def generate_favorites(
+    seed: int,
+    chunk: int,
+    count: int,
+    movies: int,
+    favorites: float,
+    skew: float,
+    chunk_size: int,
+) -> list[tuple]:
+    """
+    Favorites of users of chunk without duplicates.
+    """
+    generator = np.random.default_rng([seed, CHOICES, chunk])
+    counts = np.minimum(generator.geometric(1 / favorites, count), movies)
+    cumulative, ranks = popularity(seed, movies, skew)
+    chosen = np.minimum(np.searchsorted(cumulative, generator.random(int(counts.sum())), side="right"), movies - 1)
+    keys = np.unique(np.repeat(np.arange(count, dtype=np.int64), counts) * movies + ranks[chosen])
+    user_ids = uuids(seed, USERS, chunk, count)
+    all_movie_ids = movie_ids(seed, movies, chunk_size)
+    return [(user_ids[key // movies], all_movie_ids[key % movies]) for key in keys.tolist()]
+
+
+async def copy_rows(table: str, columns: tuple[str, ...], rows: list[tuple]) -> None:
+    connection = await asyncpg.connect(**get_settings().database_settings)
+    try:
+        # losing the last commits on crash is fine for generated data
+        await connection.execute("SET synchronous_commit TO off")
+        await connection.copy_records_to_table(table, records=rows, columns=columns)
+    finally:
+        await connection.close()
+
+
+def copy_chunk(kind: int, chunk: int, start: int, count: int, args, password_hashes: list[str]) -> int:
+    """
+    Generate chunk of rows and COPY it, runs in worker process.
+    """
+    if kind == USERS:
+        table, columns = User.__tablename__, USER_COLUMNS
+        rows = generate_users(args.seed, chunk, start, count, password_hashes)
+    elif kind == MOVIES:
+        table, columns = Movie.__tablename__, MOVIE_COLUMNS
+        rows = generate_movies(args.seed, chunk, start, count)
+    else:
+        table, columns = UserMovie.__tablename__, FAVORITE_COLUMNS
+        rows = generate_favorites(args.seed, chunk, count, args.movies, args.favorites, args.skew, args.chunk_size)
+    asyncio.run(copy_rows(table, columns, rows))
+    return len(rows)
+
+
+async def execute(*statements: str) -> None:
+    connection = await asyncpg.connect(**get_settings().database_settings)
+    try:
+        for statement in statements:
+            await connection.execute(statement)
+    finally:
+        await connection.close()
+
+
+def run_chunks(executor: ProcessPoolExecutor, tasks: list[tuple], args, password_hashes: list[str]) -> int:
+    futures = [executor.submit(copy_chunk, *task, args, password_hashes) for task in tasks]
+    return sum(future.result() for future in futures)
+
+
+def main():
+    args = parse_args()
+    started = perf_counter()
+    if args.truncate:
+        tables = (UserMovie, MovieFavoriteCounter, MoviePopularity, Movie, User)
+        asyncio.run(execute(f"TRUNCATE {', '.join(table.__tablename__ for table in tables)}"))
+
+    pwd_context = get_settings().PWD_CONTEXT
+    password_hashes = [pwd_context.hash(PASSWORD_TEMPLATE.format(number)) for number in range(args.passwords)]
+    user_chunks = chunks(args.users, args.chunk_size)
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        tasks = [(USERS, *chunk) for chunk in user_chunks]
+        tasks += [(MOVIES, *chunk) for chunk in chunks(args.movies, args.chunk_size)]
+        rows = run_chunks(executor, tasks, args, password_hashes)
+        print(f"Users and movies: {rows} rows in {perf_counter() - started:.1f} s", file=sys.stderr)
+        if args.movies:
+            rows = run_chunks(executor, [(FAVORITES, *chunk) for chunk in user_chunks], args, password_hashes)
+            print(f"Favorites: {rows} rows in {perf_counter() - started:.1f} s", file=sys.stderr)
+
+    asyncio.run(
+        execute(
+            f"""
+            INSERT INTO {MoviePopularity.__tablename__} (movie_id, favorite_count)
+            SELECT movie_id, count(*) FROM {UserMovie.__tablename__} GROUP BY movie_id
+            ON CONFLICT (movie_id) DO UPDATE SET favorite_count = excluded.favorite_count
+            """,
+            "ANALYZE",
+        )
+    )
+    print(f"Done in {perf_counter() - started:.1f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
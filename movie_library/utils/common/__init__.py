@@ -1,6 +1,64 @@
+from .cache import Generations, TTLCache
+from .errors import violated_constraint
+from .etag import ItemsVersion, etag_matches, make_etag, not_modified
+from .export import stream_ndjson
 from .hostname import get_hostname
+from .orm import attach_snapshot, make_snapshot
+from .pagination import (
+    TOTAL_CACHE,
+    TOTAL_CACHED,
+    TOTAL_ESTIMATED,
+    TOTAL_EXACT,
+    TOTAL_MODES,
+    TOTAL_NONE,
+    count_total,
+    decode_cursor,
+    encode_cursor,
+    estimate_count,
+    paginate_keyset,
+    paginate_offset,
+)
+from .response_cache import MOVIES, RESPONSE_CACHE, ResponseCache, favorites_of
+from .serialization import RowsPage, cursor_page_body, cursor_page_json, dump_items, page_json
+from .single_flight import SINGLE_FLIGHTS, SingleFlight
+from .tinylfu import CountMinSketch, WTinyLFUCache
 
 
 __all__ = [
+    "attach_snapshot",
+    "count_total",
+    "cursor_page_body",
+    "cursor_page_json",
+    "CountMinSketch",
+    "decode_cursor",
+    "dump_items",
+    "encode_cursor",
+    "estimate_count",
+    "etag_matches",
+    "favorites_of",
+    "Generations",
     "get_hostname",
+    "ItemsVersion",
+    "make_etag",
+    "make_snapshot",
+    "MOVIES",
+    "not_modified",
+    "page_json",
+    "paginate_keyset",
+    "paginate_offset",
+    "RESPONSE_CACHE",
+    "ResponseCache",
+    "RowsPage",
+    "SINGLE_FLIGHTS",
+    "SingleFlight",
+    "stream_ndjson",
+    "TOTAL_CACHE",
+    "TOTAL_CACHED",
+    "TOTAL_ESTIMATED",
+    "TOTAL_EXACT",
+    "TOTAL_MODES",
+    "TOTAL_NONE",
+    "TTLCache",
+    "violated_constraint",
+    "WTinyLFUCache",
 ]
@@ -0,0 +1,115 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Hashable
+
+
+class Generations:
+    """
+    Bounded record of the last invalidation of each key, so a value loaded before an invalidation of its key
+    is not cached after it.
+
+    Keys invalidated long ago are forgotten, and loads started before the last forgotten invalidation
+    are treated as stale for any forgotten key.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = max(maxsize, 1)
+        self.clock = 0
+        self._floor = 0
+        self._changed: OrderedDict[Hashable, int] = OrderedDict()
+
+    def bump(self, key: Hashable) -> None:
+        self.clock += 1
+        self._changed[key] = self.clock
+        self._changed.move_to_end(key)
+        while len(self._changed) > self.maxsize:
+            _, self._floor = self._changed.popitem(last=False)
+
+    def bump_all(self) -> None:
+        self.clock += 1
+        self._floor = self.clock
+        self._changed.clear()
+
+    def changed_since(self, key: Hashable, generation: int) -> bool:
+        return self._changed.get(key, self._floor) > generation
+
+
+class TTLCache:
+    """
+    Size-bounded LRU cache whose entries expire after the time to live.
+
+    Entries may be stored with their own time to live, which overrides the default one.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._generations = Generations(maxsize)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at <= monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def generation(self) -> int:
+        """
+        Get generation to pass to set by a load of value, which is taken before the load starts.
+        """
+        return self._generations.clock
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None, generation: int | None = None) -> None:
+        """
+        Cache value. Value loaded since the generation is not cached if the key was popped during the load.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        if generation is not None and self._generations.changed_since(key, generation):
+            return
+        self._data[key] = (monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> Any:
+        self._generations.bump(key)
+        entry = self._data.pop(key, None)
+        return None if entry is None else entry[1]
+
+    def clear(self) -> None:
+        self._generations.bump_all()
+        self._data.clear()
+
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / requests if requests else 0.0,
+        }
+
+
+__all__ = [
+    "Generations",
+    "TTLCache",
+]
@@ -0,0 +1,18 @@
+from sqlalchemy import exc
+
+
+def violated_constraint(error: exc.IntegrityError) -> str | None:
+    """
+    Get name of constraint or unique index violated by the statement, if the driver reports it.
+    """
+    # asyncpg error is the cause of the adapted DBAPI error, psycopg2 keeps it in diagnostics
+    driver_error = error.orig.__cause__ or error.orig
+    name = getattr(driver_error, "constraint_name", None)
+    if name is None and hasattr(driver_error, "diag"):
+        name = driver_error.diag.constraint_name
+    return name
+
+
+__all__ = [
+    "violated_constraint",
+]
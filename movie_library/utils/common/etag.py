@@ -0,0 +1,61 @@
+from hashlib import sha1
+
+from starlette import status
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+def make_etag(*parts, weak: bool = False) -> str:
+    """
+    Make entity tag from parts which identify the version of resource.
+    """
+    digest = sha1("\x1f".join(map(str, parts)).encode(), usedforsecurity=False).hexdigest()
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+class ItemsVersion:
+    """
+    Transformer of page items which remembers their versions before they are converted to response model.
+
+    Versions are made of id and dt_updated of items, so weak entity tag of page is built without serializing it.
+    """
+
+    def __init__(self) -> None:
+        self.versions: list[str] = []
+
+    def __call__(self, items: list) -> list:
+        self.versions = [f"{item.id}@{item.dt_updated.isoformat()}" for item in items]
+        return items
+
+    def etag(self, *parts) -> str:
+        return make_etag(*parts, *self.versions, weak=True)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Check If-None-Match header against entity tag, using weak comparison as RFC 9110 requires.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Response | None:
+    """
+    Get 304 response if client has the current version of resource, otherwise add ETag to the response.
+    """
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return None
+
+
+__all__ = [
+    "etag_matches",
+    "ItemsVersion",
+    "make_etag",
+    "not_modified",
+]
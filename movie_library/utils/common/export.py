@@ -0,0 +1,32 @@
+import json
+from datetime import datetime
+from typing import AsyncIterator
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def _json_default(value) -> str:
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+async def stream_ndjson(session: AsyncSession, query: select, batch_size: int) -> AsyncIterator[bytes]:
+    """
+    Stream rows of the query as NDJSON through server-side cursor.
+
+    Rows are fetched by batch_size and every batch is sent as one chunk,
+    so memory use does not depend on the number of rows.
+    """
+    result = await session.stream(query.execution_options(yield_per=batch_size))
+    try:
+        async for rows in result.mappings().partitions():
+            yield "".join(
+                json.dumps(dict(row), default=_json_default, ensure_ascii=False) + "\n" for row in rows
+            ).encode()
+    finally:
+        await result.close()
+
+
+__all__ = [
+    "stream_ndjson",
+]
@@ -0,0 +1,30 @@
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+
+def make_snapshot(instance) -> dict:
+    """
+    Copy loaded column values of ORM object, so they can be kept outside of the session.
+    """
+    state = inspect(instance)
+    return {attr.key: state.dict[attr.key] for attr in state.mapper.column_attrs if attr.key in state.dict}
+
+
+def attach_snapshot(session: AsyncSession, model, snapshot: dict):
+    """
+    Restore ORM object from snapshot and attach it to the session without querying the database.
+    """
+    instance = model(**snapshot)
+    make_transient_to_detached(instance)
+    existing = session.identity_map.get(inspect(instance).key)
+    if existing is not None:
+        return existing
+    session.add(instance)
+    return instance
+
+
+__all__ = [
+    "attach_snapshot",
+    "make_snapshot",
+]
@@ -0,0 +1,188 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from datetime import datetime
+from typing import Callable, Sequence
+
+from fastapi_pagination.api import create_page, resolve_params
+from fastapi_pagination.bases import AbstractPage
+from pydantic import BaseModel
+from sqlalchemy import Column, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from .cache import TTLCache
+from .serialization import RowsPage
+from movie_library.config import get_settings
+
+
+# modes of counting total number of items for offset pagination
+TOTAL_EXACT = "exact"
+TOTAL_ESTIMATED = "estimated"
+TOTAL_CACHED = "cached"
+TOTAL_NONE = "none"
+TOTAL_MODES = (TOTAL_EXACT, TOTAL_ESTIMATED, TOTAL_CACHED, TOTAL_NONE)
+
+# exact totals, keyed by count query and its parameters
+TOTAL_CACHE = TTLCache(
+    maxsize=get_settings().PAGINATION_TOTAL_CACHE_SIZE,
+    ttl=get_settings().PAGINATION_TOTAL_CACHE_TTL,
+)
+
+
+def encode_cursor(values: Sequence) -> str:
+    """
+    Make opaque cursor from values of sort key.
+    """
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else str(value) for value in values])
+    return urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str, columns: Sequence[Column]) -> tuple:
+    """
+    Get values of sort key from cursor. Raises ValueError if cursor is malformed.
+    """
+    try:
+        values = json.loads(urlsafe_b64decode(cursor.encode()))
+    except (BinasciiError, UnicodeError, json.JSONDecodeError) as error:
+        raise ValueError("Invalid cursor.") from error
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("Invalid cursor.")
+
+    result = []
+    for value, column in zip(values, columns):
+        if not isinstance(value, str):
+            raise ValueError("Invalid cursor.")
+        python_type = column.type.python_type
+        try:
+            result.append(datetime.fromisoformat(value) if python_type is datetime else python_type(value))
+        except (TypeError, ValueError) as error:
+            raise ValueError("Invalid cursor.") from error
+    return tuple(result)
+
+
+async def paginate_keyset(
+    session: AsyncSession,
+    query: select,
+    columns: Sequence[Column],
+    cursor: str | None,
+    size: int,
+    key: Callable | None = None,
+) -> dict:
+    """
+    Get page of items which follow the cursor in order of columns.
+
+    The columns must be unique together and covered by an index, so every page costs the same.
+    By default values of sort key are read from attributes of item with the same names as columns.
+    """
+    if key is None:
+
+        def key(item):
+            return tuple(getattr(item, column.key) for column in columns)
+
+    if cursor is not None:
+        query = query.where(tuple_(*columns) > tuple_(*decode_cursor(cursor, columns)))
+    result = await session.execute(query.order_by(*columns).limit(size + 1))
+    items = list(result.scalars() if len(query.column_descriptions) == 1 else result)
+
+    next_cursor = None
+    if len(items) > size:
+        items = items[:size]
+        next_cursor = encode_cursor(key(items[-1]))
+    return {"items": items, "size": size, "next_cursor": next_cursor}
+
+
+class Explain(Executable, ClauseElement):
+    """
+    EXPLAIN (FORMAT JSON) of the query, which keeps parameters of the query bound.
+    """
+
+    inherit_cache = False
+
+    def __init__(self, query: select) -> None:
+        self.query = query
+
+
+@compiles(Explain, "postgresql")
+def compile_explain(element: Explain, compiler, **kwargs) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.query, **kwargs)
+
+
+async def estimate_count(session: AsyncSession, query: select) -> int:
+    """
+    Get number of rows of the query estimated by the planner, without executing the query.
+
+    For query without conditions the estimate comes from pg_class.reltuples, so it is as fresh as the last ANALYZE.
+    """
+    plan = await session.scalar(Explain(query))
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_total(session: AsyncSession, query: select, mode: str) -> tuple[int | None, bool]:
+    """
+    Get total number of items of the query and whether it is exact.
+    """
+    if mode not in TOTAL_MODES:
+        raise ValueError(f"Unknown total mode {mode!r}, expected one of {TOTAL_MODES}.")
+    if mode == TOTAL_NONE:
+        return None, False
+    query = query.order_by(None)
+    if mode == TOTAL_ESTIMATED:
+        return await estimate_count(session, query), False
+
+    count_query = select(func.count()).select_from(query.subquery())
+    if mode == TOTAL_EXACT:
+        return await session.scalar(count_query), True
+
+    compiled = count_query.compile()
+    key = str(compiled), tuple(sorted(compiled.params.items()))
+    total = TOTAL_CACHE.get(key)
+    if total is None:
+        total = await session.scalar(count_query)
+        TOTAL_CACHE.set(key, total)
+    return total, False
+
+
+async def paginate_offset(
+    session: AsyncSession,
+    query: select,
+    total_mode: str = TOTAL_EXACT,
+    transformer: Callable | None = None,
+    model: type[BaseModel] | None = None,
+) -> AbstractPage | RowsPage:
+    """
+    Get page of items by page number and size, counting total number of items in the given mode.
+
+    The page must have total_exact field, which tells whether total is exact.
+    If model is given, items are not validated and the page is RowsPage serialized as page of the model.
+    """
+    params = resolve_params()
+    raw_params = params.to_raw_params()
+    total, total_exact = await count_total(session, query, total_mode)
+
+    result = await session.execute(query.limit(raw_params.limit).offset(raw_params.offset))
+    items = list(result.scalars() if len(query.column_descriptions) == 1 else result)
+    if transformer is not None:
+        items = transformer(items)
+    if model is not None:
+        return RowsPage(items, model, total=total, page=params.page, size=params.size, total_exact=total_exact)
+    return create_page(items, total=total, params=params, total_exact=total_exact)
+
+
+__all__ = [
+    "count_total",
+    "decode_cursor",
+    "encode_cursor",
+    "estimate_count",
+    "paginate_keyset",
+    "paginate_offset",
+    "TOTAL_CACHE",
+    "TOTAL_CACHED",
+    "TOTAL_ESTIMATED",
+    "TOTAL_EXACT",
+    "TOTAL_MODES",
+    "TOTAL_NONE",
+]
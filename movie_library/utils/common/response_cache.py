@@ -0,0 +1,109 @@
+from collections import defaultdict
+from time import monotonic
+from typing import Awaitable, Callable, Hashable, Sequence
+
+from starlette import status
+from starlette.requests import Request
+from starlette.responses import Response
+
+from .cache import TTLCache
+from .etag import etag_matches
+from .single_flight import SingleFlight
+from movie_library.config import get_settings
+
+
+# version of collection of all movies
+MOVIES = "movies"
+
+
+def favorites_of(user_id) -> tuple:
+    """
+    Get version key of collection of favorite movies of the user.
+    """
+    return "favorites", user_id
+
+
+class ResponseCache:
+    """
+    Cache of serialized JSON responses with their entity tags.
+
+    Keys include versions of collections the response was built from, so bumping the version
+    makes all responses built from the collection unreachable, and they are evicted in time.
+
+    Responses are not cached for settle seconds after their collections change,
+    so a response read from a lagging replica does not outlive the lag.
+    Concurrent misses of settled responses with the same key wait for one build.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, settle: float = 0, flight: SingleFlight | None = None) -> None:
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._flight = flight
+        self._versions: defaultdict[Hashable, int] = defaultdict(int)
+        self._changed_at: dict[Hashable, float] = {}
+        self.settle = settle
+
+    def bump(self, *collections: Hashable) -> None:
+        for collection in collections:
+            self._versions[collection] += 1
+            self._changed_at[collection] = monotonic()
+
+    def settled(self, *collections: Hashable) -> bool:
+        """
+        Check that none of the collections has changed for settle seconds.
+        """
+        changed_at = max((self._changed_at.get(collection, float("-inf")) for collection in collections), default=None)
+        return changed_at is None or monotonic() - changed_at >= self.settle
+
+    def key(self, request: Request, collections: Sequence[Hashable]) -> tuple:
+        params = tuple(sorted(request.query_params.multi_items()))
+        versions = tuple((collection, self._versions.get(collection, 0)) for collection in collections)
+        return request.url.path, params, versions
+
+    async def respond(
+        self,
+        request: Request,
+        collections: Sequence[Hashable],
+        build: Callable[[], Awaitable[tuple[bytes, str]]],
+    ) -> Response:
+        """
+        Get cached response, or build the body and entity tag of response and cache them.
+        """
+        key = self.key(request, collections)
+        entry = self._cache.get(key)
+        if entry is None:
+            # while responses are not settled, readers of the primary must not wait for a read from a replica
+            if self._flight is not None and self.settled(*collections):
+                entry = await self._flight.do(key, build)
+            else:
+                entry = await build()
+            if self.settled(*collections):
+                self._cache.set(key, entry)
+
+        body, etag = entry
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._versions.clear()
+        self._changed_at.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+RESPONSE_CACHE = ResponseCache(
+    maxsize=get_settings().RESPONSE_CACHE_SIZE,
+    ttl=get_settings().RESPONSE_CACHE_TTL,
+    settle=get_settings().DB_REPLICA_MAX_LAG if get_settings().replica_uris else 0,
+    flight=SingleFlight("responses", timeout=get_settings().SINGLE_FLIGHT_TIMEOUT),
+)
+
+
+__all__ = [
+    "favorites_of",
+    "MOVIES",
+    "RESPONSE_CACHE",
+    "ResponseCache",
+]
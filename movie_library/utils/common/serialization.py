@@ -0,0 +1,120 @@
+from math import ceil
+from typing import Any, Awaitable, Callable, Sequence
+from uuid import UUID
+
+import orjson
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+
+from .etag import ItemsVersion
+from movie_library.schemas import CursorPage
+
+
+def encode_default(value: Any) -> str:
+    """
+    Encode values which orjson does not know. It only takes exact uuid.UUID, not its subclasses such as UUID of asyncpg.
+    """
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError
+
+
+def dump_items(items: Sequence, model: type[BaseModel]) -> list[dict]:
+    """
+    Read fields of flat response model from attributes of rows, without validating them.
+    """
+    fields = tuple(model.__fields__)
+    return [{field: getattr(item, field) for field in fields} for item in items]
+
+
+class RowsPage:
+    """
+    Page of rows which is serialized straight to JSON, with the same fields as the page of response model
+    serialized by pydantic. UUIDs and timestamps are encoded by orjson, rows are not validated.
+    """
+
+    def __init__(
+        self,
+        items: Sequence,
+        model: type[BaseModel],
+        total: int | None,
+        page: int | None,
+        size: int | None,
+        **extra,
+    ) -> None:
+        self.items = items
+        self.model = model
+        self.total = total
+        self.size = size if size is not None else (total or None)
+        self.page = page if page is not None else 1
+        if self.size in {0, None}:
+            self.pages = 0
+        else:
+            self.pages = ceil(total / self.size) if total is not None else None
+        self.extra = extra
+
+    def dumps(self) -> bytes:
+        return orjson.dumps(
+            {
+                "items": dump_items(self.items, self.model),
+                "total": self.total,
+                "page": self.page,
+                "size": self.size,
+                "pages": self.pages,
+                **self.extra,
+            },
+            default=encode_default,
+        )
+
+
+def page_json(page) -> bytes:
+    """
+    Serialize page of offset pagination, either RowsPage or pydantic page.
+    """
+    if isinstance(page, RowsPage):
+        return page.dumps()
+    return page.json().encode()
+
+
+def cursor_page_json(page: dict, model: type[BaseModel], fast: bool = False) -> bytes:
+    """
+    Serialize page of keyset pagination as CursorPage of the model, straight from rows if fast.
+    """
+    if fast:
+        return orjson.dumps(
+            {"items": dump_items(page["items"], model), "size": page["size"], "next_cursor": page["next_cursor"]},
+            default=encode_default,
+        )
+    return CursorPage[model].parse_obj(page).json().encode()
+
+
+async def cursor_page_body(
+    load: Callable[[], Awaitable[dict]],
+    model: type[BaseModel],
+    cursor: str | None,
+    size: int,
+    fast: bool = False,
+) -> tuple[bytes, str]:
+    """
+    Load page of keyset pagination and serialize it, with ETag of its items. Invalid cursor is 400.
+    """
+    try:
+        page = await load()
+    except ValueError as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(error),
+        ) from error
+    version = ItemsVersion()
+    version(page["items"])
+    return cursor_page_json(page, model, fast=fast), version.etag(cursor, size, page["next_cursor"])
+
+
+__all__ = [
+    "cursor_page_body",
+    "cursor_page_json",
+    "dump_items",
+    "encode_default",
+    "page_json",
+    "RowsPage",
+]
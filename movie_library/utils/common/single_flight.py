@@ -0,0 +1,79 @@
+from asyncio import CancelledError, Future, get_running_loop, shield, wait_for
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Coalescing of identical concurrent calls: while a call with the key is in flight,
+    callers with the same key await its result instead of making their own call.
+
+    Caller which waited for timeout seconds, or whose call in flight was cancelled, makes its own call.
+    Zero timeout disables coalescing. Results are shared between callers, so they should not be bound
+    to the session of the first caller.
+    """
+
+    def __init__(self, name: str, timeout: float) -> None:
+        self.name = name
+        self.timeout = timeout
+        self._calls: dict[Hashable, Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        SINGLE_FLIGHTS[name] = self
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        if self.timeout <= 0:
+            return await call()
+
+        future = self._calls.get(key)
+        if future is not None:
+            self.coalesced += 1
+            try:
+                return await wait_for(shield(future), self.timeout)
+            except TimeoutError:
+                self.timeouts += 1
+            except CancelledError:
+                if not future.cancelled():
+                    raise
+            return await call()
+
+        future = get_running_loop().create_future()
+        self._calls[key] = future
+        self.leaders += 1
+        try:
+            result = await call()
+        except Exception as error:
+            future.set_exception(error)
+            # the exception is raised here, followers may not exist to retrieve it from the future
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "timeouts": self.timeouts,
+        }
+
+
+# all single flights by name, for metrics
+SINGLE_FLIGHTS: dict[str, SingleFlight] = {}
+
+
+__all__ = [
+    "SINGLE_FLIGHTS",
+    "SingleFlight",
+]
@@ -0,0 +1,227 @@
+import sys
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Hashable
+
+from .cache import Generations
+
+
+# multipliers which spread hash of key over rows of sketch
+SKETCH_SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+SKETCH_COUNTER_MAX = 15
+HALVE = bytes(value >> 1 for value in range(256))
+
+
+def approximate_size(value: Any) -> int:
+    """
+    Get approximate size of value in bytes, including keys and values of dictionary.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(sys.getsizeof(key) + sys.getsizeof(item) for key, item in value.items())
+    return size
+
+
+class CountMinSketch:
+    """
+    Approximate frequency of keys in small saturating counters.
+
+    After sample_size increments all counters are halved, so popularity of keys fades away with time.
+    """
+
+    def __init__(self, width: int, sample_size: int) -> None:
+        self.width = 1 << max(width - 1, 1).bit_length()
+        self.sample_size = sample_size
+        self.table = [bytearray(self.width) for _ in SKETCH_SEEDS]
+        self.additions = 0
+        self.resets = 0
+
+    def _indexes(self, key: Hashable):
+        key_hash = hash(key)
+        for seed in SKETCH_SEEDS:
+            yield ((key_hash * seed) & 0xFFFFFFFFFFFFFFFF) >> 32 & (self.width - 1)
+
+    def increment(self, key: Hashable) -> None:
+        added = False
+        for row, index in zip(self.table, self._indexes(key)):
+            if row[index] < SKETCH_COUNTER_MAX:
+                row[index] += 1
+                added = True
+        if added:
+            self.additions += 1
+            if self.additions >= self.sample_size:
+                self.reset()
+
+    def estimate(self, key: Hashable) -> int:
+        return min(row[index] for row, index in zip(self.table, self._indexes(key)))
+
+    def reset(self) -> None:
+        for row in self.table:
+            row[:] = row.translate(HALVE)
+        self.additions //= 2
+        self.resets += 1
+
+    def clear(self) -> None:
+        for row in self.table:
+            row[:] = bytes(self.width)
+        self.additions = 0
+
+    def memory(self) -> int:
+        return sum(sys.getsizeof(row) for row in self.table)
+
+
+class WTinyLFUCache:
+    """
+    Size-bounded cache with W-TinyLFU admission and eviction policy, whose entries expire after the time to live.
+
+    New entries get into small LRU window. Entries evicted from the window are admitted into main
+    segmented LRU only if they were requested more often than its eviction candidate, so a burst
+    of rarely requested keys cannot flush frequently requested ones.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, window_ratio: float = 0.01, protected_ratio: float = 0.8) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.window_size = min(maxsize, max(1, round(maxsize * window_ratio)))
+        self.main_size = maxsize - self.window_size
+        self.protected_size = int(self.main_size * protected_ratio)
+        self._window: OrderedDict[Hashable, tuple[float, Any, int]] = OrderedDict()
+        self._probation: OrderedDict[Hashable, tuple[float, Any, int]] = OrderedDict()
+        self._protected: OrderedDict[Hashable, tuple[float, Any, int]] = OrderedDict()
+        self._sketch = CountMinSketch(width=max(maxsize, 16), sample_size=10 * max(maxsize, 16))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejections = 0
+        self.entries_memory = 0
+        self._generations = Generations(maxsize)
+
+    def __len__(self) -> int:
+        return len(self._window) + len(self._probation) + len(self._protected)
+
+    def _segment(self, key: Hashable) -> OrderedDict | None:
+        for segment in (self._window, self._probation, self._protected):
+            if key in segment:
+                return segment
+        return None
+
+    def _remove(self, segment: OrderedDict, key: Hashable) -> Any:
+        _, value, size = segment.pop(key)
+        self.entries_memory -= size
+        return value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        self._sketch.increment(key)
+        segment = self._segment(key)
+        if segment is None:
+            self.misses += 1
+            return default
+        expires_at, value, _ = segment[key]
+        if expires_at <= monotonic():
+            self._remove(segment, key)
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        if segment is self._probation:
+            self._protected[key] = self._probation.pop(key)
+            while len(self._protected) > self.protected_size:
+                demoted_key, demoted = self._protected.popitem(last=False)
+                self._probation[demoted_key] = demoted
+        else:
+            segment.move_to_end(key)
+        return value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get value without recording the request, for lookups which precede a get of the same key.
+        """
+        segment = self._segment(key)
+        if segment is None:
+            return default
+        expires_at, value, _ = segment[key]
+        return value if expires_at > monotonic() else default
+
+    def generation(self) -> int:
+        """
+        Get generation to pass to set by a load of value, which is taken before the load starts.
+        """
+        return self._generations.clock
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None, generation: int | None = None) -> None:
+        """
+        Cache value. Value loaded since the generation is not cached if the key was popped during the load.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        if generation is not None and self._generations.changed_since(key, generation):
+            return
+        entry = (monotonic() + ttl, value, approximate_size(value))
+        self.entries_memory += entry[2]
+
+        segment = self._segment(key)
+        if segment is not None:
+            self.entries_memory -= segment[key][2]
+            segment[key] = entry
+            segment.move_to_end(key)
+            return
+
+        self._window[key] = entry
+        if len(self._window) > self.window_size:
+            candidate_key, candidate = self._window.popitem(last=False)
+            self._admit(candidate_key, candidate)
+
+    def _admit(self, key: Hashable, entry: tuple[float, Any, int]) -> None:
+        if len(self._probation) + len(self._protected) < self.main_size:
+            self._probation[key] = entry
+            return
+
+        self.evictions += 1
+        victims = self._probation or self._protected
+        victim_key = next(iter(victims), None)
+        if victim_key is not None and self._sketch.estimate(key) > self._sketch.estimate(victim_key):
+            self._remove(victims, victim_key)
+            self._probation[key] = entry
+        else:
+            self.rejections += 1
+            self.entries_memory -= entry[2]
+
+    def pop(self, key: Hashable) -> Any:
+        self._generations.bump(key)
+        segment = self._segment(key)
+        return None if segment is None else self._remove(segment, key)
+
+    def clear(self) -> None:
+        self._generations.bump_all()
+        for segment in (self._window, self._probation, self._protected):
+            segment.clear()
+        self._sketch.clear()
+        self.entries_memory = 0
+
+    def memory(self) -> int:
+        segments = sum(sys.getsizeof(segment) for segment in (self._window, self._probation, self._protected))
+        return self.entries_memory + segments + self._sketch.memory()
+
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+        return {
+            "size": len(self),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / requests if requests else 0.0,
+            "memory": self.memory(),
+            "window": len(self._window),
+            "probation": len(self._probation),
+            "protected": len(self._protected),
+            "rejections": self.rejections,
+            "sketch_resets": self._sketch.resets,
+        }
+
+
+__all__ = [
+    "CountMinSketch",
+    "WTinyLFUCache",
+]
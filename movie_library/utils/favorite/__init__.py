@@ -1,8 +1,25 @@
-from .database import add_favorite, delete_favorite, get_favorites_query
+from .counters import count_favorites, counter_shard, merge_favorite_counters, merge_favorite_counters_periodically
+from .database import (
+    add_favorite,
+    add_favorites,
+    delete_favorite,
+    delete_favorites,
+    export_favorites_query,
+    get_favorites_cursor_page,
+    get_favorites_query,
+)
 
 
 __all__ = [
+    "count_favorites",
+    "counter_shard",
+    "merge_favorite_counters",
+    "merge_favorite_counters_periodically",
     "add_favorite",
+    "add_favorites",
     "delete_favorite",
+    "delete_favorites",
     "get_favorites_query",
+    "get_favorites_cursor_page",
+    "export_favorites_query",
 ]
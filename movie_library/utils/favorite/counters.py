@@ -0,0 +1,95 @@
+from asyncio import sleep
+from logging import getLogger
+
+from sqlalchemy import TEXT, ColumnElement, cast, func, literal, select, text
+from sqlalchemy.dialects.postgresql import BIGINT, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from movie_library.config import get_settings
+from movie_library.db.connection import SessionManager
+from movie_library.db.models import MovieFavoriteCounter
+
+
+logger = getLogger(__name__)
+
+# moves a batch of deltas into popularity, skipping counters which are being updated right now
+MERGE_COUNTERS = text(
+    """
+    WITH drained AS (
+        DELETE FROM movie_favorite_counters
+        WHERE (movie_id, shard) IN (
+            SELECT movie_id, shard FROM movie_favorite_counters LIMIT :limit FOR UPDATE SKIP LOCKED
+        )
+        RETURNING movie_id, delta
+    ), merged AS (
+        INSERT INTO movie_popularity (movie_id, favorite_count)
+        SELECT movie_id, sum(delta) FROM drained GROUP BY movie_id ORDER BY movie_id
+        ON CONFLICT (movie_id) DO UPDATE
+        SET favorite_count = movie_popularity.favorite_count + excluded.favorite_count
+    )
+    SELECT count(*) FROM drained
+    """
+)
+
+
+def counter_shard(user_id: ColumnElement) -> ColumnElement:
+    """
+    Get shard of favorite counters for the user, so different users rarely update the same row.
+    """
+    return func.abs(func.mod(func.hashtext(cast(user_id, TEXT)), get_settings().FAVORITE_COUNTER_SHARDS))
+
+
+def count_favorites(favorites: select, delta: int) -> insert:
+    """
+    Get statement which adds delta to favorite counters of movies from the query of movie_id and user_id pairs.
+
+    Counters are updated in order of their keys, so concurrent statements do not deadlock.
+    """
+    movie_id, user_id = favorites.subquery().c
+    rows = select(movie_id, counter_shard(user_id).label("shard"), literal(delta, BIGINT))
+    statement = insert(MovieFavoriteCounter).from_select(
+        [MovieFavoriteCounter.movie_id, MovieFavoriteCounter.shard, MovieFavoriteCounter.delta],
+        rows.order_by(movie_id, "shard"),
+    )
+    return statement.on_conflict_do_update(
+        index_elements=[MovieFavoriteCounter.movie_id, MovieFavoriteCounter.shard],
+        set_={"delta": MovieFavoriteCounter.delta + statement.excluded.delta},
+    )
+
+
+async def merge_favorite_counters(session: AsyncSession, batch_size: int) -> int:
+    """
+    Merge all pending deltas of favorite counters into popularity of movies.
+
+    Deltas are merged in batches, each in its own transaction. Returns number of merged deltas.
+    """
+    merged = 0
+    while True:
+        drained = await session.scalar(MERGE_COUNTERS, {"limit": batch_size})
+        await session.commit()
+        merged += drained
+        if drained < batch_size:
+            return merged
+
+
+async def merge_favorite_counters_periodically(interval: float, batch_size: int) -> None:
+    """
+    Merge deltas of favorite counters into popularity of movies every interval seconds, until cancelled.
+    """
+    session_maker = SessionManager().get_session_maker()
+    while True:
+        await sleep(interval)
+        try:
+            async with session_maker() as session:
+                await merge_favorite_counters(session, batch_size)
+        except Exception:  # pylint: disable=broad-exception-caught
+            # a failed merge must not stop merging, CancelledError is not an Exception and still stops it
+            logger.exception("Could not merge favorite counters.")
+
+
+__all__ = [
+    "count_favorites",
+    "counter_shard",
+    "merge_favorite_counters",
+    "merge_favorite_counters_periodically",
+]
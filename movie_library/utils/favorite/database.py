@@ -1,43 +1,126 @@
 import datetime
+from uuid import UUID
 
 from pydantic import UUID4
-from sqlalchemy import and_, delete, exc, select, update
+from sqlalchemy import and_, any_, delete, exc, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import UUID as PostgresUUID
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from .counters import count_favorites
 from movie_library.db.models import Movie, User, UserMovie
 from movie_library.schemas import Movie as MovieSchema
 from movie_library.schemas import User as UserSchema
-from movie_library.utils.movie import get_movie
+from movie_library.utils.common import RESPONSE_CACHE, favorites_of, paginate_keyset
+from movie_library.utils.movie import MOVIE_COLUMNS
+from movie_library.utils.recommendation import SIMILARITY_INDEX
 
 
-async def add_favorite(session: AsyncSession, user: User, movie_id: UUID4) -> bool | None:
-    movie = await get_movie(session, movie_id)
-    if movie is None:
-        return None
+def movie_ids_array(movie_ids: list[UUID4]) -> literal:
+    return literal([UUID(str(movie_id)) for movie_id in movie_ids], ARRAY(PostgresUUID(as_uuid=True)))
 
-    query = select(UserMovie).where(and_(UserMovie.user_id == user.id, UserMovie.movie_id == movie_id))
-    favorite = await session.scalar(query)
 
-    print("lala", favorite)
-    if favorite is not None:
-        return False
+async def add_favorites(session: AsyncSession, user: User, movie_ids: list[UUID4]) -> dict:
+    """
+    Add movies to favorites of the user with one statement.
 
-    session.add(
-        UserMovie(
-            user_id=user.id,
-            movie_id=movie.id,
+    Returns ids of movies which were added, which were already in favorites and which do not exist.
+    Favorite counters of added movies are incremented in the same statement,
+    and additions are recorded for the index of similar movies.
+    """
+    movie_ids = list(dict.fromkeys(UUID(str(movie_id)) for movie_id in movie_ids))
+    requested = movie_ids_array(movie_ids)
+    existing = select(Movie.id).where(Movie.id == any_(requested)).cte("existing")
+    inserted = (
+        insert(UserMovie)
+        .from_select(
+            [UserMovie.user_id, UserMovie.movie_id],
+            select(literal(user.id, PostgresUUID(as_uuid=True)), existing.c.id),
         )
+        .on_conflict_do_nothing()
+        .returning(UserMovie.movie_id, UserMovie.user_id)
+        .cte("inserted")
+    )
+    counted = count_favorites(select(inserted.c.movie_id, inserted.c.user_id), 1).cte("counted")
+    query = (
+        select(existing.c.id, inserted.c.movie_id)
+        .outerjoin(inserted, inserted.c.movie_id == existing.c.id)
+        .add_cte(counted)
     )
+    rows = (await session.execute(query)).all()
     await session.commit()
-    return True
+    RESPONSE_CACHE.bump(favorites_of(user.id))
 
+    added = {row.id for row in rows if row.movie_id is not None}
+    present = {row.id for row in rows if row.movie_id is None}
+    SIMILARITY_INDEX.record(user.id, list(added), 1)
+    return {
+        "added": [movie_id for movie_id in movie_ids if movie_id in added],
+        "present": [movie_id for movie_id in movie_ids if movie_id in present],
+        "missing": [movie_id for movie_id in movie_ids if movie_id not in added and movie_id not in present],
+    }
 
-async def delete_favorite(session: AsyncSession, user: User, movie_id: UUID4) -> int:
-    query = delete(UserMovie).where(and_(UserMovie.user_id == user.id, UserMovie.movie_id == movie_id))
-    result = await session.execute(query)
+
+async def delete_favorites(session: AsyncSession, user: User, movie_ids: list[UUID4]) -> dict:
+    """
+    Remove movies from favorites of the user with one statement.
+
+    Returns ids of movies which were removed and which were not in favorites.
+    Favorite counters of removed movies are decremented in the same statement,
+    and removals are recorded for the index of similar movies.
+    """
+    movie_ids = list(dict.fromkeys(UUID(str(movie_id)) for movie_id in movie_ids))
+    deleted = (
+        delete(UserMovie)
+        .where(and_(UserMovie.user_id == user.id, UserMovie.movie_id == any_(movie_ids_array(movie_ids))))
+        .returning(UserMovie.movie_id, UserMovie.user_id)
+        .cte("deleted")
+    )
+    counted = count_favorites(select(deleted.c.movie_id, deleted.c.user_id), -1).cte("counted")
+    removed = set(await session.scalars(select(deleted.c.movie_id).add_cte(counted)))
     await session.commit()
-    return result.rowcount
+    RESPONSE_CACHE.bump(favorites_of(user.id))
+    SIMILARITY_INDEX.record(user.id, list(removed), -1)
+    return {
+        "removed": [movie_id for movie_id in movie_ids if movie_id in removed],
+        "missing": [movie_id for movie_id in movie_ids if movie_id not in removed],
+    }
+
+
+async def add_favorite(session: AsyncSession, user: User, movie_id: UUID4) -> bool | None:
+    try:
+        result = await add_favorites(session, user, [movie_id])
+    except ValueError:
+        return None
+    if result["missing"]:
+        return None
+    return bool(result["added"])
+
+
+async def delete_favorite(session: AsyncSession, user: User, movie_id: UUID4) -> int:
+    result = await delete_favorites(session, user, [movie_id])
+    return len(result["removed"])
+
+
+async def get_favorites_query(session: AsyncSession, user: User, projection: bool = False) -> select:
+    """
+    Get query of favorite movies of the user as ORM objects or, in projection mode, as rows of MOVIE_COLUMNS.
+    """
+    query = select(*MOVIE_COLUMNS) if projection else select(Movie)
+    return query.join(UserMovie).where(UserMovie.user_id == user.id)
+
+
+def export_favorites_query(user: User) -> select:
+    return select(*MOVIE_COLUMNS).join(UserMovie).where(UserMovie.user_id == user.id)
 
 
-async def get_favorites_query(session: AsyncSession, user: User) -> select:
-    return select(Movie).join(UserMovie).where(UserMovie.user_id == user.id)
+async def get_favorites_cursor_page(
+    session: AsyncSession,
+    user: User,
+    cursor: str | None,
+    size: int,
+    projection: bool = False,
+) -> dict:
+    query = await get_favorites_query(session, user, projection)
+    return await paginate_keyset(session, query, (UserMovie.movie_id,), cursor, size, key=lambda movie: (movie.id,))
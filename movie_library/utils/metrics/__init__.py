@@ -0,0 +1,18 @@
+from .database import collect_database_stats
+from .http import MetricsMiddleware
+from .loop import monitor_event_loop_lag
+from .registry import REGISTRY, Counter, Gauge, Histogram, Registry
+from .single_flight import collect_single_flight_stats
+
+
+__all__ = [
+    "collect_database_stats",
+    "collect_single_flight_stats",
+    "MetricsMiddleware",
+    "monitor_event_loop_lag",
+    "REGISTRY",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "Registry",
+]
@@ -0,0 +1,40 @@
+from .registry import REGISTRY
+from movie_library.db.connection import SessionManager
+
+
+POOL_CONNECTIONS = REGISTRY.gauge("db_pool_connections", "Connections of pool by state.", ("host", "state"))
+POOL_CHECKOUTS = REGISTRY.counter("db_pool_checkouts_total", "Checkouts of connections from pool.", ("host",))
+POOL_WAIT_TOTAL = REGISTRY.counter("db_pool_wait_seconds_total", "Time waited for connections from pool.", ("host",))
+POOL_WAIT = REGISTRY.gauge("db_pool_wait_seconds", "Longest and average wait for connections.", ("host", "stat"))
+REPLICA_LAG = REGISTRY.gauge("db_replica_lag_seconds", "Last measured lag of replica, -1 if unknown.", ("host",))
+REPLICA_AVAILABLE = REGISTRY.gauge("db_replica_available", "Whether replica is in rotation.", ("host",))
+
+
+def observe_pool(host: str, stats: dict) -> None:
+    for state in ("size", "checked_out", "idle", "overflow"):
+        POOL_CONNECTIONS.labels(host, state).set(stats[state])
+    POOL_CHECKOUTS.labels(host).set(stats["checkouts"])
+    POOL_WAIT_TOTAL.labels(host).set(stats["wait_total"])
+    for stat in ("wait_max", "wait_avg"):
+        POOL_WAIT.labels(host, stat).set(stats[stat])
+
+
+def collect_database_stats() -> None:
+    """
+    Read statistics of pools of the primary and replicas into counters and gauges.
+    """
+    manager = SessionManager()
+    observe_pool("primary", manager.pool_stats())
+    for replica in manager.replica_stats():
+        host = str(replica["host"])
+        observe_pool(host, replica)
+        REPLICA_LAG.labels(host).set(-1 if replica["lag"] is None else replica["lag"])
+        REPLICA_AVAILABLE.labels(host).set(int(replica["available"]))
+
+
+REGISTRY.add_collector(collect_database_stats)
+
+
+__all__ = [
+    "collect_database_stats",
+]
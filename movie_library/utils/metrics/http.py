@@ -0,0 +1,115 @@
+from time import perf_counter
+from typing import Iterable
+
+from fastapi.routing import APIRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .registry import REGISTRY
+from movie_library.db.connection import REQUEST_STATS
+
+
+REQUEST_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Time from receiving request to sending the whole response.",
+    ("method", "route"),
+)
+RESPONSES = REGISTRY.counter("http_responses_total", "Responses by status code.", ("method", "route", "status"))
+REQUESTS_IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "Requests being handled right now.")
+DB_STATEMENTS = REGISTRY.counter(
+    "http_db_statements_total",
+    "Database statements executed by requests.",
+    ("method", "route"),
+)
+DB_TIME = REGISTRY.counter(
+    "http_db_seconds_total",
+    "Time spent by requests in database statements.",
+    ("method", "route"),
+)
+
+# labels of requests which did not match any route, so unknown paths and methods do not create new time series
+UNMATCHED_ROUTE = "unmatched"
+KNOWN_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+
+class RouteMetrics:
+    """
+    Time series of one route and method, resolved once and reused by all its requests.
+    """
+
+    def __init__(self, method: str, route: str) -> None:
+        self.method = method
+        self.route = route
+        self.latency = REQUEST_LATENCY.labels(method, route)
+        self.db_statements = DB_STATEMENTS.labels(method, route)
+        self.db_time = DB_TIME.labels(method, route)
+        self.responses = {}
+
+    def observe(self, status: int, elapsed: float) -> None:
+        self.latency.observe(elapsed)
+        responses = self.responses.get(status)
+        if responses is None:
+            responses = self.responses[status] = RESPONSES.labels(self.method, self.route, str(status))
+        responses.inc()
+        stats = REQUEST_STATS.get()
+        if stats is not None:
+            self.db_statements.inc(stats.statements)
+            self.db_time.inc(stats.db_time)
+
+
+class MetricsMiddleware:
+    """
+    Measure latency, status codes and requests in flight for every route.
+
+    Time series of routes are created before the first request, so requests only update numbers.
+    Requests are labeled by route template, not by path, so path parameters do not create time series.
+    """
+
+    def __init__(self, app: ASGIApp, routes: Iterable = ()) -> None:
+        self.app = app
+        self.in_flight = REQUESTS_IN_FLIGHT.labels()
+        self.unmatched: dict[str, RouteMetrics] = {}
+        # routes are not hashable, so they are found by identity
+        self.routes: dict[int, dict[str, RouteMetrics]] = {}
+        for route in routes:
+            if isinstance(route, APIRoute):
+                self.routes[id(route)] = {method: RouteMetrics(method, route.path) for method in route.methods}
+
+    def route_metrics(self, scope: Scope) -> RouteMetrics:
+        method = scope["method"]
+        metrics = self.routes.get(id(scope.get("route")), self.unmatched).get(method)
+        if metrics is None:
+            method = method if method in KNOWN_METHODS else "OTHER"
+            metrics = self.unmatched.get(method)
+            if metrics is None:
+                metrics = self.unmatched[method] = RouteMetrics(method, UNMATCHED_ROUTE)
+        return metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = perf_counter()
+        self.in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.in_flight.dec()
+            self.route_metrics(scope).observe(status, perf_counter() - started)
+
+
+__all__ = [
+    "MetricsMiddleware",
+    "REQUEST_LATENCY",
+    "REQUESTS_IN_FLIGHT",
+    "RESPONSES",
+    "RouteMetrics",
+]
@@ -0,0 +1,28 @@
+from asyncio import sleep
+from time import perf_counter
+
+from .registry import REGISTRY
+
+
+EVENT_LOOP_LAG = REGISTRY.histogram(
+    "event_loop_lag_seconds",
+    "How much later than scheduled the event loop woke up a sleeping task.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+
+async def monitor_event_loop_lag(interval: float) -> None:
+    """
+    Sleep for interval seconds and measure how late the event loop wakes up, until cancelled.
+    """
+    lag = EVENT_LOOP_LAG.labels()
+    while True:
+        started = perf_counter()
+        await sleep(interval)
+        lag.observe(max(perf_counter() - started - interval, 0.0))
+
+
+__all__ = [
+    "EVENT_LOOP_LAG",
+    "monitor_event_loop_lag",
+]
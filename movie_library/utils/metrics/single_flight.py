@@ -0,0 +1,29 @@
+from .registry import REGISTRY
+from movie_library.utils.common import SINGLE_FLIGHTS
+
+
+SINGLE_FLIGHT_CALLS = REGISTRY.counter(
+    "single_flight_calls_total",
+    "Calls of single flight: leaders made the call, coalesced waited for it, timeouts gave up waiting.",
+    ("name", "outcome"),
+)
+SINGLE_FLIGHT_IN_FLIGHT = REGISTRY.gauge("single_flight_in_flight", "Calls of single flight in flight.", ("name",))
+
+
+def collect_single_flight_stats() -> None:
+    """
+    Read statistics of single flights into counters and gauges.
+    """
+    for name, flight in SINGLE_FLIGHTS.items():
+        stats = flight.stats()
+        for outcome in ("leaders", "coalesced", "timeouts"):
+            SINGLE_FLIGHT_CALLS.labels(name, outcome).set(stats[outcome])
+        SINGLE_FLIGHT_IN_FLIGHT.labels(name).set(stats["in_flight"])
+
+
+REGISTRY.add_collector(collect_single_flight_stats)
+
+
+__all__ = [
+    "collect_single_flight_stats",
+]
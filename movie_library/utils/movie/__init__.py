@@ -1,10 +1,38 @@
-from .database import create_movie, delete_movie, get_movie, get_movies_query, update_movie
+from .cache import MOVIE_CACHE, MOVIE_FLIGHT
+from .database import (
+    MOVIE_COLUMNS,
+    create_movie,
+    delete_movie,
+    export_movies_query,
+    find_similar_titles,
+    get_movie,
+    get_movie_version,
+    get_movies_cursor_page,
+    get_movies_query,
+    get_popular_movies,
+    search_movies_query,
+    update_movie,
+)
+from .importing import import_movies, iter_lines, parse_csv, parse_ndjson
 
 
 __all__ = [
+    "MOVIE_CACHE",
+    "MOVIE_FLIGHT",
+    "MOVIE_COLUMNS",
     "get_movie",
+    "get_movie_version",
     "get_movies_query",
+    "get_movies_cursor_page",
+    "export_movies_query",
+    "search_movies_query",
+    "find_similar_titles",
+    "get_popular_movies",
     "create_movie",
     "update_movie",
     "delete_movie",
+    "import_movies",
+    "iter_lines",
+    "parse_csv",
+    "parse_ndjson",
 ]
@@ -0,0 +1,27 @@
+from uuid import UUID
+
+from movie_library.config import get_settings
+from movie_library.utils.common import SingleFlight, WTinyLFUCache
+
+
+settings = get_settings()
+
+# snapshots of movies, keyed by id
+MOVIE_CACHE = WTinyLFUCache(maxsize=settings.MOVIE_CACHE_SIZE, ttl=settings.MOVIE_CACHE_TTL)
+
+# loads of snapshots of movies, keyed by id and by whether the session reads from a replica
+MOVIE_FLIGHT = SingleFlight("movies", timeout=settings.SINGLE_FLIGHT_TIMEOUT)
+
+
+def movie_key(movie_id: UUID | str) -> UUID:
+    """
+    Get key of movie in MOVIE_CACHE and MOVIE_FLIGHT, the same for id given as str or as UUID.
+    """
+    return UUID(str(movie_id))
+
+
+__all__ = [
+    "MOVIE_CACHE",
+    "MOVIE_FLIGHT",
+    "movie_key",
+]
@@ -2,22 +2,150 @@ import datetime
 from typing import List
 
 from pydantic import UUID4
-from sqlalchemy import delete, exc, select, update
+from sqlalchemy import cast, delete, exc, func, select, update
+from sqlalchemy.dialects.postgresql import REGCONFIG
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from movie_library.db.models import Movie
+from .cache import MOVIE_CACHE, MOVIE_FLIGHT, movie_key
+from movie_library.db.models import Movie, MoviePopularity
+from movie_library.db.models.movies import SEARCH_CONFIG
 from movie_library.schemas import Movie as MovieSchema
+from movie_library.utils.common import (
+    MOVIES,
+    RESPONSE_CACHE,
+    attach_snapshot,
+    make_snapshot,
+    paginate_keyset,
+    violated_constraint,
+)
+
+
+# columns of movies read by lists: fields of MovieResponse and what entity tags and cursors are made of,
+# rows of them skip identity map and attribute instrumentation of ORM objects
+MOVIE_COLUMNS = (Movie.id, Movie.title, Movie.description, Movie.dt_created, Movie.dt_updated)
+
+# messages of unique indexes which an update of movie can violate
+UPDATE_MOVIE_ERRORS = {
+    "ix__movies__title": "Title already exists.",
+}
 
 
 async def get_movie(session: AsyncSession, movie_id: UUID4) -> Movie | None:
-    query = select(Movie).where(Movie.id == movie_id)
+    """
+    Get movie from cache or from the database. Movie from cache is attached to the session without querying.
+
+    Concurrent loads of the same movie make one query. Movie is not cached right after changes of movies,
+    when a replica could still return its old version, nor when it was changed while it was loaded.
+    """
+    key = movie_key(movie_id)
+    snapshot = MOVIE_CACHE.get(key)
+    if snapshot is None:
+
+        async def load() -> dict | None:
+            generation = MOVIE_CACHE.generation()
+            movie = await session.scalar(select(Movie).where(Movie.id == movie_id))
+            if movie is None:
+                return None
+            loaded = make_snapshot(movie)
+            if RESPONSE_CACHE.settled(MOVIES):
+                MOVIE_CACHE.set(key, loaded, generation=generation)
+            return loaded
+
+        snapshot = await MOVIE_FLIGHT.do((key, session.info.get("replica", False)), load)
+        if snapshot is None:
+            return None
+    return attach_snapshot(session, Movie, snapshot)
+
+
+async def get_movie_version(session: AsyncSession, movie_id: UUID4) -> datetime.datetime | None:
+    """
+    Get time of the last update of movie, which is read from cache or from covering index without touching the table.
+
+    Cache is only peeked, so the get of a movie which follows a conditional request is its only recorded request.
+    """
+    snapshot = MOVIE_CACHE.peek(movie_key(movie_id))
+    if snapshot is not None:
+        return snapshot["dt_updated"]
+    query = select(Movie.dt_updated).where(Movie.id == movie_id)
     return await session.scalar(query)
 
 
-def get_movies_query() -> select:
+def get_movies_query(projection: bool = False) -> select:
+    """
+    Get query of all movies as ORM objects or, in projection mode, as rows of MOVIE_COLUMNS.
+    """
+    if projection:
+        return select(*MOVIE_COLUMNS)
     return select(Movie)
 
 
+def export_movies_query() -> select:
+    return select(*MOVIE_COLUMNS)
+
+
+def search_movies_query(search: str) -> select:
+    """
+    Get query of movies matching the search in title or description, ordered by rank.
+
+    Matched words in title and description are highlighted.
+    """
+    config = cast(SEARCH_CONFIG, REGCONFIG)
+    query = func.websearch_to_tsquery(config, search)
+    rank = func.ts_rank(Movie.search_vector, query)
+    return (
+        select(
+            Movie.id,
+            Movie.title,
+            Movie.description,
+            rank.label("rank"),
+            func.ts_headline(config, Movie.title, query, "HighlightAll=true").label("title_highlight"),
+            func.ts_headline(config, Movie.description, query).label("description_highlight"),
+        )
+        .where(Movie.search_vector.op("@@")(query))
+        .order_by(rank.desc(), Movie.id)
+    )
+
+
+async def find_similar_titles(session: AsyncSession, title: str, limit: int, threshold: float) -> list:
+    """
+    Get movies with titles similar to the given one, the most similar first.
+
+    Candidates are found with trigram index on title, so misspelled titles are also matched.
+    """
+    await session.execute(select(func.set_config("pg_trgm.similarity_threshold", str(threshold), True)))
+    similarity = func.similarity(Movie.title, title)
+    query = (
+        select(Movie.id, Movie.title, Movie.description, similarity.label("similarity"))
+        .where(Movie.title.op("%")(title))
+        .order_by(similarity.desc(), Movie.id)
+        .limit(limit)
+    )
+    return list(await session.execute(query))
+
+
+async def get_popular_movies(session: AsyncSession, limit: int) -> list:
+    """
+    Get movies which are in favorites of the most users, read backwards from index on favorite_count.
+    """
+    query = (
+        select(Movie.id, Movie.title, Movie.description, MoviePopularity.favorite_count)
+        .join(MoviePopularity, MoviePopularity.movie_id == Movie.id)
+        .where(MoviePopularity.favorite_count > 0)
+        .order_by(MoviePopularity.favorite_count.desc(), MoviePopularity.movie_id.desc())
+        .limit(limit)
+    )
+    return list(await session.execute(query))
+
+
+async def get_movies_cursor_page(
+    session: AsyncSession,
+    cursor: str | None,
+    size: int,
+    projection: bool = False,
+) -> dict:
+    return await paginate_keyset(session, get_movies_query(projection), (Movie.dt_created, Movie.id), cursor, size)
+
+
 async def create_movie(session: AsyncSession, potential_movie: MovieSchema) -> MovieSchema | None:
     movie = Movie(**potential_movie.dict(exclude_unset=True))
     session.add(movie)
@@ -25,28 +153,34 @@ async def create_movie(session: AsyncSession, potential_movie: MovieSchema) -> M
         await session.commit()
     except exc.IntegrityError:
         return None
+    RESPONSE_CACHE.bump(MOVIES)
     return movie
 
 
 async def update_movie(session: AsyncSession, movie_id: UUID4, edited_movie: MovieSchema) -> (bool | None, str):
-    movie = await get_movie(session, movie_id)
+    """
+    Update movie with one statement, taken title is reported by the unique index.
+    """
+    query = (
+        update(Movie)
+        .where(Movie.id == movie_id)
+        .values(title=edited_movie.title, description=edited_movie.description)
+        .returning(Movie.id)
+    )
+    try:
+        updated = await session.scalar(query)
+    except exc.IntegrityError as error:
+        await session.rollback()
+        message = UPDATE_MOVIE_ERRORS.get(violated_constraint(error))
+        if message is None:
+            raise
+        return False, message
 
-    if movie is None:
+    if updated is None:
         return None, "Movie does not exist!"
-    if movie.title != edited_movie.title:
-        title_taken = (
-            await session.scalar(
-                select(Movie).where(Movie.title == edited_movie.title),
-            )
-            is not None
-        )
-        if title_taken:
-            return False, "Title already exists."
-
-    movie.title = edited_movie.title
-    movie.description = edited_movie.description
-    movie.dt_updated = datetime.datetime.now()
     await session.commit()
+    MOVIE_CACHE.pop(movie_key(movie_id))
+    RESPONSE_CACHE.bump(MOVIES)
     return True, "OK"
 
 
@@ -54,4 +188,6 @@ async def delete_movie(session: AsyncSession, movie_id: UUID4) -> int:
     query = delete(Movie).where(Movie.id == movie_id)
     result = await session.execute(query)
     await session.commit()
+    MOVIE_CACHE.pop(movie_key(movie_id))
+    RESPONSE_CACHE.bump(MOVIES)
     return result.rowcount
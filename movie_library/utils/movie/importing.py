@@ -0,0 +1,244 @@
+import codecs
+import csv
+import json
+from collections import deque
+from typing import AsyncIterator, Iterator
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from movie_library.utils.common import MOVIES, RESPONSE_CACHE
+
+
+STAGING_TABLE = "movie_import_staging"
+
+CREATE_STAGING_TABLE = text(
+    f"CREATE TEMPORARY TABLE {STAGING_TABLE} (line_no BIGINT NOT NULL, title TEXT NOT NULL, description TEXT) "
+    "ON COMMIT DROP"
+)
+
+# inserts the first occurrence of every new title, and reports all the rows which were not inserted:
+# the first row has their total, it is present even if no rows are listed
+MERGE_STAGING_TABLE = text(
+    f"""
+    WITH ranked AS (
+        SELECT line_no, title, description, row_number() OVER (PARTITION BY title ORDER BY line_no) AS occurrence
+        FROM {STAGING_TABLE}
+    ), inserted AS (
+        INSERT INTO movies (title, description)
+        SELECT title, description FROM ranked WHERE occurrence = 1
+        ON CONFLICT (title) DO NOTHING
+        RETURNING title
+    ), skipped AS (
+        SELECT
+            ranked.line_no,
+            ranked.title,
+            CASE WHEN ranked.occurrence > 1 THEN 'duplicate' ELSE 'exists' END AS reason
+        FROM ranked
+        WHERE ranked.occurrence > 1 OR NOT EXISTS (SELECT 1 FROM inserted WHERE inserted.title = ranked.title)
+    )
+    SELECT counted.total, listed.line_no, listed.title, listed.reason
+    FROM (SELECT count(*) AS total FROM skipped) AS counted
+    LEFT JOIN LATERAL (SELECT * FROM skipped ORDER BY line_no LIMIT :limit) AS listed ON TRUE
+    ORDER BY listed.line_no
+    """
+)
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split stream of bytes into lines, without reading the whole stream into memory.
+
+    Every chunk is split once, the pieces of an unfinished line are joined when its end arrives.
+    Invalid UTF-8 raises UnicodeDecodeError.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pieces = []
+    async for chunk in chunks:
+        *lines, rest = decoder.decode(chunk).split("\n")
+        if lines:
+            lines[0] = "".join(pieces) + lines[0]
+            pieces = []
+        for line in lines:
+            yield line.rstrip("\r")
+        pieces.append(rest)
+    pieces.append(decoder.decode(b"", final=True))
+    tail = "".join(pieces)
+    if tail:
+        yield tail.rstrip("\r")
+
+
+def check_text(movie: dict | None) -> dict | None:
+    """
+    Get movie, or None if its text values contain NUL characters, which PostgreSQL can not store.
+    """
+    if movie is not None and any(isinstance(value, str) and "\x00" in value for value in movie.values()):
+        return None
+    return movie
+
+
+async def parse_ndjson(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, dict | None]]:
+    """
+    Get numbered movies from lines with JSON objects. Malformed rows are returned as None.
+    """
+    row = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            movie = json.loads(line)
+        except json.JSONDecodeError:
+            movie = None
+        yield row, check_text(movie) if isinstance(movie, dict) else None
+
+
+class IncompleteRecord(Exception):
+    """
+    Lines ran out in the middle of CSV record.
+    """
+
+
+class CSVFeed:
+    """
+    Lines for csv.reader which are added as they arrive, and records read from them.
+
+    csv.reader takes the next line only at the start of a record or inside a quoted value. If the lines run out
+    inside a quoted value, lines of the record are read again by a new reader when more lines arrive.
+    """
+
+    def __init__(self) -> None:
+        self.lines: deque[str] = deque()
+        self.taken: list[str] = []
+        self.finished = False
+        self.truncated = False
+        self.reader = csv.reader(self)
+
+    def __iter__(self) -> "CSVFeed":
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            if not self.finished:
+                raise IncompleteRecord
+            self.truncated = bool(self.taken)
+            raise StopIteration
+        line = self.lines.popleft()
+        self.taken.append(line)
+        # line breaks were split off the lines, but quoted values keep them
+        return line + "\n"
+
+    def records(self) -> Iterator[list[str] | None]:
+        """
+        Get complete records of lines added so far. Malformed records, such as unclosed quoted value, are None.
+        """
+        while self.lines or self.finished:
+            try:
+                record = next(self.reader)
+            except StopIteration:
+                return
+            except IncompleteRecord:
+                self.lines.extendleft(reversed(self.taken))
+                self.taken = []
+                self.reader = csv.reader(self)
+                return
+            except csv.Error:
+                record = None
+            if self.truncated:
+                record, self.truncated = None, False
+            self.taken = []
+            yield record
+
+
+async def parse_csv(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, dict | None]]:
+    """
+    Get numbered movies from CSV with header. Malformed rows are returned as None.
+
+    Quoted values may contain line breaks, quotes inside unquoted values are kept as they are.
+    """
+    feed = CSVFeed()
+    header = None
+    row = 0
+
+    def movies(records: Iterator[list[str] | None]) -> Iterator[tuple[int, dict | None]]:
+        nonlocal header, row
+        for record in records:
+            if record == []:
+                continue
+            if header is None:
+                header = record or []
+                continue
+            row += 1
+            valid = record is not None and len(record) == len(header)
+            yield row, check_text(dict(zip(header, record))) if valid else None
+
+    async for line in lines:
+        feed.lines.append(line)
+        for movie in movies(feed.records()):
+            yield movie
+    feed.finished = True
+    for movie in movies(feed.records()):
+        yield movie
+
+
+async def import_movies(
+    session: AsyncSession,
+    movies: AsyncIterator[tuple[int, dict | None]],
+    max_reported: int,
+) -> dict:
+    """
+    Load movies through COPY into staging table and merge them into movies table.
+
+    Rows with titles which already exist or repeat earlier rows are skipped and reported,
+    as well as malformed rows. At most max_reported of such rows are listed.
+    """
+    invalid = []
+    counters = {"received": 0, "invalid": 0}
+
+    async def records():
+        async for row, movie in movies:
+            counters["received"] += 1
+            title = movie.get("title") if movie is not None else None
+            description = movie.get("description") if movie is not None else None
+            if not isinstance(title, str) or not title or not isinstance(description, (str, type(None))):
+                counters["invalid"] += 1
+                if len(invalid) < max_reported:
+                    title = title if isinstance(title, str) else None
+                    invalid.append({"row": row, "title": title, "reason": "invalid"})
+                continue
+            yield row, title, description
+
+    await session.execute(CREATE_STAGING_TABLE)
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        STAGING_TABLE,
+        records=records(),
+        columns=["line_no", "title", "description"],
+    )
+    skipped = (await session.execute(MERGE_STAGING_TABLE, {"limit": max_reported})).all()
+    await session.commit()
+    RESPONSE_CACHE.bump(MOVIES)
+
+    skipped_total = skipped[0].total
+    listed = [
+        {"row": row.line_no, "title": row.title, "reason": row.reason} for row in skipped if row.line_no is not None
+    ]
+    conflicts = sorted(
+        invalid + listed,
+        key=lambda conflict: conflict["row"],
+    )
+    return {
+        "received": counters["received"],
+        "inserted": counters["received"] - counters["invalid"] - skipped_total,
+        "rejected": counters["invalid"] + skipped_total,
+        "conflicts": conflicts[:max_reported],
+    }
+
+
+__all__ = [
+    "import_movies",
+    "iter_lines",
+    "parse_csv",
+    "parse_ndjson",
+]
@@ -0,0 +1,20 @@
+from .database import (
+    build_similarity_index,
+    get_similar_movies,
+    load_favorites,
+    maintain_similarity_index,
+    refresh_similarity_index,
+)
+from .similarity import SIMILARITY_INDEX, ItemSimilarityIndex, top_k_similar
+
+
+__all__ = [
+    "build_similarity_index",
+    "get_similar_movies",
+    "load_favorites",
+    "maintain_similarity_index",
+    "refresh_similarity_index",
+    "SIMILARITY_INDEX",
+    "ItemSimilarityIndex",
+    "top_k_similar",
+]
@@ -0,0 +1,129 @@
+from asyncio import Lock, sleep, to_thread
+from logging import getLogger
+from time import monotonic
+from uuid import UUID
+
+import numpy as np
+from pydantic import UUID4
+from sqlalchemy import TEXT, any_, cast, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY, BIGINT, BIT
+from sqlalchemy.dialects.postgresql import UUID as PostgresUUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .similarity import SIMILARITY_INDEX, ItemSimilarityIndex
+from movie_library.db.connection import SessionManager
+from movie_library.db.models import Movie, UserMovie
+
+
+logger = getLogger(__name__)
+
+# build and refresh of the index never run at the same time
+INDEX_LOCK = Lock()
+LOAD_BATCH_SIZE = 100_000
+
+
+def user_key_column() -> cast:
+    """
+    Get signed 64-bit key of user from the first 16 hex digits of user_id, so favorites are loaded without uuids.
+    """
+    hex_digits = func.replace(func.left(cast(UserMovie.user_id, TEXT), 18), "-", "")
+    return cast(cast(literal("x") + hex_digits, BIT(64)), BIGINT)
+
+
+async def load_favorites(session: AsyncSession) -> tuple[list[UUID], np.ndarray, np.ndarray]:
+    """
+    Load ids of all movies and favorites as keys of users and indexes of movies from one snapshot.
+    """
+    await session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    movie_ids = list(await session.scalars(select(Movie.id).order_by(Movie.id)))
+
+    numbered = select(Movie.id, (func.row_number().over(order_by=Movie.id) - 1).label("column")).subquery()
+    query = select(user_key_column(), numbered.c.column).join(numbered, numbered.c.id == UserMovie.movie_id)
+    result = await session.stream(query.execution_options(yield_per=LOAD_BATCH_SIZE))
+    batches = []
+    try:
+        async for rows in result.partitions():
+            batches.append(np.array(rows, dtype=np.int64).reshape(-1, 2))
+    finally:
+        await result.close()
+    await session.commit()
+
+    favorites = np.concatenate(batches) if batches else np.empty((0, 2), dtype=np.int64)
+    return movie_ids, favorites[:, 0], favorites[:, 1].astype(np.int32)
+
+
+async def build_similarity_index(index: ItemSimilarityIndex = SIMILARITY_INDEX, if_missing: bool = False) -> None:
+    """
+    Build index of similar movies from all favorites in its own session, computing similarity in a thread.
+    """
+    async with INDEX_LOCK:
+        if if_missing and index.built:
+            return
+        recorded = index.recorded_count()
+        session_maker = SessionManager().get_session_maker()
+        async with session_maker() as session:
+            movie_ids, user_keys, movie_columns = await load_favorites(session)
+        await to_thread(index.build, movie_ids, user_keys, movie_columns, recorded)
+
+
+async def refresh_similarity_index(index: ItemSimilarityIndex = SIMILARITY_INDEX) -> int:
+    """
+    Apply recorded changes of favorites to the index in a thread. Returns number of applied changes.
+    """
+    async with INDEX_LOCK:
+        return await to_thread(index.refresh)
+
+
+async def get_similar_movies(
+    session: AsyncSession,
+    movie_id: UUID4,
+    limit: int,
+    index: ItemSimilarityIndex = SIMILARITY_INDEX,
+) -> list:
+    """
+    Get movies which are most often in favorites together with the given one, the most similar first.
+
+    Similar movies are read from the index in memory, which is built on first request if needed.
+    """
+    if not index.built:
+        await build_similarity_index(index, if_missing=True)
+    similar = dict(index.similar(movie_id, limit))
+    if not similar:
+        return []
+
+    similar_ids = literal(list(similar), ARRAY(PostgresUUID(as_uuid=True)))
+    query = select(Movie.id, Movie.title, Movie.description).where(Movie.id == any_(similar_ids))
+    rows = {row.id: row for row in await session.execute(query)}
+    return [
+        {"id": row.id, "title": row.title, "description": row.description, "similarity": similarity}
+        for similar_id, similarity in similar.items()
+        if (row := rows.get(similar_id)) is not None
+    ]
+
+
+async def maintain_similarity_index(refresh_interval: float, rebuild_interval: float) -> None:
+    """
+    Apply changes of favorites to the index every refresh_interval seconds and rebuild it every rebuild_interval.
+    """
+    built_at = None
+    while True:
+        try:
+            if built_at is None or monotonic() - built_at >= rebuild_interval:
+                await build_similarity_index()
+                built_at = monotonic()
+            else:
+                await refresh_similarity_index()
+        except Exception:  # pylint: disable=broad-exception-caught
+            # a failed update must not stop the maintenance, CancelledError is not an Exception and still stops it
+            logger.exception("Could not update index of similar movies.")
+        await sleep(refresh_interval)
+
+
+__all__ = [
+    "build_similarity_index",
+    "get_similar_movies",
+    "load_favorites",
+    "maintain_similarity_index",
+    "refresh_similarity_index",
+    "user_key_column",
+]
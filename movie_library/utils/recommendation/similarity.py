@@ -0,0 +1,333 @@
+from threading import Lock
+from uuid import UUID
+
+import numpy as np
+from scipy import sparse
+
+from movie_library.config import get_settings
+
+
+def user_key(user_id: UUID) -> int:
+    """
+    Get signed 64-bit key of user from the first half of id, the same as the database computes for build.
+    """
+    key = UUID(str(user_id)).int >> 64
+    return key - (1 << 64) if key >= 1 << 63 else key
+
+
+def favorites_matrix(user_rows: np.ndarray, movie_columns: np.ndarray, shape: tuple[int, int]) -> sparse.csr_matrix:
+    """
+    Get binary users x movies matrix from coordinates of favorites.
+    """
+    data = np.ones(len(user_rows), dtype=np.float32)
+    matrix = sparse.csr_matrix((data, (user_rows, movie_columns)), shape=shape, dtype=np.float32)
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+    return matrix
+
+
+def row_blocks(cost: np.ndarray, budget: int) -> list[np.ndarray]:
+    """
+    Split rows into consecutive blocks whose summed cost does not exceed the budget, unless a single row does.
+    """
+    blocks = []
+    start = 0
+    cumulative = np.cumsum(cost)
+    while start < len(cost):
+        spent = cumulative[start - 1] if start else 0
+        stop = max(int(np.searchsorted(cumulative, spent + budget, side="right")), start + 1)
+        blocks.append(np.arange(start, min(stop, len(cost))))
+        start = stop
+    return blocks
+
+
+def select_top_k(
+    local: np.ndarray,
+    columns: np.ndarray,
+    similarity: np.ndarray,
+    rows: int,
+    k: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Get k candidates with the highest similarity for each row from arrays of row, column and similarity.
+    """
+    neighbors = np.full((rows, k), -1, dtype=np.int32)
+    scores = np.zeros((rows, k), dtype=np.float32)
+    order = np.lexsort((columns, -similarity, local))
+    local, columns, similarity = local[order], columns[order], similarity[order]
+    rank = np.arange(len(local)) - np.searchsorted(local, local)
+    top = rank < k
+    neighbors[local[top], rank[top]] = columns[top]
+    scores[local[top], rank[top]] = similarity[top]
+    return neighbors, scores
+
+
+def top_k_similar(
+    users_movies: sparse.csr_matrix,
+    movies_users: sparse.csr_matrix,
+    rows: np.ndarray,
+    k: int,
+    budget: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Get k most similar movies for each of the rows by cosine similarity of their sets of users.
+
+    Co-occurrence counts are computed by blocks of rows, so the intermediate product holds about
+    budget non-zero values at most. Returns indexes of movies, padded with -1, and their similarity.
+    """
+    neighbors = np.full((len(rows), k), -1, dtype=np.int32)
+    scores = np.zeros((len(rows), k), dtype=np.float32)
+    if not len(rows):
+        return neighbors, scores
+
+    norms = np.sqrt(np.diff(movies_users.indptr)).astype(np.float32)
+    user_degree = np.diff(users_movies.indptr).astype(np.float32)
+    cost = movies_users[rows] @ user_degree
+    offset = 0
+    for block in row_blocks(cost, budget):
+        block_rows = rows[block]
+        cooccurrence = (movies_users[block_rows] @ users_movies).tocsr()
+
+        local = np.repeat(np.arange(len(block_rows)), np.diff(cooccurrence.indptr))
+        columns = cooccurrence.indices
+        keep = columns != block_rows[local]
+        local, columns = local[keep], columns[keep]
+        similarity = cooccurrence.data[keep] / (norms[block_rows[local]] * norms[columns])
+
+        block_slice = slice(offset, offset + len(block_rows))
+        neighbors[block_slice], scores[block_slice] = select_top_k(local, columns, similarity, len(block_rows), k)
+        offset += len(block_rows)
+    return neighbors, scores
+
+
+def update_top_k(
+    movies_users: sparse.csr_matrix,
+    rows: np.ndarray,
+    columns: np.ndarray,
+    neighbors: np.ndarray,
+    scores: np.ndarray,
+    budget: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Replace similarity of the rows to the given columns in their kept top k, other kept similarity stays as is.
+
+    Only co-occurrence of rows with the given columns is computed, by blocks of rows as in top_k_similar.
+    Returns new top k of the rows, given neighbors and scores are those of the rows.
+    """
+    k = neighbors.shape[1]
+    norms = np.sqrt(np.diff(movies_users.indptr)).astype(np.float32)
+    columns_users = movies_users[columns].T.tocsr()
+    cost = movies_users[rows] @ np.diff(columns_users.indptr).astype(np.float32)
+    neighbors, scores = neighbors.copy(), scores.copy()
+    for block in row_blocks(cost, budget):
+        block_rows = rows[block]
+        cooccurrence = (movies_users[block_rows] @ columns_users).tocoo()
+        local, changed = cooccurrence.row, columns[cooccurrence.col]
+        keep = changed != block_rows[local]
+        local, changed = local[keep], changed[keep]
+        similarity = cooccurrence.data[keep] / (norms[block_rows[local]] * norms[changed])
+
+        kept_local = np.repeat(np.arange(len(block_rows)), k)
+        kept = neighbors[block].ravel()
+        valid = (kept >= 0) & ~np.isin(kept, columns)
+        neighbors[block], scores[block] = select_top_k(
+            np.concatenate([kept_local[valid], local]),
+            np.concatenate([kept[valid], changed]),
+            np.concatenate([scores[block].ravel()[valid], similarity]),
+            len(block_rows),
+            k,
+        )
+    return neighbors, scores
+
+
+class ItemSimilarityIndex:
+    """
+    Precomputed k most similar movies for every movie, by co-occurrence in favorites of users.
+
+    Changes of favorites are recorded and applied by refresh. It recomputes rows of movies whose
+    sets of users have changed, and for movies related to them only updates similarity to the changed
+    movies in the kept top k. Movies which drop out of top k are not replaced until the next full build.
+
+    Without refresh changes are not recorded, and the index stays as it was built.
+    """
+
+    def __init__(self, k: int, budget: int, recording: bool = True) -> None:
+        self.k = k
+        self.budget = budget
+        self.recording = recording
+        self._lock = Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        self._pending: list[tuple[int, UUID, int]] = []
+        self.built = False
+        self.movie_ids: list[UUID] = []
+        self.movie_index: dict[UUID, int] = {}
+        self.user_keys = np.empty(0, dtype=np.int64)
+        self.new_users: dict[int, int] = {}
+        self.users_movies = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self.movies_users = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self.neighbors = np.empty((0, self.k), dtype=np.int32)
+        self.scores = np.empty((0, self.k), dtype=np.float32)
+
+    def build(
+        self,
+        movie_ids: list[UUID],
+        user_keys: np.ndarray,
+        movie_columns: np.ndarray,
+        recorded: int | None = None,
+    ) -> None:
+        """
+        Build index from all movies and favorites given as keys of users and indexes of movies in movie_ids.
+
+        Changes recorded before favorites were loaded are already in them, so they are dropped:
+        the first recorded changes, as returned by recorded_count before loading, or all of them by default.
+        """
+        keys, user_rows = np.unique(user_keys, return_inverse=True)
+        users_movies = favorites_matrix(user_rows, movie_columns, (len(keys), len(movie_ids)))
+        movies_users = users_movies.T.tocsr()
+        rows = np.arange(len(movie_ids))
+        neighbors, scores = top_k_similar(users_movies, movies_users, rows, self.k, self.budget)
+        with self._lock:
+            del self._pending[:recorded]
+            self.movie_ids = list(movie_ids)
+            self.movie_index = {movie_id: index for index, movie_id in enumerate(self.movie_ids)}
+            self.user_keys = keys
+            self.new_users = {}
+            self.users_movies = users_movies
+            self.movies_users = movies_users
+            self.neighbors = neighbors
+            self.scores = scores
+            self.built = True
+
+    def recorded_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def record(self, user_id: UUID, movie_ids: list[UUID], delta: int) -> None:
+        """
+        Remember that movies were added to (delta 1) or removed from (delta -1) favorites of the user.
+        """
+        if not self.recording:
+            return
+        key = user_key(user_id)
+        with self._lock:
+            self._pending.extend((key, UUID(str(movie_id)), delta) for movie_id in movie_ids)
+
+    def _user_row(self, key: int, new_users: dict[int, int]) -> int:
+        position = int(np.searchsorted(self.user_keys, key))
+        if position < len(self.user_keys) and self.user_keys[position] == key:
+            return position
+        return new_users.setdefault(key, len(self.user_keys) + len(new_users))
+
+    def refresh(self) -> int:
+        """
+        Apply recorded changes of favorites and update rows of affected movies. Returns number of applied changes.
+
+        Changes recorded before the first build are dropped, the build loads them from the database.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if not self.built or not pending:
+                return 0
+            movie_index = dict(self.movie_index)
+            new_users = dict(self.new_users)
+
+        user_rows = np.array([self._user_row(key, new_users) for key, _, _ in pending], dtype=np.int64)
+        movie_columns = np.array(
+            [movie_index.setdefault(movie_id, len(movie_index)) for _, movie_id, _ in pending], dtype=np.int64
+        )
+        deltas = np.array([delta for _, _, delta in pending], dtype=np.float32)
+        shape = (len(self.user_keys) + len(new_users), len(movie_index))
+
+        users_movies = self.users_movies.copy()
+        users_movies.resize(shape)
+        changes = sparse.csr_matrix((deltas, (user_rows, movie_columns)), shape=shape, dtype=np.float32)
+        users_movies = users_movies + changes
+        users_movies.data = np.clip(users_movies.data, 0, 1)
+        users_movies.eliminate_zeros()
+        movies_users = users_movies.T.tocsr()
+
+        all_neighbors = np.full((shape[1], self.k), -1, dtype=np.int32)
+        all_scores = np.zeros((shape[1], self.k), dtype=np.float32)
+        all_neighbors[: len(self.neighbors)] = self.neighbors
+        all_scores[: len(self.scores)] = self.scores
+
+        # other movies of changed users, and movies showing changed ones, only get similarity to changed movies updated
+        changed = np.unique(movie_columns)
+        touched_users = np.unique(user_rows)
+        known_users = touched_users[touched_users < self.users_movies.shape[0]]
+        related = np.union1d(self.users_movies[known_users].indices, users_movies[touched_users].indices)
+        showing = np.flatnonzero(np.isin(all_neighbors, changed).any(axis=1))
+        related = np.setdiff1d(np.union1d(related, showing), changed).astype(np.int64)
+        all_neighbors[related], all_scores[related] = update_top_k(
+            movies_users, related, changed, all_neighbors[related], all_scores[related], self.budget
+        )
+        all_neighbors[changed], all_scores[changed] = top_k_similar(
+            users_movies, movies_users, changed, self.k, self.budget
+        )
+        with self._lock:
+            self.movie_ids = self.movie_ids + list(movie_index)[len(self.movie_ids) :]
+            self.movie_index = movie_index
+            self.new_users = new_users
+            self.users_movies = users_movies
+            self.movies_users = movies_users
+            self.neighbors = all_neighbors
+            self.scores = all_scores
+        return len(pending)
+
+    def similar(self, movie_id: UUID, limit: int) -> list[tuple[UUID, float]]:
+        """
+        Get ids of the most similar movies with their similarity, the most similar first.
+        """
+        with self._lock:
+            index = self.movie_index.get(UUID(str(movie_id)))
+            if index is None or index >= len(self.neighbors):
+                return []
+            neighbors = self.neighbors[index, :limit]
+            scores = self.scores[index, :limit]
+            return [
+                (self.movie_ids[neighbor], float(score)) for neighbor, score in zip(neighbors, scores) if neighbor >= 0
+            ]
+
+    def stats(self) -> dict:
+        return {
+            "built": self.built,
+            "movies": len(self.movie_ids),
+            "users": self.users_movies.shape[0],
+            "favorites": self.users_movies.nnz,
+            "pending": len(self._pending),
+            "memory": sum(
+                array.nbytes
+                for array in (
+                    self.user_keys,
+                    self.users_movies.data,
+                    self.users_movies.indices,
+                    self.users_movies.indptr,
+                    self.movies_users.data,
+                    self.movies_users.indices,
+                    self.movies_users.indptr,
+                    self.neighbors,
+                    self.scores,
+                )
+            ),
+        }
+
+
+SIMILARITY_INDEX = ItemSimilarityIndex(
+    k=get_settings().RECOMMENDATIONS_TOP_K,
+    budget=get_settings().RECOMMENDATIONS_BLOCK_BUDGET,
+    recording=get_settings().RECOMMENDATIONS_REFRESH_INTERVAL > 0,
+)
+
+
+__all__ = [
+    "favorites_matrix",
+    "ItemSimilarityIndex",
+    "row_blocks",
+    "select_top_k",
+    "SIMILARITY_INDEX",
+    "top_k_similar",
+    "update_top_k",
+    "user_key",
+]
@@ -0,0 +1,33 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from movie_library.db.connection import REQUEST_STATS, RequestStats
+
+
+class ServerTimingMiddleware:
+    """
+    Collect statistics of database use by every request and send them in Server-Timing header.
+
+    Statements executed after the response has started, like ones of streamed responses, are not included.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(path=f"{scope['method']} {scope['path']}")
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        token = REQUEST_STATS.set(stats)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            REQUEST_STATS.reset(token)
@@ -1,8 +1,11 @@
+from .cache import TOKEN_CACHE, USER_CACHE
 from .database import delete_user, get_user, register_user, update_user
-from .logic import authenticate_user, create_access_token, get_current_user, verify_password
+from .logic import authenticate_user, create_access_token, get_current_user, get_token_data, verify_password
 
 
 __all__ = [
+    "TOKEN_CACHE",
+    "USER_CACHE",
     "get_user",
     "register_user",
     "update_user",
@@ -11,4 +14,5 @@ __all__ = [
     "create_access_token",
     "verify_password",
     "get_current_user",
+    "get_token_data",
 ]
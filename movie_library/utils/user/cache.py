@@ -0,0 +1,21 @@
+from movie_library.config import get_settings
+from movie_library.utils.common import SingleFlight, TTLCache
+
+
+settings = get_settings()
+
+# snapshots of authenticated users, keyed by username from the token
+USER_CACHE = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL)
+
+# loads of snapshots of users, keyed by username and by whether the session reads from a replica
+USER_FLIGHT = SingleFlight("users", timeout=settings.SINGLE_FLIGHT_TIMEOUT)
+
+# verified token data, keyed by digest of the token and kept until the token expires
+TOKEN_CACHE = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+
+__all__ = [
+    "TOKEN_CACHE",
+    "USER_CACHE",
+    "USER_FLIGHT",
+]
@@ -1,21 +1,42 @@
-import datetime
-
 from pydantic import UUID4
 from sqlalchemy import delete, exc, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
-from movie_library.db.models import User
+from .cache import USER_CACHE, USER_FLIGHT
+from .password import PASSWORD_POOL
+from movie_library.db.models import User, UserMovie
 from movie_library.schemas import RegistrationForm, UserEdit
+from movie_library.utils.common import attach_snapshot, make_snapshot, violated_constraint
+from movie_library.utils.favorite import count_favorites
+from movie_library.utils.recommendation import SIMILARITY_INDEX
+
+
+# messages of unique indexes which an update of user can violate
+UPDATE_USER_ERRORS = {
+    "ix__users__username": "Username already exists.",
+    "ix__users__email": "Email is taken.",
+}
 
 
 async def get_user(session: AsyncSession, username: str) -> User | None:
-    query = select(User).where(User.username == username)
-    return await session.scalar(query)
+    """
+    Get user from the database, concurrent loads of the same user make one query.
+    """
+
+    async def load() -> dict | None:
+        user = await session.scalar(select(User).where(User.username == username))
+        return None if user is None else make_snapshot(user)
+
+    snapshot = await USER_FLIGHT.do((username, session.info.get("replica", False)), load)
+    if snapshot is None:
+        return None
+    return attach_snapshot(session, User, snapshot)
 
 
 async def register_user(session: AsyncSession, potential_user: RegistrationForm) -> tuple[bool, str]:
     user = User(**potential_user.dict(exclude_unset=True))
+    user.password = await PASSWORD_POOL.hash(potential_user.password)
     session.add(user)
     try:
         await session.commit()
@@ -25,31 +46,46 @@ async def register_user(session: AsyncSession, potential_user: RegistrationForm)
 
 
 async def update_user(session: AsyncSession, user: User, edited_user: UserEdit) -> tuple[bool, str]:
-    if user.username != edited_user.username:
-        username_taken = await get_user(session, edited_user.username) is not None
-        if username_taken:
-            return False, "Username already exists."
-
-    if user.email != edited_user.email:
-        email_taken = (
-            await session.scalar(
-                select(User).where(User.email == edited_user.email),
-            )
-            is not None
-        )
-        if email_taken:
-            return False, "Email is taken."
-
-    user.username = edited_user.username
-    user.password = edited_user.password if edited_user.password is not None else user.password
-    user.email = edited_user.email
-    user.dt_updated = datetime.datetime.now()
+    """
+    Update user with one statement, taken username or email is reported by the unique indexes.
+    """
+    values = {"username": edited_user.username, "email": edited_user.email}
+    if edited_user.password is not None:
+        values["password"] = await PASSWORD_POOL.hash(edited_user.password)
+    query = update(User).where(User.id == user.id).values(**values)
+    cached_username = user.username
+    try:
+        await session.execute(query)
+    except exc.IntegrityError as error:
+        await session.rollback()
+        message = UPDATE_USER_ERRORS.get(violated_constraint(error))
+        if message is None:
+            raise
+        return False, message
+
     await session.commit()
+    USER_CACHE.pop(cached_username)
     return True, "OK"
 
 
 async def delete_user(session: AsyncSession, user: User) -> int:
+    """
+    Delete user with their favorites. Favorite counters of their movies are decremented,
+    and removals are recorded for the index of similar movies.
+    """
+    user_id = select(User.id).where(User.username == user.username).scalar_subquery()
+    deleted = (
+        delete(UserMovie)
+        .where(UserMovie.user_id == user_id)
+        .returning(UserMovie.movie_id, UserMovie.user_id)
+        .cte("deleted")
+    )
+    counted = count_favorites(select(deleted.c.movie_id, deleted.c.user_id), -1).cte("counted")
+    removed = (await session.execute(select(deleted.c.movie_id, deleted.c.user_id).add_cte(counted))).all()
     query = delete(User).where(User.username == user.username)
     result = await session.execute(query)
     await session.commit()
+    USER_CACHE.pop(user.username)
+    if removed:
+        SIMILARITY_INDEX.record(removed[0].user_id, [row.movie_id for row in removed], -1)
     return result.rowcount
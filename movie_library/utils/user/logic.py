@@ -1,15 +1,33 @@
 from datetime import UTC, datetime, timedelta
+from hashlib import sha256
+from time import perf_counter, time
 
 from fastapi import Depends, HTTPException
 from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
+from .cache import TOKEN_CACHE, USER_CACHE
 from .database import get_user
+from .password import PASSWORD_POOL
 from movie_library.config import get_settings
 from movie_library.db.connection import get_session
 from movie_library.db.models import User
 from movie_library.schemas import TokenData
+from movie_library.utils.common import attach_snapshot, make_snapshot
+from movie_library.utils.metrics import REGISTRY
+
+
+settings = get_settings()
+
+TOKEN_SECONDS = REGISTRY.histogram(
+    "auth_token_seconds",
+    "Time of encoding and decoding of access tokens.",
+    ("operation",),
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01),
+)
+TOKEN_ENCODE_SECONDS = TOKEN_SECONDS.labels("encode")
+TOKEN_DECODE_SECONDS = TOKEN_SECONDS.labels("decode")
 
 
 async def authenticate_user(
@@ -20,7 +38,7 @@ async def authenticate_user(
     user = await get_user(session, username)
     if not user:
         return False
-    if not verify_password(password, user.password):
+    if not await PASSWORD_POOL.verify(password, user.password):
         return False
     return user
 
@@ -29,28 +47,52 @@ def create_access_token(
     data: dict,
     expires_delta: timedelta | None = None,
 ):
-    settings = get_settings()
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.now(UTC) + expires_delta
     else:
         expire = datetime.now(UTC) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
+    started = perf_counter()
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    TOKEN_ENCODE_SECONDS.observe(perf_counter() - started)
     return encoded_jwt
 
 
+def get_token_data(token: str) -> TokenData | None:
+    """
+    Verify token and get its data. Verified tokens are remembered until they expire.
+    """
+    key = sha256(token.encode()).digest()
+    token_data = TOKEN_CACHE.get(key)
+    if token_data is not None:
+        return token_data
+
+    started = perf_counter()
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    finally:
+        TOKEN_DECODE_SECONDS.observe(perf_counter() - started)
+    username: str = payload.get("sub")
+    if username is None:
+        return None
+    token_data = TokenData(username=username)
+    expire = payload.get("exp")
+    TOKEN_CACHE.set(key, token_data, ttl=None if expire is None else min(expire - time(), TOKEN_CACHE.ttl))
+    return token_data
+
+
 def verify_password(
     plain_password: str,
     hashed_password: str,
 ):
-    pwd_context = get_settings().PWD_CONTEXT
+    pwd_context = settings.PWD_CONTEXT
     return pwd_context.verify(plain_password, hashed_password)
 
 
 async def get_current_user(
     session: AsyncSession = Depends(get_session),
-    token: str = Depends(get_settings().OAUTH2_SCHEME),
+    token: str = Depends(settings.OAUTH2_SCHEME),
 ) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -58,14 +100,17 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, get_settings().SECRET_KEY, algorithms=[get_settings().ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
+        token_data = get_token_data(token)
     except JWTError:
         raise credentials_exception
+    if token_data is None:
+        raise credentials_exception
+    snapshot = USER_CACHE.get(token_data.username)
+    if snapshot is not None:
+        return attach_snapshot(session, User, snapshot)
+    generation = USER_CACHE.generation()
     user = await get_user(session, username=token_data.username)
     if user is None:
         raise credentials_exception
+    USER_CACHE.set(token_data.username, make_snapshot(user), generation=generation)
     return user
@@ -0,0 +1,109 @@
+from asyncio import get_running_loop
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import perf_counter
+
+from passlib.context import CryptContext
+
+from movie_library.config import get_settings
+from movie_library.utils.metrics import REGISTRY
+
+
+PASSWORD_SECONDS = REGISTRY.histogram(
+    "auth_password_seconds",
+    "Time of hashing and verification of passwords in worker threads.",
+    ("operation",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.5),
+)
+PASSWORD_OPERATIONS = REGISTRY.gauge(
+    "auth_password_operations",
+    "Operations of password worker pool which wait for a worker or run.",
+    ("state",),
+)
+
+
+class PasswordWorkerPool:
+    """
+    Bounded pool of worker threads for password hashing and verification.
+
+    bcrypt releases the GIL, so running it in threads keeps the event loop responsive.
+    """
+
+    def __init__(self, max_workers: int, pwd_context: CryptContext) -> None:
+        self.max_workers = max_workers
+        self.pwd_context = pwd_context
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password")
+        self._lock = Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.wait_total = 0.0
+        self.run_total = 0.0
+        self._hash_timing = PASSWORD_SECONDS.labels("hash")
+        self._verify_timing = PASSWORD_SECONDS.labels("verify")
+
+    def _call(self, submitted: float, timing, func, *args):
+        started = perf_counter()
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self.wait_total += started - submitted
+        try:
+            return func(*args)
+        finally:
+            elapsed = perf_counter() - started
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+                self.run_total += elapsed
+                timing.observe(elapsed)
+
+    async def _run(self, timing, func, *args):
+        with self._lock:
+            self.queued += 1
+        loop = get_running_loop()
+        return await loop.run_in_executor(self._executor, self._call, perf_counter(), timing, func, *args)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self._hash_timing, self.pwd_context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(self._verify_timing, self.pwd_context.verify, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "wait_total": self.wait_total,
+                "run_total": self.run_total,
+            }
+
+
+PASSWORD_POOL = PasswordWorkerPool(
+    max_workers=get_settings().PASSWORD_HASH_WORKERS,
+    pwd_context=get_settings().PWD_CONTEXT,
+)
+
+
+def collect_password_stats() -> None:
+    """
+    Read queued and running operations of password worker pool into gauges.
+    """
+    stats = PASSWORD_POOL.stats()
+    for state in ("queued", "running"):
+        PASSWORD_OPERATIONS.labels(state).set(stats[state])
+
+
+REGISTRY.add_collector(collect_password_stats)
+
+
+__all__ = [
+    "collect_password_stats",
+    "PASSWORD_OPERATIONS",
+    "PASSWORD_POOL",
+    "PASSWORD_SECONDS",
+    "PasswordWorkerPool",
+]
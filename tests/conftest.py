@@ -20,8 +20,12 @@ from tests.utils import make_alembic_config
 
 from movie_library.__main__ import get_app
 from movie_library.config.utils import get_settings
-from movie_library.db.connection import SessionManager
+from movie_library.db.connection import RECENT_WRITERS, SessionManager
 from movie_library.db.models import Movie, User, UserMovie
+from movie_library.utils.common import RESPONSE_CACHE
+from movie_library.utils.movie.cache import MOVIE_CACHE
+from movie_library.utils.recommendation import SIMILARITY_INDEX
+from movie_library.utils.user.cache import USER_CACHE
 
 
 def run_upgrade(connection, cfg):
@@ -44,6 +48,11 @@ def postgres() -> str:
     environ["POSTGRES_DB"] = tmp_name
 
     tmp_url = settings.database_uri_sync
+    USER_CACHE.clear()
+    MOVIE_CACHE.clear()
+    RESPONSE_CACHE.clear()
+    SIMILARITY_INDEX.clear()
+    RECENT_WRITERS.clear()
     if not database_exists(tmp_url):
         create_database(tmp_url)
 
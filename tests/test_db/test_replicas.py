@@ -0,0 +1,58 @@
+# pylint: disable=redefined-outer-name
+# pylint: disable=unused-argument
+import pytest
+from httpx import AsyncClient
+from starlette import status
+
+from movie_library.__main__ import get_app
+from movie_library.db.connection import RECENT_WRITERS, SessionManager
+from movie_library.utils.user import create_access_token
+
+
+@pytest.fixture
+async def replica_manager(migrated_postgres, postgres, monkeypatch) -> SessionManager:
+    # the primary itself serves as a replica, which never lags
+    monkeypatch.setenv("POSTGRES_REPLICA_URIS", f"{postgres},{postgres}")
+    manager = SessionManager()
+    manager.refresh()
+    yield manager
+    monkeypatch.delenv("POSTGRES_REPLICA_URIS")
+    manager.refresh()
+
+
+class TestReplicas:
+    async def test_round_robin(self, replica_manager):
+        first, second = replica_manager.replicas
+        assert replica_manager.get_read_session_maker() is first.session_maker
+        assert replica_manager.get_read_session_maker() is second.session_maker
+        assert replica_manager.get_read_session_maker() is first.session_maker
+
+    async def test_lagging_replica_out_of_rotation(self, replica_manager):
+        first, second = replica_manager.replicas
+        await replica_manager.check_replicas()
+        assert first.lag == 0 and first.available
+
+        second.max_lag = -1
+        await replica_manager.check_replicas()
+        assert not second.available
+        assert {replica_manager.get_read_session_maker() for _ in range(3)} == {first.session_maker}
+
+        first.max_lag = -1
+        await replica_manager.check_replicas()
+        assert replica_manager.get_read_session_maker() is replica_manager.get_session_maker()
+
+    async def test_read_your_writes(self, replica_manager, users_sample, movies_sample):
+        client = AsyncClient(app=get_app(), base_url="http://test")
+        access_token = create_access_token(data={"sub": users_sample[0]["username"]})
+        headers = {"Authorization": f"Bearer {access_token}"}
+
+        response = await client.get(url="/api/v1/favorite/", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert not RECENT_WRITERS.wrote_recently(headers["Authorization"])
+
+        response = await client.post(url=f"/api/v1/favorite/{movies_sample[0].id}", headers=headers)
+        assert response.status_code == status.HTTP_201_CREATED
+        assert RECENT_WRITERS.wrote_recently(headers["Authorization"])
+
+        response = await client.get(url="/api/v1/favorite/", headers=headers)
+        assert [movie["id"] for movie in response.json()["items"]] == [str(movies_sample[0].id)]
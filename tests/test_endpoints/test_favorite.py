@@ -1,7 +1,10 @@
+import json
 from uuid import uuid4
 
+import pytest
 from starlette import status
 
+from movie_library.utils.common import RESPONSE_CACHE
 from movie_library.utils.user import create_access_token
 
 
@@ -79,6 +82,18 @@ class TestFavoriteHandler:
         assert response.json()["pages"] == 1
         assert len(response.json()["items"]) == len(favorites)
 
+    async def test_get_favorites_total_none(self, client, favorites_sample, monkeypatch):
+        monkeypatch.setenv("FAVORITES_TOTAL_MODE", "none")
+        favorites, user = favorites_sample
+
+        access_token = create_access_token(data=self.get_token_data(user["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+        response = await client.get(url=self.get_url(), headers=headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()["items"]) == len(favorites)
+        assert response.json()["total"] is None
+
     async def test_get_favorites_several_pages(self, client, favorites_sample):
         favorites, user = favorites_sample
         request_settings = self.get_favorites_settings(size=1)
@@ -91,6 +106,18 @@ class TestFavoriteHandler:
         assert response.json()["pages"] == len(favorites)
         assert len(response.json()["items"]) == 1
 
+    async def test_get_favorites_cache_invalidated(self, client, favorites_sample):
+        favorites, user = favorites_sample
+        access_token = create_access_token(data=self.get_token_data(user["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+
+        response = await client.get(url=self.get_url(), headers=headers)
+        assert response.json()["total"] == len(favorites)
+
+        await client.delete(url=self.get_url(str(favorites[0].movie_id)), headers=headers)
+        response = await client.get(url=self.get_url(), headers=headers)
+        assert response.json()["total"] == len(favorites) - 1
+
     async def test_get_favorites_empty(self, client, users_sample):
         request_settings = self.get_favorites_settings()
 
@@ -102,3 +129,77 @@ class TestFavoriteHandler:
         print("lelele", response.json())
         assert response.json()["pages"] == 0
         assert len(response.json()["items"]) == 0
+
+    @pytest.mark.parametrize("endpoint", ["", "cursor"])
+    async def test_get_favorites_fast_json(self, client, favorites_sample, monkeypatch, endpoint):
+        favorites, user = favorites_sample
+        access_token = create_access_token(data=self.get_token_data(user["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+        expected = (await client.get(url=self.get_url(endpoint), headers=headers)).json()
+
+        monkeypatch.setenv("FAST_JSON", "true")
+        RESPONSE_CACHE.clear()
+        response = await client.get(url=self.get_url(endpoint), headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == expected
+        assert len(response.json()["items"]) == len(favorites)
+
+    async def test_get_favorites_by_cursor(self, client, favorites_sample):
+        favorites, user = favorites_sample
+
+        access_token = create_access_token(data=self.get_token_data(user["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+        response = await client.get(url=f"{self.get_url('cursor')}?size=1", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        first_page = response.json()
+
+        response = await client.get(
+            url=f"{self.get_url('cursor')}?size=1&cursor={first_page['next_cursor']}", headers=headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        second_page = response.json()
+
+        assert second_page["next_cursor"] is None
+        assert {first_page["items"][0]["id"], second_page["items"][0]["id"]} == {
+            str(favorite.movie_id) for favorite in favorites
+        }
+
+    async def test_add_favorites_batch(self, client, users_sample, movies_sample):
+        access_token = create_access_token(data=self.get_token_data(users_sample[0]["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+
+        response = await client.post(url=self.get_url(str(movies_sample[0].id)), headers=headers)
+        assert response.status_code == status.HTTP_201_CREATED
+
+        missing_id = str(uuid4())
+        movie_ids = [str(movies_sample[0].id), str(movies_sample[1].id), missing_id]
+        response = await client.post(url=self.get_url("batch"), headers=headers, json={"movie_ids": movie_ids})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            "added": [str(movies_sample[1].id)],
+            "present": [str(movies_sample[0].id)],
+            "missing": [missing_id],
+        }
+
+    async def test_delete_favorites_batch(self, client, favorites_sample):
+        favorites, user = favorites_sample
+        access_token = create_access_token(data=self.get_token_data(user["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+
+        missing_id = str(uuid4())
+        movie_ids = [str(favorites[0].movie_id), missing_id]
+        response = await client.request(
+            "DELETE", url=self.get_url("batch"), headers=headers, json={"movie_ids": movie_ids}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"removed": [str(favorites[0].movie_id)], "missing": [missing_id]}
+
+    async def test_export_favorites(self, client, favorites_sample):
+        favorites, user = favorites_sample
+        access_token = create_access_token(data=self.get_token_data(user["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+
+        response = await client.get(url=self.get_url("export"), headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert sorted(row["id"] for row in rows) == sorted(str(favorite.movie_id) for favorite in favorites)
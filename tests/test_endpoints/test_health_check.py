@@ -1,13 +1,75 @@
 import pytest
 from starlette import status
 
+from movie_library.utils.user import create_access_token
+
 
 class TestHealthCheckHandler:
     @staticmethod
     def get_url(current_endpoint: str) -> str:
         return "/api/v1/health_check/" + current_endpoint
 
+    @staticmethod
+    def get_auth_header(users_sample: list) -> dict:
+        access_token = create_access_token(data={"sub": users_sample[0]["username"]})
+        return {"Authorization": f"Bearer {access_token}"}
+
     @pytest.mark.parametrize("endpoint_path", ["ping_application", "ping_database"])
     async def test_check_health(self, client, endpoint_path):
         response = await client.get(url=self.get_url(endpoint_path))
         assert response.status_code == status.HTTP_200_OK
+
+    async def test_database_pool_stats(self, client, users_sample):
+        response = await client.get(url=self.get_url("ping_database"))
+        assert response.status_code == status.HTTP_200_OK
+
+        response = await client.get(url=self.get_url("database_pool"), headers=self.get_auth_header(users_sample))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["checkouts"] >= 1
+        # the session which authenticated the request holds its connection
+        assert response.json()["checked_out"] == 1
+
+    async def test_movie_cache_stats(self, client, users_sample):
+        response = await client.get(url=self.get_url("movie_cache"), headers=self.get_auth_header(users_sample))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["maxsize"] > 0
+
+    async def test_response_cache_stats(self, client, users_sample):
+        response = await client.get(url=self.get_url("response_cache"), headers=self.get_auth_header(users_sample))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["maxsize"] > 0
+
+    @pytest.mark.parametrize("endpoint_path", ["user_cache", "token_cache"])
+    async def test_authentication_cache_stats(self, client, users_sample, endpoint_path):
+        headers = self.get_auth_header(users_sample)
+        await client.get(url=self.get_url(endpoint_path), headers=headers)
+        response = await client.get(url=self.get_url(endpoint_path), headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        # the second request finds the user and the token of the first one
+        assert response.json()["hits"] >= 1
+        assert response.json()["maxsize"] > 0
+
+    async def test_database_replicas_stats(self, client, users_sample):
+        response = await client.get(url=self.get_url("database_replicas"), headers=self.get_auth_header(users_sample))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == []
+
+    @pytest.mark.parametrize(
+        "endpoint_path",
+        ["database_pool", "database_replicas", "movie_cache", "response_cache", "user_cache", "token_cache"],
+    )
+    async def test_stats_unauthorized(self, client, endpoint_path):
+        response = await client.get(url=self.get_url(endpoint_path))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    async def test_server_timing(self, client):
+        response = await client.get(url=self.get_url("ping_application"))
+        assert 'desc="statements: 0"' in response.headers["server-timing"]
+
+        # the first connection of engine runs its own statements
+        await client.get(url=self.get_url("ping_database"))
+        response = await client.get(url=self.get_url("ping_database"))
+        timing = response.headers["server-timing"]
+        assert timing.startswith("db;dur=")
+        assert 'desc="statements: 1"' in timing
+        assert "db-pool;dur=" in timing and "db-slowest;dur=" in timing
@@ -0,0 +1,31 @@
+from starlette import status
+
+
+class TestMetricsHandler:
+    @staticmethod
+    def get_samples(text: str) -> dict:
+        samples = (line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+        return {name: float(value) for name, value in samples}
+
+    async def test_metrics(self, client):
+        # metrics are kept for the whole process, so only their growth is checked
+        route = 'method="GET",route="/api/v1/health_check/ping_database"'
+        before = self.get_samples((await client.get(url="/api/v1/metrics")).text)
+        await client.get(url="/api/v1/health_check/ping_database")
+        await client.get(url="/api/v1/unknown")
+
+        response = await client.get(url="/api/v1/metrics")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        after = self.get_samples(response.text)
+        for name in (
+            f'http_responses_total{{{route},status="200"}}',
+            f"http_request_duration_seconds_count{{{route}}}",
+            'http_responses_total{method="GET",route="unmatched",status="404"}',
+        ):
+            assert after[name] == before.get(name, 0) + 1
+        assert after[f"http_db_statements_total{{{route}}}"] > before.get(f"http_db_statements_total{{{route}}}", 0)
+        assert after['db_pool_connections{host="primary",state="size"}'] > 0
+        assert after['db_pool_checkouts_total{host="primary"}'] > 0
+        assert "# TYPE db_pool_checkouts_total counter" in response.text.splitlines()
+        assert "# TYPE single_flight_calls_total counter" in response.text.splitlines()
@@ -1,13 +1,24 @@
 # pylint: disable=duplicate-code
+# pylint: disable=unused-argument
+import json
+from base64 import urlsafe_b64encode
 from uuid import uuid4
 
 import pytest
+from sqlalchemy import text
 from starlette import status
 
+from movie_library.utils.common import RESPONSE_CACHE, TOTAL_CACHE
+from movie_library.utils.favorite import merge_favorite_counters
+from movie_library.utils.recommendation import refresh_similarity_index
 from movie_library.utils.user import create_access_token
 
 
-class TestMovieHandler:
+def encode_cursor(values: list) -> str:
+    return urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+class MovieHandlerBase:
     @staticmethod
     def get_url(current_endpoint: str = "") -> str:
         return "/api/v1/movie/" + current_endpoint
@@ -34,6 +45,8 @@ class TestMovieHandler:
     def get_favorites_settings(page: int = 1, size: int = 50) -> str:
         return f"page={page}&size={size}"
 
+
+class TestMovieHandler(MovieHandlerBase):
     async def test_get_movie_success(self, client, users_sample, movies_sample):
         access_token = create_access_token(data=self.get_token_data(users_sample[0]["username"]))
         headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
@@ -41,6 +54,26 @@ class TestMovieHandler:
         response = await client.get(url=self.get_url(movies_sample[0].id), headers=headers)
         assert response.status_code == status.HTTP_200_OK
 
+    async def test_get_movie_not_modified(self, client, users_sample, movies_sample):
+        access_token = create_access_token(data=self.get_token_data(users_sample[0]["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+
+        response = await client.get(url=self.get_url(movies_sample[0].id), headers=headers)
+        etag = response.headers["etag"]
+
+        response = await client.get(url=self.get_url(movies_sample[0].id), headers=headers | {"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers["etag"] == etag
+
+        await client.put(
+            url=self.get_url(f"edit/{movies_sample[0].id}"),
+            headers=headers,
+            json={"title": movies_sample[0].title, "description": "changed"},
+        )
+        response = await client.get(url=self.get_url(movies_sample[0].id), headers=headers | {"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] != etag
+
     async def test_get_movie_no_movie(self, client, users_sample):
         access_token = create_access_token(data=self.get_token_data(users_sample[0]["username"]))
         headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
@@ -104,6 +137,37 @@ class TestMovieHandler:
         assert response.json()["pages"] == len(movies_sample)
         assert len(response.json()["items"]) == 1
 
+    async def test_get_movies_not_modified(self, client, users_sample, movies_sample):
+        access_token = create_access_token(data=self.get_token_data(users_sample[0]["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+
+        response = await client.get(url=self.get_url(), headers=headers)
+        assert len(response.json()["items"]) == len(movies_sample)
+        etag = response.headers["etag"]
+        assert etag.startswith('W/"')
+
+        response = await client.get(url=self.get_url(), headers=headers | {"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        request_settings = self.get_favorites_settings(size=1)
+        headers["If-None-Match"] = etag
+        response = await client.get(url=f"{self.get_url()}?{request_settings}", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+
+    async def test_get_movies_cache_invalidated(self, client, users_sample, movies_sample):
+        access_token = create_access_token(data=self.get_token_data(users_sample[0]["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+
+        response = await client.get(url=self.get_url(), headers=headers)
+        total = response.json()["total"]
+        assert total == len(movies_sample)
+        response = await client.get(url=self.get_url(), headers=headers)
+        assert response.json()["total"] == total
+
+        await client.post(url=self.get_url(), headers=headers, json=self.get_movie_sample())
+        response = await client.get(url=self.get_url(), headers=headers)
+        assert response.json()["total"] == total + 1
+
     async def test_get_movies_empty(self, client, users_sample):
         request_settings = self.get_favorites_settings()
 
@@ -159,3 +223,243 @@ class TestMovieHandler:
         )
 
         assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    async def test_get_movies_by_cursor(self, client, users_sample, movies_sample):
+        access_token = create_access_token(data=self.get_token_data(users_sample[0]["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+
+        response = await client.get(url=f"{self.get_url('cursor')}?size=1", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        first_page = response.json()
+        assert len(first_page["items"]) == 1
+        assert first_page["next_cursor"] is not None
+
+        response = await client.get(
+            url=f"{self.get_url('cursor')}?size=1&cursor={first_page['next_cursor']}", headers=headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        second_page = response.json()
+        assert len(second_page["items"]) == 1
+        assert second_page["items"][0]["id"] != first_page["items"][0]["id"]
+        assert second_page["next_cursor"] is None
+
+    @pytest.mark.parametrize("endpoint", ["", "cursor"])
+    async def test_get_movies_fast_json(self, client, users_sample, movies_sample, monkeypatch, endpoint):
+        access_token = create_access_token(data=self.get_token_data(users_sample[0]["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+        expected = (await client.get(url=self.get_url(endpoint), headers=headers)).json()
+
+        monkeypatch.setenv("FAST_JSON", "true")
+        RESPONSE_CACHE.clear()
+        response = await client.get(url=self.get_url(endpoint), headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == expected
+        assert len(response.json()["items"]) == len(movies_sample)
+
+    @pytest.mark.parametrize("cursor", ["invalid", encode_cursor(["2020-01-01T00:00:00+00:00", 5])])
+    async def test_get_movies_by_cursor_invalid(self, client, users_sample, cursor):
+        access_token = create_access_token(data=self.get_token_data(users_sample[0]["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+
+        response = await client.get(url=f"{self.get_url('cursor')}?cursor={cursor}", headers=headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestMovieTotalHandler(MovieHandlerBase):
+    async def test_get_movies_total_exact(self, client, users_sample, movies_sample):
+        access_token = create_access_token(data=self.get_token_data(users_sample[0]["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+
+        response = await client.get(url=self.get_url(), headers=headers)
+        assert response.json()["total"] == len(movies_sample)
+        assert response.json()["total_exact"]
+
+    async def test_get_movies_total_estimated(self, client, session, users_sample, movies_sample, monkeypatch):
+        monkeypatch.setenv("MOVIES_TOTAL_MODE", "estimated")
+        access_token = create_access_token(data=self.get_token_data(users_sample[0]["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+
+        # the estimate of a table without conditions is as fresh as its statistics
+        await session.execute(text("ANALYZE movies"))
+        response = await client.get(url=self.get_url(), headers=headers)
+        assert response.json()["total"] == len(movies_sample)
+        assert not response.json()["total_exact"]
+
+    async def test_get_movies_total_cached(self, client, users_sample, movies_sample, monkeypatch):
+        monkeypatch.setenv("MOVIES_TOTAL_MODE", "cached")
+        TOTAL_CACHE.clear()
+        access_token = create_access_token(data=self.get_token_data(users_sample[0]["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+
+        response = await client.get(url=self.get_url(), headers=headers)
+        assert response.json()["total"] == len(movies_sample)
+        assert not response.json()["total_exact"]
+
+        await client.post(url=self.get_url(), headers=headers, json=self.get_movie_sample())
+        response = await client.get(url=self.get_url(), headers=headers)
+        assert len(response.json()["items"]) == len(movies_sample) + 1
+        assert response.json()["total"] == len(movies_sample)
+
+    async def test_get_movies_total_none(self, client, users_sample, movies_sample, monkeypatch):
+        monkeypatch.setenv("MOVIES_TOTAL_MODE", "none")
+        access_token = create_access_token(data=self.get_token_data(users_sample[0]["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+
+        response = await client.get(url=self.get_url(), headers=headers)
+        assert len(response.json()["items"]) == len(movies_sample)
+        assert response.json()["total"] is None
+        assert not response.json()["total_exact"]
+
+
+class TestMovieSearchHandler(MovieHandlerBase):
+    async def test_full_text_search(self, client, users_sample, movies_sample):
+        access_token = create_access_token(data=self.get_token_data(users_sample[0]["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+
+        response = await client.get(url=f"{self.get_url('search')}?q={movies_sample[0].title}", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        found = response.json()["items"][0]
+        assert found["id"] == str(movies_sample[0].id)
+        assert "<b>" in found["title_highlight"]
+        assert found["rank"] > 0
+
+    async def test_full_text_search_nothing_found(self, client, users_sample, movies_sample):
+        access_token = create_access_token(data=self.get_token_data(users_sample[0]["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+
+        response = await client.get(url=f"{self.get_url('search')}?q=zzzqqqxxx", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["total"] == 0
+
+    async def test_fuzzy_search(self, client, users_sample, movies_sample):
+        access_token = create_access_token(data=self.get_token_data(users_sample[0]["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+
+        misspelled_title = movies_sample[0].title + "x"
+        response = await client.get(url=f"{self.get_url('fuzzy')}?title={misspelled_title}", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()[0]["id"] == str(movies_sample[0].id)
+        assert 0 < response.json()[0]["similarity"] < 1
+
+    async def test_fuzzy_search_threshold(self, client, users_sample, movies_sample):
+        access_token = create_access_token(data=self.get_token_data(users_sample[0]["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+
+        misspelled_title = movies_sample[0].title + "x"
+        response = await client.get(
+            url=f"{self.get_url('fuzzy')}?title={misspelled_title}&threshold=1", headers=headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == []
+
+    async def test_popular_movies(self, client, session, users_sample, movies_sample):
+        for user in users_sample:
+            access_token = create_access_token(data=self.get_token_data(user["username"]))
+            headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+            await client.post(url=f"/api/v1/favorite/{movies_sample[1].id}", headers=headers)
+        await client.post(url=f"/api/v1/favorite/{movies_sample[0].id}", headers=headers)
+        await merge_favorite_counters(session, batch_size=100)
+
+        response = await client.get(url=self.get_url("popular"), headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert [(movie["id"], movie["favorite_count"]) for movie in response.json()] == [
+            (str(movies_sample[1].id), 2),
+            (str(movies_sample[0].id), 1),
+        ]
+
+    async def test_similar_movies(self, client, users_sample, movies_sample):
+        headers = []
+        for user, movie in zip(users_sample, movies_sample):
+            access_token = create_access_token(data=self.get_token_data(user["username"]))
+            headers.append(self.get_auth_header({"token_type": "bearer", "access_token": access_token}))
+            await client.post(url=f"/api/v1/favorite/{movie.id}", headers=headers[-1])
+
+        response = await client.get(url=self.get_url(f"{movies_sample[0].id}/similar"), headers=headers[0])
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == []
+
+        await client.post(url=f"/api/v1/favorite/{movies_sample[0].id}", headers=headers[1])
+        await refresh_similarity_index()
+        response = await client.get(url=self.get_url(f"{movies_sample[0].id}/similar"), headers=headers[0])
+        assert [movie["id"] for movie in response.json()] == [str(movies_sample[1].id)]
+        assert response.json()[0]["similarity"] == pytest.approx(2**-0.5)
+
+    async def test_similar_movies_no_movie(self, client, users_sample):
+        access_token = create_access_token(data=self.get_token_data(users_sample[0]["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+        response = await client.get(url=self.get_url(f"{uuid4()}/similar"), headers=headers)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestMovieImportHandler(MovieHandlerBase):
+    async def test_bulk_import_ndjson(self, client, users_sample, movies_sample):
+        access_token = create_access_token(data=self.get_token_data(users_sample[0]["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+        headers["Content-Type"] = "application/x-ndjson"
+
+        body = "\n".join(
+            [
+                '{"title": "new movie", "description": "good movie"}',
+                f'{{"title": "{movies_sample[0].title}", "description": "copy"}}',
+                '{"title": "new movie", "description": "twice"}',
+                '{"description": "no title"}',
+            ]
+        )
+        response = await client.post(url=self.get_url("import"), headers=headers, content=body)
+        assert response.status_code == status.HTTP_200_OK
+        report = response.json()
+        assert report["received"] == 4
+        assert report["inserted"] == 1
+        assert report["rejected"] == 3
+        assert [(conflict["row"], conflict["reason"]) for conflict in report["conflicts"]] == [
+            (2, "exists"),
+            (3, "duplicate"),
+            (4, "invalid"),
+        ]
+
+    async def test_bulk_import_csv(self, client, users_sample):
+        access_token = create_access_token(data=self.get_token_data(users_sample[0]["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+        headers["Content-Type"] = "text/csv"
+
+        body = "title,description\nfirst,one\nsecond,two\n"
+        response = await client.post(url=self.get_url("import"), headers=headers, content=body)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["inserted"] == 2
+
+    async def test_bulk_import_invalid_encoding(self, client, users_sample):
+        access_token = create_access_token(data=self.get_token_data(users_sample[0]["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+        headers["Content-Type"] = "text/csv"
+
+        response = await client.post(url=self.get_url("import"), headers=headers, content=b"title\nfirst\n\xff\n")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    async def test_bulk_import_nul_character(self, client, users_sample):
+        access_token = create_access_token(data=self.get_token_data(users_sample[0]["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+        headers["Content-Type"] = "application/x-ndjson"
+
+        body = '{"title": "first"}\n{"title": "sec\\u0000ond"}\n'
+        response = await client.post(url=self.get_url("import"), headers=headers, content=body)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["inserted"] == 1
+        assert [(conflict["row"], conflict["reason"]) for conflict in response.json()["conflicts"]] == [(2, "invalid")]
+
+    async def test_bulk_import_wrong_content_type(self, client, users_sample):
+        access_token = create_access_token(data=self.get_token_data(users_sample[0]["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+
+        response = await client.post(url=self.get_url("import"), headers=headers, json=[])
+        assert response.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+
+    async def test_export_movies(self, client, users_sample, movies_sample):
+        access_token = create_access_token(data=self.get_token_data(users_sample[0]["username"]))
+        headers = self.get_auth_header({"token_type": "bearer", "access_token": access_token})
+
+        response = await client.get(url=self.get_url("export"), headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert sorted(row["id"] for row in rows) == sorted(str(movie.id) for movie in movies_sample)
+        assert set(rows[0]) == {"id", "title", "description", "dt_created", "dt_updated"}
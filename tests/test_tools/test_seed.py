@@ -0,0 +1,29 @@
+from collections import Counter
+
+from movie_library.tools.seed import chunks, generate_favorites, generate_movies, generate_users, movie_ids
+
+
+class TestSeed:
+    async def test_chunks(self):
+        assert chunks(250, 100) == [(0, 0, 100), (1, 100, 100), (2, 200, 50)]
+
+    async def test_same_seed_same_rows(self):
+        assert generate_movies(1, 0, 0, 50) == generate_movies(1, 0, 0, 50)
+        assert generate_movies(1, 0, 0, 50) != generate_movies(2, 0, 0, 50)
+        assert generate_users(1, 0, 0, 50, ["hash"]) == generate_users(1, 0, 0, 50, ["hash"])
+
+    async def test_unique_columns(self):
+        users = generate_users(0, 1, 100, 100, ["first", "second"])
+        movies = generate_movies(0, 1, 100, 100)
+        assert len({user[0] for user in users}) == len({user[1] for user in users}) == len({user[3] for user in users})
+        assert len({movie[0] for movie in movies}) == len({movie[1] for movie in movies}) == 100
+        assert users[0][1].endswith("_100") and users[0][2] == "first" and users[1][2] == "second"
+
+    async def test_favorites_follow_power_law(self):
+        favorites = generate_favorites(0, 0, 1000, 200, favorites=20, skew=1.0, chunk_size=100)
+        ids = set(movie_ids(0, 200, 100))
+        assert len(set(favorites)) == len(favorites)
+        assert all(movie_id in ids for _, movie_id in favorites)
+
+        popularity = sorted(Counter(movie_id for _, movie_id in favorites).values(), reverse=True)
+        assert popularity[0] > 10 * popularity[len(popularity) // 2]
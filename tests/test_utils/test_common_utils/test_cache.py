@@ -0,0 +1,84 @@
+from unittest import mock
+
+from movie_library.utils.common import Generations, TTLCache
+
+
+class TestTTLCache:
+    def test_get_missing(self):
+        cache = TTLCache(maxsize=2, ttl=10)
+
+        assert cache.get("key") is None
+        assert cache.stats()["misses"] == 1
+
+    def test_set_and_get(self):
+        cache = TTLCache(maxsize=2, ttl=10)
+        cache.set("key", "value")
+
+        assert cache.get("key") == "value"
+        assert cache.stats()["hits"] == 1
+
+    def test_least_recently_used_evicted(self):
+        cache = TTLCache(maxsize=2, ttl=10)
+        cache.set("first", 1)
+        cache.set("second", 2)
+        cache.get("first")
+        cache.set("third", 3)
+
+        assert cache.get("second") is None
+        assert cache.get("first") == 1
+        assert cache.get("third") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_entry_expires(self):
+        cache = TTLCache(maxsize=2, ttl=10)
+        with mock.patch("movie_library.utils.common.cache.monotonic", return_value=0):
+            cache.set("key", "value")
+        with mock.patch("movie_library.utils.common.cache.monotonic", return_value=11):
+            assert cache.get("key") is None
+        assert len(cache) == 0
+
+    def test_entry_own_ttl(self):
+        cache = TTLCache(maxsize=2, ttl=10)
+        with mock.patch("movie_library.utils.common.cache.monotonic", return_value=0):
+            cache.set("key", "value", ttl=100)
+        with mock.patch("movie_library.utils.common.cache.monotonic", return_value=50):
+            assert cache.get("key") == "value"
+
+    def test_pop(self):
+        cache = TTLCache(maxsize=2, ttl=10)
+        cache.set("key", "value")
+
+        assert cache.pop("key") == "value"
+        assert cache.get("key") is None
+
+    def test_set_after_pop_during_load_skipped(self):
+        cache = TTLCache(maxsize=2, ttl=10)
+        generation = cache.generation()
+        cache.pop("key")
+        cache.set("key", "stale", generation=generation)
+        cache.set("other", "value", generation=generation)
+
+        assert cache.get("key") is None
+        assert cache.get("other") == "value"
+        cache.set("key", "value", generation=cache.generation())
+        assert cache.get("key") == "value"
+
+
+class TestGenerations:
+    def test_forgotten_key_changed_since_older_generation(self):
+        generations = Generations(maxsize=1)
+        generation = generations.clock
+        generations.bump("first")
+        generations.bump("second")
+
+        assert generations.changed_since("first", generation)
+        assert not generations.changed_since("first", generations.clock)
+        assert not generations.changed_since("third", generations.clock)
+
+    def test_bump_all(self):
+        generations = Generations(maxsize=10)
+        generation = generations.clock
+        generations.bump_all()
+
+        assert generations.changed_since("key", generation)
+        assert not generations.changed_since("key", generations.clock)
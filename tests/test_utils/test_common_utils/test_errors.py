@@ -0,0 +1,27 @@
+from types import SimpleNamespace
+
+from sqlalchemy import exc
+
+from movie_library.utils.common import violated_constraint
+
+
+class DriverError(Exception):
+    constraint_name = "ix__movies__title"
+
+
+class TestViolatedConstraint:
+    async def test_asyncpg_cause(self):
+        adapted = Exception("unique violation")
+        adapted.__cause__ = DriverError()
+        error = exc.IntegrityError("UPDATE movies", {}, adapted)
+        assert violated_constraint(error) == "ix__movies__title"
+
+    async def test_psycopg_diagnostics(self):
+        driver_error = Exception("unique violation")
+        driver_error.diag = SimpleNamespace(constraint_name="ix__users__email")
+        error = exc.IntegrityError("UPDATE users", {}, driver_error)
+        assert violated_constraint(error) == "ix__users__email"
+
+    async def test_unknown(self):
+        error = exc.IntegrityError("UPDATE users", {}, Exception("unique violation"))
+        assert violated_constraint(error) is None
@@ -0,0 +1,38 @@
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from movie_library.utils.common import ItemsVersion, etag_matches, make_etag
+
+
+class TestEtag:
+    def test_make_etag(self):
+        assert make_etag("a", 1) == make_etag("a", 1)
+        assert make_etag("a", 1) != make_etag("a", 2)
+        assert make_etag("a", weak=True).startswith('W/"')
+
+    @pytest.mark.parametrize(
+        "if_none_match, expected",
+        [
+            (None, False),
+            ("", False),
+            ("*", True),
+            ('"other", "tag"', True),
+            ('W/"tag"', True),
+            ('"other"', False),
+        ],
+    )
+    def test_etag_matches(self, if_none_match, expected):
+        assert etag_matches(if_none_match, '"tag"') is expected
+
+    def test_items_version(self):
+        item = SimpleNamespace(id=uuid4(), dt_updated=datetime.now(UTC))
+        version = ItemsVersion()
+        assert version([item]) == [item]
+        etag = version.etag(1, 50)
+
+        item.dt_updated = datetime.now(UTC)
+        version([item])
+        assert version.etag(1, 50) != etag
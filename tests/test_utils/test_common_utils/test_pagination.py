@@ -0,0 +1,72 @@
+# pylint: disable=unused-argument
+from base64 import urlsafe_b64encode
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import select
+
+from movie_library.config import DefaultSettings
+from movie_library.db.models import Movie
+from movie_library.utils.common import (
+    TOTAL_CACHE,
+    TOTAL_CACHED,
+    TOTAL_ESTIMATED,
+    TOTAL_EXACT,
+    TOTAL_NONE,
+    count_total,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+class TestCursor:
+    def test_encode_decode(self):
+        values = (datetime.now(UTC), uuid4())
+        cursor = encode_cursor(values)
+
+        assert decode_cursor(cursor, (Movie.dt_created, Movie.id)) == values
+
+    @pytest.mark.parametrize(
+        "cursor",
+        [
+            "invalid",
+            encode_cursor(["only one value"]),
+            encode_cursor(["a", "b"]),
+            urlsafe_b64encode(b'["2020-01-01T00:00:00+00:00", 5]').decode(),
+            urlsafe_b64encode(b"[null, null]").decode(),
+        ],
+    )
+    def test_decode_invalid(self, cursor):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor, (Movie.dt_created, Movie.id))
+
+
+class TestCountTotal:
+    async def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            await count_total(None, select(Movie), "approximate")
+
+    def test_unknown_mode_in_settings(self):
+        with pytest.raises(ValidationError):
+            DefaultSettings(MOVIES_TOTAL_MODE="approximate")
+
+    async def test_none(self):
+        assert await count_total(None, select(Movie), TOTAL_NONE) == (None, False)
+
+    async def test_exact(self, migrated_postgres, session, movies_sample):
+        assert await count_total(session, select(Movie), TOTAL_EXACT) == (len(movies_sample), True)
+
+    async def test_cached(self, migrated_postgres, session, movies_sample):
+        TOTAL_CACHE.clear()
+        assert await count_total(session, select(Movie), TOTAL_CACHED) == (len(movies_sample), False)
+
+        session.add(Movie(title="one more", description="movie"))
+        await session.commit()
+        assert await count_total(session, select(Movie), TOTAL_CACHED) == (len(movies_sample), False)
+
+    async def test_estimated(self, migrated_postgres, session, movies_sample):
+        total, exact = await count_total(session, select(Movie), TOTAL_ESTIMATED)
+        assert total >= 0
+        assert not exact
@@ -0,0 +1,76 @@
+from asyncio import gather, sleep
+
+from starlette import status
+from starlette.requests import Request
+
+from movie_library.utils.common import MOVIES, ResponseCache, SingleFlight
+
+
+class TestResponseCache:
+    @staticmethod
+    def get_request(query_string: bytes, headers: list | None = None) -> Request:
+        return Request(
+            {"type": "http", "method": "GET", "path": "/movie/", "query_string": query_string, "headers": headers or []}
+        )
+
+    @staticmethod
+    def get_builder(calls: list):
+        async def build():
+            calls.append(None)
+            return f'{{"calls":{len(calls)}}}'.encode(), f'W/"{len(calls)}"'
+
+        return build
+
+    async def test_respond_cached(self):
+        cache = ResponseCache(maxsize=10, ttl=60)
+        calls = []
+
+        first = await cache.respond(self.get_request(b"page=1&size=5"), (MOVIES,), self.get_builder(calls))
+        second = await cache.respond(self.get_request(b"size=5&page=1"), (MOVIES,), self.get_builder(calls))
+        assert first.body == second.body == b'{"calls":1}'
+        assert len(calls) == 1
+
+    async def test_bump_invalidates(self):
+        cache = ResponseCache(maxsize=10, ttl=60)
+        calls = []
+
+        await cache.respond(self.get_request(b""), (MOVIES,), self.get_builder(calls))
+        cache.bump(MOVIES)
+        response = await cache.respond(self.get_request(b""), (MOVIES,), self.get_builder(calls))
+        assert response.body == b'{"calls":2}'
+
+    async def test_not_modified(self):
+        cache = ResponseCache(maxsize=10, ttl=60)
+        calls = []
+
+        response = await cache.respond(self.get_request(b""), (MOVIES,), self.get_builder(calls))
+        request = self.get_request(b"", headers=[(b"if-none-match", response.headers["etag"].encode())])
+        response = await cache.respond(request, (MOVIES,), self.get_builder(calls))
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    async def test_not_cached_until_settled(self):
+        cache = ResponseCache(maxsize=10, ttl=60, settle=60)
+        calls = []
+
+        await cache.respond(self.get_request(b""), (MOVIES,), self.get_builder(calls))
+        await cache.respond(self.get_request(b""), (MOVIES,), self.get_builder(calls))
+        assert len(calls) == 1
+
+        cache.bump(MOVIES)
+        assert not cache.settled(MOVIES)
+        await cache.respond(self.get_request(b""), (MOVIES,), self.get_builder(calls))
+        await cache.respond(self.get_request(b""), (MOVIES,), self.get_builder(calls))
+        assert len(calls) == 3
+
+    async def test_concurrent_misses_coalesced(self):
+        cache = ResponseCache(maxsize=10, ttl=60, flight=SingleFlight("test_response_cache", timeout=10))
+        calls = []
+        build = self.get_builder(calls)
+
+        async def slow_build():
+            await sleep(0.01)
+            return await build()
+
+        responses = await gather(*(cache.respond(self.get_request(b""), (MOVIES,), slow_build) for _ in range(3)))
+        assert {response.body for response in responses} == {b'{"calls":1}'}
+        assert len(calls) == 1
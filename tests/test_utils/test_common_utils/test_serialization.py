@@ -0,0 +1,47 @@
+import json
+from uuid import uuid4
+
+from asyncpg.pgproto.pgproto import UUID as AsyncpgUUID
+from fastapi_pagination import Params
+from fastapi_pagination.api import create_page, set_page
+
+from movie_library.db.models import Movie
+from movie_library.schemas import CursorPage, EstimatedTotalPage, MovieResponse
+from movie_library.utils.common import RowsPage, cursor_page_json, page_json
+
+
+class TestSerialization:
+    @staticmethod
+    def get_movies(count: int) -> list[Movie]:
+        return [Movie(id=uuid4(), title=f'Title "{number}" ü', description="description") for number in range(count)]
+
+    async def test_page_same_as_pydantic(self):
+        movies = self.get_movies(3)
+        set_page(EstimatedTotalPage[MovieResponse])
+        # total and params are positional-only in the signature, but passing them by position is deprecated
+        # pylint: disable=kwarg-superseded-by-positional-arg
+        expected = create_page(movies, total=7, params=Params(page=2, size=3), total_exact=False)
+
+        page = RowsPage(movies, MovieResponse, total=7, page=2, size=3, total_exact=False)
+        assert json.loads(page_json(page)) == json.loads(page_json(expected))
+        assert list(json.loads(page_json(page))) == list(json.loads(expected.json()))
+
+    async def test_page_without_total(self):
+        page = RowsPage([], MovieResponse, total=None, page=1, size=50, total_exact=False)
+        assert json.loads(page_json(page))["pages"] is None
+
+    async def test_cursor_page_same_as_pydantic(self):
+        page = {"items": self.get_movies(2), "size": 2, "next_cursor": "cursor"}
+        expected = json.loads(CursorPage[MovieResponse].parse_obj(page).json())
+        assert json.loads(cursor_page_json(page, MovieResponse, fast=True)) == expected
+        assert json.loads(cursor_page_json(page, MovieResponse)) == expected
+
+    async def test_asyncpg_uuid(self):
+        movies = self.get_movies(1)
+        movies[0].id = AsyncpgUUID(str(movies[0].id))
+        expected = str(movies[0].id)
+
+        page = RowsPage(movies, MovieResponse, total=1, page=1, size=1, total_exact=True)
+        assert json.loads(page_json(page))["items"][0]["id"] == expected
+        cursor_page = {"items": movies, "size": 1, "next_cursor": None}
+        assert json.loads(cursor_page_json(cursor_page, MovieResponse, fast=True))["items"][0]["id"] == expected
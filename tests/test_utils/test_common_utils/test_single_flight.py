@@ -0,0 +1,90 @@
+from asyncio import CancelledError, Event, create_task, gather, sleep
+
+import pytest
+
+from movie_library.utils.common import SingleFlight
+
+
+class TestSingleFlight:
+    @staticmethod
+    def get_call(calls: list, release: Event, result="result"):
+        async def call():
+            calls.append(None)
+            await release.wait()
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        return call
+
+    async def test_coalesced(self):
+        flight = SingleFlight("test_coalesced", timeout=10)
+        calls, release = [], Event()
+
+        tasks = [create_task(flight.do("key", self.get_call(calls, release))) for _ in range(5)]
+        await sleep(0)
+        release.set()
+        assert await gather(*tasks) == ["result"] * 5
+        assert len(calls) == 1
+        assert flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 4, "timeouts": 0}
+
+    async def test_different_keys(self):
+        flight = SingleFlight("test_different_keys", timeout=10)
+        calls, release = [], Event()
+
+        tasks = [create_task(flight.do(key, self.get_call(calls, release))) for key in ("first", "second")]
+        await sleep(0)
+        release.set()
+        await gather(*tasks)
+        assert len(calls) == 2
+
+    async def test_error_shared(self):
+        flight = SingleFlight("test_error_shared", timeout=10)
+        calls, release = [], Event()
+
+        tasks = [create_task(flight.do("key", self.get_call(calls, release, ValueError("failed")))) for _ in range(3)]
+        await sleep(0)
+        release.set()
+        results = await gather(*tasks, return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert len(calls) == 1
+
+    async def test_timeout(self):
+        flight = SingleFlight("test_timeout", timeout=0.01)
+        calls, release = [], Event()
+
+        leader = create_task(flight.do("key", self.get_call(calls, release)))
+        await sleep(0)
+
+        async def own_call():
+            return "own"
+
+        assert await flight.do("key", own_call) == "own"
+        assert flight.stats()["timeouts"] == 1
+        release.set()
+        assert await leader == "result"
+
+    async def test_leader_cancelled(self):
+        flight = SingleFlight("test_leader_cancelled", timeout=10)
+        calls, release = [], Event()
+
+        leader = create_task(flight.do("key", self.get_call(calls, release)))
+        await sleep(0)
+        follower = create_task(flight.do("key", self.get_call(calls, release, "own")))
+        await sleep(0)
+        leader.cancel()
+        await sleep(0)
+        release.set()
+        assert await follower == "own"
+        with pytest.raises(CancelledError):
+            await leader
+
+    async def test_disabled(self):
+        flight = SingleFlight("test_disabled", timeout=0)
+        calls, release = [], Event()
+
+        tasks = [create_task(flight.do("key", self.get_call(calls, release))) for _ in range(3)]
+        await sleep(0)
+        release.set()
+        await gather(*tasks)
+        assert len(calls) == 3
@@ -0,0 +1,90 @@
+from movie_library.utils.common import CountMinSketch, WTinyLFUCache
+
+
+class TestCountMinSketch:
+    def test_estimate(self):
+        sketch = CountMinSketch(width=64, sample_size=1000)
+        for _ in range(5):
+            sketch.increment("hot")
+        sketch.increment("cold")
+
+        assert sketch.estimate("hot") >= 5
+        assert sketch.estimate("hot") > sketch.estimate("cold")
+
+    def test_reset_halves_counters(self):
+        sketch = CountMinSketch(width=64, sample_size=10)
+        for _ in range(10):
+            sketch.increment("key")
+
+        assert sketch.resets == 1
+        assert sketch.estimate("key") == 5
+
+
+class TestWTinyLFUCache:
+    def test_get_set_pop(self):
+        cache = WTinyLFUCache(maxsize=10, ttl=60)
+        cache.set("key", "value")
+
+        assert cache.get("key") == "value"
+        assert cache.pop("key") == "value"
+        assert cache.get("key") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_peek_is_not_recorded(self):
+        cache = WTinyLFUCache(maxsize=10, ttl=60)
+        cache.set("key", "value")
+
+        assert cache.peek("key") == "value"
+        assert cache.peek("other") is None
+        assert cache.stats()["hits"] == cache.stats()["misses"] == 0
+
+    def test_size_is_bounded(self):
+        cache = WTinyLFUCache(maxsize=100, ttl=60)
+        for key in range(1000):
+            cache.get(key)
+            cache.set(key, key)
+
+        assert len(cache) == 100
+        assert cache.stats()["evictions"] == 900
+
+    def test_scan_does_not_flush_hot_keys(self):
+        cache = WTinyLFUCache(maxsize=100, ttl=60)
+        hot_keys = range(50)
+        for _ in range(5):
+            for key in hot_keys:
+                if cache.get(key) is None:
+                    cache.set(key, key)
+        for key in range(1000, 11000):
+            cache.get(key)
+            cache.set(key, key)
+
+        # only the keys which were still in the window may be lost
+        assert sum(cache.get(key) == key for key in hot_keys) >= len(hot_keys) - cache.window_size
+
+    def test_expired(self):
+        cache = WTinyLFUCache(maxsize=10, ttl=60)
+        cache.set("key", "value", ttl=-1)
+        cache.set("other", "value", ttl=1e-9)
+
+        assert cache.get("key") is None
+        assert cache.get("other") is None
+        assert len(cache) == 0
+
+    def test_memory(self):
+        cache = WTinyLFUCache(maxsize=10, ttl=60)
+        empty = cache.memory()
+        cache.set("key", {"title": "x" * 1000})
+
+        assert cache.memory() > empty + 1000
+        cache.clear()
+        assert cache.memory() == empty
+
+    def test_set_after_pop_during_load_skipped(self):
+        cache = WTinyLFUCache(maxsize=10, ttl=60)
+        generation = cache.generation()
+        cache.pop("key")
+        cache.set("key", "stale", generation=generation)
+
+        assert cache.get("key") is None
+        assert cache.entries_memory == 0
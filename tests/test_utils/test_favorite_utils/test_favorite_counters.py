@@ -0,0 +1,41 @@
+# pylint: disable=unused-argument
+
+from uuid import UUID
+
+from sqlalchemy import select
+
+from movie_library.db.models import MoviePopularity, User
+from movie_library.utils.favorite import add_favorites, delete_favorite, merge_favorite_counters
+from movie_library.utils.user import delete_user
+
+
+class TestFavoriteCounters:
+    @staticmethod
+    def convert_user(user: dict) -> User:
+        return User(**user)
+
+    @staticmethod
+    async def get_counts(session) -> dict:
+        rows = await session.execute(select(MoviePopularity.movie_id, MoviePopularity.favorite_count))
+        return dict(rows.all())
+
+    async def test_merge(self, migrated_postgres, session, users_sample, movies_sample):
+        for user in users_sample:
+            await add_favorites(session, self.convert_user(user), [movies_sample[0].id, movies_sample[1].id])
+        await delete_favorite(session, self.convert_user(users_sample[0]), movies_sample[1].id)
+
+        merged = await merge_favorite_counters(session, batch_size=1)
+        assert merged > 0
+        counts = await self.get_counts(session)
+        assert counts[UUID(movies_sample[0].id)] == 2
+        assert counts[UUID(movies_sample[1].id)] == 1
+
+        assert await merge_favorite_counters(session, batch_size=1) == 0
+
+    async def test_delete_user(self, migrated_postgres, session, users_sample, movies_sample):
+        await add_favorites(session, self.convert_user(users_sample[0]), [movies_sample[0].id])
+        await delete_user(session, User(username=users_sample[0]["username"]))
+
+        await merge_favorite_counters(session, batch_size=100)
+        counts = await self.get_counts(session)
+        assert counts[UUID(movies_sample[0].id)] == 0
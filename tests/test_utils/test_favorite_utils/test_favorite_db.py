@@ -1,9 +1,16 @@
 # pylint: disable=unused-argument
 
-from uuid import uuid4
+from uuid import UUID, uuid4
 
 from movie_library.db.models import User
-from movie_library.utils.favorite import add_favorite, delete_favorite, get_favorites_query
+from movie_library.utils.favorite import (
+    add_favorite,
+    add_favorites,
+    delete_favorite,
+    delete_favorites,
+    get_favorites_cursor_page,
+    get_favorites_query,
+)
 
 
 class TestFavoriteDB:
@@ -25,6 +32,28 @@ class TestFavoriteDB:
         result = await add_favorite(session, self.convert_user(users_sample[0]), uuid4())
         assert result is None
 
+    async def test_add_favorite_invalid_id(self, migrated_postgres, session, users_sample):
+        result = await add_favorite(session, self.convert_user(users_sample[0]), "not-an-id")
+        assert result is None
+
+    async def test_add_favorites(self, migrated_postgres, session, users_sample, movies_sample):
+        user = self.convert_user(users_sample[0])
+        missing_id = uuid4()
+        await add_favorite(session, user, movies_sample[0].id)
+
+        result = await add_favorites(session, user, [movies_sample[0].id, movies_sample[1].id, missing_id])
+        assert result["added"] == [UUID(movies_sample[1].id)]
+        assert result["present"] == [UUID(movies_sample[0].id)]
+        assert result["missing"] == [missing_id]
+
+    async def test_delete_favorites(self, migrated_postgres, session, favorites_sample):
+        favorites, user = favorites_sample
+        missing_id = uuid4()
+
+        result = await delete_favorites(session, self.convert_user(user), [favorites[0].movie_id, missing_id])
+        assert result["removed"] == [UUID(favorites[0].movie_id)]
+        assert result["missing"] == [missing_id]
+
     async def test_delete_favorite_success(self, migrated_postgres, session, favorites_sample):
         favorites, user = favorites_sample
         result = await delete_favorite(session, self.convert_user(user), favorites[0].movie_id)
@@ -37,3 +66,10 @@ class TestFavoriteDB:
     async def test_get_favorites_query_success(self, migrated_postgres, session, users_sample):
         result = await get_favorites_query(session, self.convert_user(users_sample[0]))
         assert result.whereclause.right.value == users_sample[0]["id"]
+
+    async def test_get_favorites_projection(self, migrated_postgres, session, favorites_sample):
+        favorites, user = favorites_sample
+        page = await get_favorites_cursor_page(session, self.convert_user(user), None, 10, projection=True)
+
+        assert {movie.id for movie in page["items"]} == {UUID(favorite.movie_id) for favorite in favorites}
+        assert set(page["items"][0]._fields) == {"id", "title", "description", "dt_created", "dt_updated"}
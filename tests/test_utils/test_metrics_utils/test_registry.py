@@ -0,0 +1,62 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from movie_library.utils.metrics import Registry
+
+
+class TestRegistry:
+    def test_counter_and_gauge(self):
+        registry = Registry()
+        counter = registry.counter("requests_total", "Requests.", ("route",))
+        gauge = registry.gauge("in_flight", "In flight.")
+
+        counter.labels("/movie/").inc()
+        counter.labels("/movie/").inc(2)
+        gauge.labels().inc()
+        gauge.labels().dec()
+        gauge.labels().set(5)
+
+        lines = registry.render().splitlines()
+        assert "# TYPE requests_total counter" in lines
+        assert 'requests_total{route="/movie/"} 3.0' in lines
+        assert "in_flight 5" in lines
+
+    def test_labels_reused(self):
+        registry = Registry()
+        counter = registry.counter("requests_total", "Requests.", ("route",))
+        assert counter.labels("/movie/") is counter.labels("/movie/")
+
+    def test_label_escaped(self):
+        registry = Registry()
+        registry.counter("requests_total", "Requests.", ("route",)).labels('say "hi"\n').inc()
+        assert 'requests_total{route="say \\"hi\\"\\n"} 1.0' in registry.render().splitlines()
+
+    def test_histogram(self):
+        registry = Registry()
+        histogram = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+        child = histogram.labels("/movie/")
+        for value in (0.05, 0.1, 0.5, 2.0):
+            child.observe(value)
+
+        lines = registry.render().splitlines()
+        assert 'latency_seconds_bucket{route="/movie/",le="0.1"} 2' in lines
+        assert 'latency_seconds_bucket{route="/movie/",le="1.0"} 3' in lines
+        assert 'latency_seconds_bucket{route="/movie/",le="+Inf"} 4' in lines
+        assert 'latency_seconds_sum{route="/movie/"} 2.65' in lines
+        assert 'latency_seconds_count{route="/movie/"} 4' in lines
+
+    def test_histogram_observed_from_threads(self):
+        registry = Registry()
+        child = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0)).labels()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            for _ in executor.map(child.observe, [0.5] * 10_000):
+                pass
+
+        lines = registry.render().splitlines()
+        assert 'latency_seconds_bucket{le="+Inf"} 10000' in lines
+        assert "latency_seconds_sum 5000.0" in lines
+
+    def test_collector_called_on_render(self):
+        registry = Registry()
+        gauge = registry.gauge("pool_size", "Pool size.")
+        registry.add_collector(lambda: gauge.labels().set(15))
+        assert "pool_size 15" in registry.render().splitlines()
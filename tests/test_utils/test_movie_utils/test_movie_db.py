@@ -1,11 +1,20 @@
 # pylint: disable=unused-argument
 
-from uuid import uuid4
+from unittest import mock
+from uuid import UUID, uuid4
 
 import pytest
 
+from movie_library.db.models import Movie
 from movie_library.schemas import Movie as MovieSchema
-from movie_library.utils.movie import create_movie, delete_movie, get_movie, update_movie
+from movie_library.utils.movie import (
+    MOVIE_CACHE,
+    create_movie,
+    delete_movie,
+    get_movie,
+    get_movies_cursor_page,
+    update_movie,
+)
 
 
 class TestMovieDB:
@@ -27,6 +36,68 @@ class TestMovieDB:
         movie = await get_movie(session, uuid4())
         assert movie is None
 
+    async def test_get_movie_cached(self, migrated_postgres, session, movies_sample):
+        await get_movie(session, movies_sample[0].id)
+        hits = MOVIE_CACHE.stats()["hits"]
+
+        session.expunge_all()
+        movie = await get_movie(session, movies_sample[0].id)
+        assert movie.title == movies_sample[0].title
+        assert MOVIE_CACHE.stats()["hits"] == hits + 1
+
+    async def test_get_movie_cached_by_str_and_uuid(self, migrated_postgres, session, movies_sample):
+        await get_movie(session, UUID(movies_sample[0].id))
+        hits = MOVIE_CACHE.stats()["hits"]
+
+        session.expunge_all()
+        await get_movie(session, str(movies_sample[0].id))
+        assert MOVIE_CACHE.stats()["hits"] == hits + 1
+
+    async def test_update_movie_by_str_invalidates_cache(self, migrated_postgres, session, movies_sample):
+        await get_movie(session, UUID(movies_sample[0].id))
+        modified_movie = MovieSchema(title=movies_sample[0].title, description="changed")
+        await update_movie(session, str(movies_sample[0].id), modified_movie)
+
+        session.expunge_all()
+        movie = await get_movie(session, UUID(movies_sample[0].id))
+        assert movie.description == "changed"
+
+    async def test_delete_movie_by_str_invalidates_cache(self, migrated_postgres, session, movies_sample):
+        await get_movie(session, UUID(movies_sample[0].id))
+        await delete_movie(session, str(movies_sample[0].id))
+
+        movie = await get_movie(session, UUID(movies_sample[0].id))
+        assert movie is None
+
+    async def test_update_movie_invalidates_cache(self, migrated_postgres, session, movies_sample):
+        await get_movie(session, movies_sample[0].id)
+        modified_movie = MovieSchema(title=movies_sample[0].title, description="changed")
+        await update_movie(session, movies_sample[0].id, modified_movie)
+
+        session.expunge_all()
+        movie = await get_movie(session, movies_sample[0].id)
+        assert movie.description == "changed"
+
+    async def test_delete_movie_invalidates_cache(self, migrated_postgres, session, movies_sample):
+        await get_movie(session, movies_sample[0].id)
+        await delete_movie(session, movies_sample[0].id)
+
+        movie = await get_movie(session, movies_sample[0].id)
+        assert movie is None
+
+    async def test_movie_changed_while_loaded_not_cached(self, migrated_postgres, session, movies_sample):
+        scalar = session.scalar
+
+        async def changed_while_loaded(*args, **kwargs):
+            MOVIE_CACHE.pop(UUID(movies_sample[0].id))
+            return await scalar(*args, **kwargs)
+
+        with mock.patch.object(session, "scalar", changed_while_loaded):
+            movie = await get_movie(session, movies_sample[0].id)
+
+        assert movie.title == movies_sample[0].title
+        assert MOVIE_CACHE.peek(UUID(movies_sample[0].id)) is None
+
     async def test_create_movie_success(self, migrated_postgres, session):
         movie = self.get_movie_sample()
         result = await create_movie(session, movie)
@@ -68,3 +139,12 @@ class TestMovieDB:
         is_updated, message = await update_movie(session, movies_sample[0].id, modified_movie)
         assert not is_updated
         assert message == "Title already exists."
+
+    async def test_cursor_page_projection(self, migrated_postgres, session, movies_sample):
+        entities = await get_movies_cursor_page(session, None, 1)
+        rows = await get_movies_cursor_page(session, None, 1, projection=True)
+
+        assert isinstance(entities["items"][0], Movie)
+        assert not isinstance(rows["items"][0], Movie)
+        assert rows["items"][0].id == entities["items"][0].id
+        assert rows["next_cursor"] == entities["next_cursor"]
@@ -0,0 +1,85 @@
+# pylint: disable=unused-argument
+import pytest
+
+from movie_library.utils.movie import import_movies, iter_lines, parse_csv, parse_ndjson
+
+
+async def stream(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+async def stream_rows(*movies: dict | None):
+    for row, movie in enumerate(movies, start=1):
+        yield row, movie
+
+
+async def collect(iterator) -> list:
+    return [item async for item in iterator]
+
+
+class TestMovieImportParsing:
+    async def test_iter_lines_split_chunks(self):
+        lines = await collect(iter_lines(stream(b"first\nsec", b"ond\r\nthi", b"rd \xd1", b"\x84")))
+        assert lines == ["first", "second", "third ф"]
+
+    async def test_iter_lines_long_line(self):
+        lines = await collect(iter_lines(stream(*[b"a"] * 1000, b"\r", b"\nb")))
+        assert lines == ["a" * 1000, "b"]
+
+    async def test_iter_lines_invalid_utf8(self):
+        with pytest.raises(UnicodeDecodeError):
+            await collect(iter_lines(stream(b"first\n\xff\n")))
+
+    async def test_parse_ndjson(self):
+        lines = stream(b'{"title": "a", "description": "b"}\n\nnot json\n[1]\n{"title": "c"}\n')
+        movies = await collect(parse_ndjson(iter_lines(lines)))
+        assert movies == [(1, {"title": "a", "description": "b"}), (2, None), (3, None), (4, {"title": "c"})]
+
+    async def test_parse_ndjson_nul_character(self):
+        lines = stream(b'{"title": "a"}\n{"title": "b\\u0000c"}\n')
+        movies = await collect(parse_ndjson(iter_lines(lines)))
+        assert movies == [(1, {"title": "a"}), (2, None)]
+
+    async def test_parse_csv(self):
+        lines = stream(b'title,description\na,b\n"c, d","multi\nline"\nonly_title\n')
+        movies = await collect(parse_csv(iter_lines(lines)))
+        assert movies == [
+            (1, {"title": "a", "description": "b"}),
+            (2, {"title": "c, d", "description": "multi\nline"}),
+            (3, None),
+        ]
+
+    async def test_parse_csv_nul_character(self):
+        lines = stream(b"title,description\na,b\x00c\nd,e\n")
+        movies = await collect(parse_csv(iter_lines(lines)))
+        assert movies == [(1, None), (2, {"title": "d", "description": "e"})]
+
+    async def test_parse_csv_quote_in_unquoted_value(self):
+        lines = stream(b'title,description\n12" Single,vinyl\nAlien,space\nHeat,crime\n')
+        movies = await collect(parse_csv(iter_lines(lines)))
+        assert movies == [
+            (1, {"title": '12" Single', "description": "vinyl"}),
+            (2, {"title": "Alien", "description": "space"}),
+            (3, {"title": "Heat", "description": "crime"}),
+        ]
+
+    async def test_parse_csv_quoted_value_split_across_chunks(self):
+        lines = stream(b'title,description\n"a","first', b"\nsecond", b'\nthird"\nb,c\n')
+        movies = await collect(parse_csv(iter_lines(lines)))
+        assert movies == [
+            (1, {"title": "a", "description": "first\nsecond\nthird"}),
+            (2, {"title": "b", "description": "c"}),
+        ]
+
+    async def test_parse_csv_unclosed_quote(self):
+        lines = stream(b'title,description\n"a,b\n')
+        movies = await collect(parse_csv(iter_lines(lines)))
+        assert movies == [(1, None)]
+
+
+class TestMovieImport:
+    async def test_import_movies_without_conflicts_listed(self, migrated_postgres, session, movies_sample):
+        movies = stream_rows({"title": "new movie"}, {"title": movies_sample[0].title}, {"title": "new movie"}, None)
+        report = await import_movies(session, movies, max_reported=0)
+        assert report == {"received": 4, "inserted": 1, "rejected": 3, "conflicts": []}
@@ -0,0 +1,112 @@
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from movie_library.utils.recommendation import ItemSimilarityIndex, top_k_similar
+from movie_library.utils.recommendation.similarity import favorites_matrix, row_blocks, user_key
+
+
+def brute_force(users_movies: np.ndarray) -> np.ndarray:
+    cooccurrence = users_movies.T @ users_movies
+    norms = np.sqrt(np.diag(cooccurrence))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        similarity = np.nan_to_num(cooccurrence / np.outer(norms, norms))
+    np.fill_diagonal(similarity, 0)
+    return similarity
+
+
+class TestTopKSimilar:
+    @pytest.mark.parametrize("budget", [1, 50, 10**9])
+    def test_matches_brute_force(self, budget):
+        generator = np.random.default_rng(0)
+        dense = (generator.random((60, 25)) < 0.2).astype(np.float32)
+        users_movies = favorites_matrix(*np.nonzero(dense), dense.shape)
+        expected = brute_force(dense)
+
+        neighbors, scores = top_k_similar(users_movies, users_movies.T.tocsr(), np.arange(25), 5, budget)
+        for movie in range(25):
+            found = neighbors[movie][neighbors[movie] >= 0]
+            assert np.allclose(scores[movie][: len(found)], expected[movie, found], atol=1e-6)
+            assert np.allclose(scores[movie][: len(found)], np.sort(expected[movie])[::-1][: len(found)], atol=1e-6)
+            assert movie not in found
+
+    def test_row_blocks(self):
+        blocks = row_blocks(np.array([5, 1, 1, 10, 1]), budget=3)
+        assert [block.tolist() for block in blocks] == [[0], [1, 2], [3], [4]]
+
+
+class TestItemSimilarityIndex:
+    @staticmethod
+    def build(favorites: dict) -> tuple[ItemSimilarityIndex, list]:
+        movie_ids = sorted({movie_id for movies in favorites.values() for movie_id in movies})
+        index = ItemSimilarityIndex(k=3, budget=100)
+        keys = [user_key(user_id) for user_id, movies in favorites.items() for _ in movies]
+        columns = [movie_ids.index(movie_id) for movies in favorites.values() for movie_id in movies]
+        index.build(movie_ids, np.array(keys, dtype=np.int64), np.array(columns, dtype=np.int32))
+        return index, movie_ids
+
+    def test_similar(self):
+        first, second, third = uuid4(), uuid4(), uuid4()
+        index, _ = self.build({uuid4(): [first, second], uuid4(): [first, second, third]})
+
+        similar = index.similar(first, 10)
+        assert [movie_id for movie_id, _ in similar] == [second, third]
+        assert similar[0][1] == pytest.approx(1.0)
+        assert index.similar(uuid4(), 10) == []
+
+    def test_refresh_matches_build(self):
+        users = [uuid4() for _ in range(3)]
+        movies = sorted(uuid4() for _ in range(4))
+        favorites = {users[0]: movies[:2], users[1]: movies[1:3]}
+        index, _ = self.build(favorites)
+
+        index.record(users[1], [movies[1]], -1)
+        index.record(users[2], [movies[2], movies[3]], 1)
+        index.record(users[0], [movies[0]], 1)
+        assert index.refresh() == 4
+        assert index.refresh() == 0
+
+        rebuilt, _ = self.build({users[0]: movies[:2], users[1]: [movies[2]], users[2]: movies[2:]})
+        for movie_id in movies:
+            assert index.similar(movie_id, 3) == pytest.approx(rebuilt.similar(movie_id, 3))
+
+    def test_refresh_before_build(self):
+        index = ItemSimilarityIndex(k=3, budget=100)
+        index.record(uuid4(), [uuid4()], 1)
+        assert index.refresh() == 0
+        assert index.stats()["pending"] == 0
+
+    def test_record_before_build(self):
+        user = uuid4()
+        first, second, third = sorted(uuid4() for _ in range(3))
+        index = ItemSimilarityIndex(k=3, budget=100)
+        index.record(user, [first, second], 1)
+        recorded = index.recorded_count()
+        index.record(user, [third], 1)
+
+        # favorites are loaded after the first two changes were recorded
+        keys = np.array([user_key(user)] * 2, dtype=np.int64)
+        index.build([first, second, third], keys, np.array([0, 1], dtype=np.int32), recorded)
+        assert index.stats()["pending"] == 1
+        assert index.refresh() == 1
+
+        rebuilt, _ = self.build({user: [first, second, third]})
+        for movie_id in (first, second, third):
+            assert index.similar(movie_id, 3) == pytest.approx(rebuilt.similar(movie_id, 3))
+
+    def test_not_recording(self):
+        index = ItemSimilarityIndex(k=3, budget=100, recording=False)
+        index.record(uuid4(), [uuid4()], 1)
+        assert index.recorded_count() == 0
+
+    def test_build_drops_recorded(self):
+        index, movies = self.build({uuid4(): [uuid4(), uuid4()]})
+        index.record(uuid4(), movies, 1)
+        index.build(movies, np.array([user_key(uuid4())] * 2, dtype=np.int64), np.array([0, 1], dtype=np.int32))
+        assert index.refresh() == 0
+
+
+def test_user_key_is_signed():
+    assert user_key("ffffffff-ffff-ffff-0000-000000000000") == -1
+    assert user_key("00000000-0000-0001-ffff-ffffffffffff") == 1
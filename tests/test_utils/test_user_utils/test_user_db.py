@@ -4,6 +4,7 @@ import pytest
 
 from movie_library.db.models import User
 from movie_library.schemas import RegistrationForm, UserEdit
+from movie_library.utils.recommendation import SIMILARITY_INDEX
 from movie_library.utils.user import delete_user, get_user, register_user, update_user
 
 
@@ -41,6 +42,14 @@ class TestUserDB:
         res = await delete_user(session, user_to_delete)
         assert res == 1
 
+    async def test_delete_user_records_favorites(self, migrated_postgres, session, favorites_sample):
+        favorites, user = favorites_sample
+        recorded = SIMILARITY_INDEX.recorded_count()
+
+        res = await delete_user(session, User(username=user["username"]))
+        assert res == 1
+        assert SIMILARITY_INDEX.recorded_count() == recorded + len(favorites)
+
     async def test_delete_user_no_user(self, migrated_postgres, session):
         user_to_delete = User(username=self.get_user_sample().username)
 
@@ -1,7 +1,22 @@
 # pylint: disable=unused-argument
 
+from unittest import mock
+
+import pytest
+from jose import JWTError
+
 from movie_library.config.utils import get_settings
-from movie_library.utils.user import authenticate_user, create_access_token, get_current_user, verify_password
+from movie_library.schemas import UserEdit
+from movie_library.utils.user import (
+    authenticate_user,
+    create_access_token,
+    get_current_user,
+    get_token_data,
+    get_user,
+    update_user,
+    verify_password,
+)
+from movie_library.utils.user.cache import TOKEN_CACHE, USER_CACHE
 
 
 class TestUserLogic:
@@ -38,10 +53,63 @@ class TestUserLogic:
         current_user = await get_current_user(session, token)
         assert current_user.username == user["username"]
 
+    async def test_get_current_user_cached(self, migrated_postgres, session, users_sample):
+        user = users_sample[0]
+        token = create_access_token(data={"sub": user["username"]})
+
+        await get_current_user(session, token)
+        hits = USER_CACHE.hits
+        current_user = await get_current_user(session, token)
+
+        assert USER_CACHE.hits == hits + 1
+        assert current_user.id == user["id"]
+
+    async def test_get_current_user_cache_invalidated(self, migrated_postgres, session, users_sample):
+        user = users_sample[0]
+        token = create_access_token(data={"sub": user["username"]})
+
+        current_user = await get_current_user(session, token)
+        edited_user = UserEdit(username=user["username"], email="new_" + user["email"])
+        await update_user(session, current_user, edited_user)
+
+        assert USER_CACHE.get(user["username"]) is None
+        current_user = await get_current_user(session, token)
+        assert current_user.email == "new_" + user["email"]
+
+    async def test_get_current_user_changed_while_loaded_not_cached(self, migrated_postgres, session, users_sample):
+        user = users_sample[0]
+        token = create_access_token(data={"sub": user["username"]})
+
+        async def changed_while_loaded(*args, **kwargs):
+            USER_CACHE.pop(user["username"])
+            return await get_user(*args, **kwargs)
+
+        with mock.patch("movie_library.utils.user.logic.get_user", changed_while_loaded):
+            current_user = await get_current_user(session, token)
+
+        assert current_user.username == user["username"]
+        assert USER_CACHE.get(user["username"]) is None
+
     def test_create_access_token_success(self):
         token = create_access_token(data={"sub": "example-user"})
         assert token is not None
 
+    def test_get_token_data_cached(self):
+        token = create_access_token(data={"sub": "example-user"})
+
+        assert get_token_data(token).username == "example-user"
+        hits = TOKEN_CACHE.hits
+        assert get_token_data(token).username == "example-user"
+        assert TOKEN_CACHE.hits == hits + 1
+
+    def test_get_token_data_no_subject(self):
+        token = create_access_token(data={"role": "user"})
+        assert get_token_data(token) is None
+
+    def test_get_token_data_wrong_token(self):
+        with pytest.raises(JWTError):
+            get_token_data("not.a.token")
+
     def test_verify_password_right(self):
         user = self.get_user_sample()
         hashed_password = self.hash_password(user["password"])
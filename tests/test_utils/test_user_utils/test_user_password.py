@@ -0,0 +1,33 @@
+from movie_library.config.utils import get_settings
+from movie_library.utils.metrics import REGISTRY
+from movie_library.utils.user.password import PasswordWorkerPool
+
+
+class TestPasswordWorkerPool:
+    @staticmethod
+    def get_pool() -> PasswordWorkerPool:
+        return PasswordWorkerPool(max_workers=2, pwd_context=get_settings().PWD_CONTEXT)
+
+    async def test_hash_and_verify(self):
+        pool = self.get_pool()
+        hashed_password = await pool.hash("12341234")
+
+        assert hashed_password != "12341234"
+        assert await pool.verify("12341234", hashed_password)
+        assert not await pool.verify("not_12341234", hashed_password)
+
+    async def test_stats(self):
+        pool = self.get_pool()
+        await pool.hash("12341234")
+
+        stats = pool.stats()
+        assert stats["max_workers"] == 2
+        assert stats["queued"] == 0
+        assert stats["running"] == 0
+        assert stats["completed"] == 1
+
+    def test_operations_collected(self):
+        lines = REGISTRY.render().splitlines()
+
+        assert 'auth_password_operations{state="queued"} 0' in lines
+        assert 'auth_password_operations{state="running"} 0' in lines